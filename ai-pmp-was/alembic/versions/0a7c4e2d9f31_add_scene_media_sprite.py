@@ -0,0 +1,24 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '0a7c4e2d9f31'
+down_revision: Union[str, None] = 'f3b6d1a8c924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+
+    op.add_column('scene_media', sa.Column('sprite_asset_pk', sa.Integer(), nullable=True,
+                                           comment='타임스탬프 썸네일 sprite sheet'))
+    op.add_column('scene_media', sa.Column('sprite_manifest', postgresql.JSONB(astext_type=sa.Text()), nullable=True,
+                                           comment='sprite sheet 안의 타임스탬프별 좌표'))
+    op.create_foreign_key('scene_media_sprite_asset_pk_fkey', 'scene_media', 'asset', ['sprite_asset_pk'], ['pk'])
+
+def downgrade() -> None:
+
+    op.drop_constraint('scene_media_sprite_asset_pk_fkey', 'scene_media', type_='foreignkey')
+    op.drop_column('scene_media', 'sprite_manifest')
+    op.drop_column('scene_media', 'sprite_asset_pk')
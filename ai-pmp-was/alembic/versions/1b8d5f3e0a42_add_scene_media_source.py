@@ -0,0 +1,23 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '1b8d5f3e0a42'
+down_revision: Union[str, None] = '0a7c4e2d9f31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+
+    op.add_column('scene_media', sa.Column('source_key', sa.String(length=200), nullable=True,
+                                           comment='scene_import 원본 JSON 파일 이름'))
+    op.add_column('scene_media', sa.Column('content_hash', sa.String(length=64), nullable=True,
+                                           comment='원본 JSON 과 파일들의 sha256'))
+    op.create_unique_constraint('scene_media_source_key_key', 'scene_media', ['source_key'])
+
+def downgrade() -> None:
+
+    op.drop_constraint('scene_media_source_key_key', 'scene_media', type_='unique')
+    op.drop_column('scene_media', 'content_hash')
+    op.drop_column('scene_media', 'source_key')
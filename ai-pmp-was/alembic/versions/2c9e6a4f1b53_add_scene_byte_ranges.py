@@ -0,0 +1,27 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '2c9e6a4f1b53'
+down_revision: Union[str, None] = '1b8d5f3e0a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+
+    op.add_column('scene_media', sa.Column('moov_byte_start', sa.BigInteger(), nullable=True,
+                                           comment='영상 moov box 시작 byte'))
+    op.add_column('scene_media', sa.Column('moov_byte_end', sa.BigInteger(), nullable=True,
+                                           comment='영상 moov box 끝 byte (포함)'))
+    op.add_column('scene_timestamp', sa.Column('byte_start', sa.BigInteger(), nullable=True,
+                                               comment='직전 keyframe 부터의 영상 시작 byte'))
+    op.add_column('scene_timestamp', sa.Column('byte_end', sa.BigInteger(), nullable=True,
+                                               comment='영상 끝 byte (포함)'))
+
+def downgrade() -> None:
+
+    op.drop_column('scene_timestamp', 'byte_end')
+    op.drop_column('scene_timestamp', 'byte_start')
+    op.drop_column('scene_media', 'moov_byte_end')
+    op.drop_column('scene_media', 'moov_byte_start')
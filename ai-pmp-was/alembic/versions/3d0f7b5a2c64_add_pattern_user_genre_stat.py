@@ -0,0 +1,90 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '3d0f7b5a2c64'
+down_revision: Union[str, None] = '2c9e6a4f1b53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+
+    op.create_table('pattern_user_genre_stat',
+    sa.Column('user_pk', sa.Integer(), nullable=False, comment='사용자 FK'),
+    sa.Column('genre', sa.String(length=50), nullable=False, comment='한글 장르'),
+    sa.Column('view_count', sa.Integer(), nullable=False, comment='시청 횟수'),
+    sa.Column('last_view_at', sa.DateTime(), nullable=False, comment='마지막 시청 일시'),
+    sa.ForeignKeyConstraint(['user_pk'], ['user.pk'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_pk', 'genre'),
+    comment='Pattern - 사용자별 장르 시청 집계 (pattern_tv_viewing_log trigger 로 유지)'
+    )
+
+    # 대량 적재 (COPY, 다중 INSERT) 도 한 번에 집계하도록 statement 단위 trigger
+    op.execute('''
+        CREATE FUNCTION pattern_tv_viewing_log_insert_rollup() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO pattern_user_genre_stat AS s (user_pk, genre, view_count, last_view_at)
+            SELECT n.user_pk, p.genre_ko, count(*), max(n.view_date + n.view_time::time)
+            FROM new_log n
+            JOIN pattern_program p ON p.pk = n.program_pk
+            GROUP BY n.user_pk, p.genre_ko
+            ON CONFLICT (user_pk, genre) DO UPDATE
+            SET view_count = s.view_count + EXCLUDED.view_count,
+                last_view_at = greatest(s.last_view_at, EXCLUDED.last_view_at);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+    op.execute('''
+        CREATE TRIGGER pattern_tv_viewing_log_insert_rollup
+        AFTER INSERT ON pattern_tv_viewing_log
+        REFERENCING NEW TABLE AS new_log
+        FOR EACH STATEMENT EXECUTE FUNCTION pattern_tv_viewing_log_insert_rollup()
+    ''')
+
+    op.execute('''
+        CREATE FUNCTION pattern_tv_viewing_log_delete_rollup() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM pattern_user_genre_stat s
+            USING old_log o
+            JOIN pattern_program p ON p.pk = o.program_pk
+            WHERE s.user_pk = o.user_pk AND s.genre = p.genre_ko;
+
+            INSERT INTO pattern_user_genre_stat (user_pk, genre, view_count, last_view_at)
+            SELECT l.user_pk, p.genre_ko, count(*), max(l.view_date + l.view_time::time)
+            FROM pattern_tv_viewing_log l
+            JOIN pattern_program p ON p.pk = l.program_pk
+            WHERE (l.user_pk, p.genre_ko) IN (
+                SELECT o.user_pk, op.genre_ko
+                FROM old_log o
+                JOIN pattern_program op ON op.pk = o.program_pk
+            )
+            GROUP BY l.user_pk, p.genre_ko;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+    op.execute('''
+        CREATE TRIGGER pattern_tv_viewing_log_delete_rollup
+        AFTER DELETE ON pattern_tv_viewing_log
+        REFERENCING OLD TABLE AS old_log
+        FOR EACH STATEMENT EXECUTE FUNCTION pattern_tv_viewing_log_delete_rollup()
+    ''')
+
+    op.execute('''
+        INSERT INTO pattern_user_genre_stat (user_pk, genre, view_count, last_view_at)
+        SELECT l.user_pk, p.genre_ko, count(*), max(l.view_date + l.view_time::time)
+        FROM pattern_tv_viewing_log l
+        JOIN pattern_program p ON p.pk = l.program_pk
+        GROUP BY l.user_pk, p.genre_ko
+    ''')
+
+def downgrade() -> None:
+
+    op.execute('DROP TRIGGER pattern_tv_viewing_log_delete_rollup ON pattern_tv_viewing_log')
+    op.execute('DROP FUNCTION pattern_tv_viewing_log_delete_rollup()')
+    op.execute('DROP TRIGGER pattern_tv_viewing_log_insert_rollup ON pattern_tv_viewing_log')
+    op.execute('DROP FUNCTION pattern_tv_viewing_log_insert_rollup()')
+    op.drop_table('pattern_user_genre_stat')
@@ -0,0 +1,14 @@
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '4e1a8c6b3d75'
+down_revision: Union[str, None] = '3d0f7b5a2c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_index('idx_pattern_tv_schedule_day_time', 'pattern_tv_schedule', ['day_of_week', 'time'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('idx_pattern_tv_schedule_day_time', table_name='pattern_tv_schedule')
@@ -0,0 +1,29 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '5f2b9d7c4e86'
+down_revision: Union[str, None] = '4e1a8c6b3d75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+
+    op.create_table('pattern_user_recommendation',
+    sa.Column('user_pk', sa.Integer(), nullable=False, comment='사용자 FK'),
+    sa.Column('day_of_week', sa.String(length=20), nullable=False, comment='월요일, 화요일, ...'),
+    sa.Column('time', sa.String(length=10), nullable=False, comment='HH:MM'),
+    sa.Column('rank', sa.Integer(), nullable=False, comment='추천 순위 (0부터)'),
+    sa.Column('channel', sa.String(length=20), nullable=False, comment='채널'),
+    sa.Column('program_pk', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False, comment='장르 선호 확률'),
+    sa.ForeignKeyConstraint(['program_pk'], ['pattern_program.pk'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_pk'], ['user.pk'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_pk', 'day_of_week', 'time', 'rank'),
+    comment='Pattern - 사용자 x 요일 x 시간 추천 (bin/batch_pattern_recommend.py 로 생성)'
+    )
+
+def downgrade() -> None:
+
+    op.drop_table('pattern_user_recommendation')
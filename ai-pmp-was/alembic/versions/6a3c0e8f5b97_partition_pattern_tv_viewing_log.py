@@ -0,0 +1,100 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '6a3c0e8f5b97'
+down_revision: Union[str, None] = '5f2b9d7c4e86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def _create_log_table(partitioned: bool) -> None:
+    op.create_table('pattern_tv_viewing_log',
+    sa.Column('pk', sa.Integer(), server_default=sa.text("nextval('pattern_tv_viewing_log_pk_seq'::regclass)"),
+              nullable=False),
+    sa.Column('user_pk', sa.Integer(), nullable=False),
+    sa.Column('program_pk', sa.Integer(), nullable=False),
+    sa.Column('quarter', sa.String(length=10), nullable=False, comment='Q1, Q2, Q3, Q4'),
+    sa.Column('view_date', sa.Date(), nullable=False,
+              comment='시청 날짜 (partition key)' if partitioned else '시청 날짜'),
+    sa.Column('view_time', sa.String(length=10), nullable=False, comment='시청 시간 HH:MM'),
+    sa.Column('day', sa.String(length=20), nullable=False, comment='요일'),
+    sa.Column('channel', sa.String(length=20), nullable=False, comment='채널'),
+    sa.Column('create_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['program_pk'], ['pattern_program.pk'], ),
+    sa.ForeignKeyConstraint(['user_pk'], ['user.pk'], ),
+    sa.PrimaryKeyConstraint('pk', 'view_date') if partitioned else sa.PrimaryKeyConstraint('pk'),
+    comment='Pattern - TV 시청 기록 (view_date 분기별 partition)' if partitioned else 'Pattern - TV 시청 기록',
+    **({'postgresql_partition_by': 'RANGE (view_date)'} if partitioned else {})
+    )
+
+def _replace_log_table(partitioned: bool) -> None:
+    op.execute('ALTER TABLE pattern_tv_viewing_log RENAME TO pattern_tv_viewing_log_old')
+    op.execute('ALTER TABLE pattern_tv_viewing_log_old RENAME CONSTRAINT pattern_tv_viewing_log_pkey '
+               'TO pattern_tv_viewing_log_old_pkey')
+    op.execute('ALTER SEQUENCE pattern_tv_viewing_log_pk_seq OWNED BY NONE')
+
+    _create_log_table(partitioned)
+    op.execute('ALTER SEQUENCE pattern_tv_viewing_log_pk_seq OWNED BY pattern_tv_viewing_log.pk')
+
+    if partitioned:
+        op.execute('CREATE TABLE pattern_tv_viewing_log_default PARTITION OF pattern_tv_viewing_log DEFAULT')
+
+        # 기존 기록이 있는 분기부터 다음 분기까지 partition 을 미리 만든다
+        op.execute('''
+            DO $$
+            DECLARE
+                q date;
+                last_q date;
+            BEGIN
+                SELECT date_trunc('quarter', coalesce(min(view_date), current_date))::date,
+                       date_trunc('quarter', greatest(max(view_date), current_date) + interval '3 months')::date
+                INTO q, last_q
+                FROM pattern_tv_viewing_log_old;
+
+                WHILE q <= last_q LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF pattern_tv_viewing_log FOR VALUES FROM (%L) TO (%L)',
+                        'pattern_tv_viewing_log_' || extract(year FROM q) || 'q' || extract(quarter FROM q),
+                        q, (q + interval '3 months')::date
+                    );
+                    q := (q + interval '3 months')::date;
+                END LOOP;
+            END
+            $$
+        ''')
+
+    # 집계는 이미 맞으므로 trigger 를 다시 만들기 전에 옮긴다
+    op.execute('''
+        INSERT INTO pattern_tv_viewing_log
+            (pk, user_pk, program_pk, quarter, view_date, view_time, day, channel, create_at)
+        SELECT pk, user_pk, program_pk, quarter, view_date, view_time, day, channel, create_at
+        FROM pattern_tv_viewing_log_old
+    ''')
+    op.execute('DROP TABLE pattern_tv_viewing_log_old')
+
+    op.execute('''
+        CREATE TRIGGER pattern_tv_viewing_log_insert_rollup
+        AFTER INSERT ON pattern_tv_viewing_log
+        REFERENCING NEW TABLE AS new_log
+        FOR EACH STATEMENT EXECUTE FUNCTION pattern_tv_viewing_log_insert_rollup()
+    ''')
+    op.execute('''
+        CREATE TRIGGER pattern_tv_viewing_log_delete_rollup
+        AFTER DELETE ON pattern_tv_viewing_log
+        REFERENCING OLD TABLE AS old_log
+        FOR EACH STATEMENT EXECUTE FUNCTION pattern_tv_viewing_log_delete_rollup()
+    ''')
+
+def upgrade() -> None:
+
+    _replace_log_table(partitioned=True)
+
+    op.create_index('idx_pattern_tv_viewing_log_user_date_time', 'pattern_tv_viewing_log',
+                    ['user_pk', 'view_date', 'view_time'], unique=False)
+    op.create_index('idx_pattern_tv_viewing_log_view_date_brin', 'pattern_tv_viewing_log', ['view_date'],
+                    unique=False, postgresql_using='brin')
+
+def downgrade() -> None:
+
+    _replace_log_table(partitioned=False)
@@ -0,0 +1,107 @@
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '7b4d1f9a6c08'
+down_revision: Union[str, None] = '6a3c0e8f5b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+
+    op.execute('DROP TRIGGER scene_timestamp_actor_rollup ON scene_timestamp_actor')
+    op.execute('DROP FUNCTION scene_timestamp_actor_rollup()')
+
+    # COPY 로 링크를 대량 적재해도 (영상, 배우) 쌍마다 한 번만 다시 집계하도록 statement 단위 trigger
+    op.execute('''
+        CREATE FUNCTION scene_timestamp_actor_insert_rollup() RETURNS trigger AS $$
+        BEGIN
+            PERFORM scene_media_actor_refresh(p.scene_media_pk, p.scene_actor_pk)
+            FROM (
+                SELECT DISTINCT t.scene_media_pk, n.scene_actor_pk
+                FROM new_link n
+                JOIN scene_timestamp t ON t.pk = n.scene_timestamp_pk
+            ) p;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+    op.execute('''
+        CREATE FUNCTION scene_timestamp_actor_delete_rollup() RETURNS trigger AS $$
+        BEGIN
+            PERFORM scene_media_actor_refresh(p.scene_media_pk, p.scene_actor_pk)
+            FROM (
+                SELECT DISTINCT t.scene_media_pk, o.scene_actor_pk
+                FROM old_link o
+                JOIN scene_timestamp t ON t.pk = o.scene_timestamp_pk
+            ) p;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+    op.execute('''
+        CREATE FUNCTION scene_timestamp_actor_update_rollup() RETURNS trigger AS $$
+        BEGIN
+            PERFORM scene_media_actor_refresh(p.scene_media_pk, p.scene_actor_pk)
+            FROM (
+                SELECT t.scene_media_pk, o.scene_actor_pk
+                FROM old_link o
+                JOIN scene_timestamp t ON t.pk = o.scene_timestamp_pk
+                UNION
+                SELECT t.scene_media_pk, n.scene_actor_pk
+                FROM new_link n
+                JOIN scene_timestamp t ON t.pk = n.scene_timestamp_pk
+            ) p;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+
+    op.execute('''
+        CREATE TRIGGER scene_timestamp_actor_insert_rollup
+        AFTER INSERT ON scene_timestamp_actor
+        REFERENCING NEW TABLE AS new_link
+        FOR EACH STATEMENT EXECUTE FUNCTION scene_timestamp_actor_insert_rollup()
+    ''')
+    op.execute('''
+        CREATE TRIGGER scene_timestamp_actor_delete_rollup
+        AFTER DELETE ON scene_timestamp_actor
+        REFERENCING OLD TABLE AS old_link
+        FOR EACH STATEMENT EXECUTE FUNCTION scene_timestamp_actor_delete_rollup()
+    ''')
+    op.execute('''
+        CREATE TRIGGER scene_timestamp_actor_update_rollup
+        AFTER UPDATE ON scene_timestamp_actor
+        REFERENCING OLD TABLE AS old_link NEW TABLE AS new_link
+        FOR EACH STATEMENT EXECUTE FUNCTION scene_timestamp_actor_update_rollup()
+    ''')
+
+def downgrade() -> None:
+
+    op.execute('DROP TRIGGER scene_timestamp_actor_update_rollup ON scene_timestamp_actor')
+    op.execute('DROP TRIGGER scene_timestamp_actor_delete_rollup ON scene_timestamp_actor')
+    op.execute('DROP TRIGGER scene_timestamp_actor_insert_rollup ON scene_timestamp_actor')
+    op.execute('DROP FUNCTION scene_timestamp_actor_update_rollup()')
+    op.execute('DROP FUNCTION scene_timestamp_actor_delete_rollup()')
+    op.execute('DROP FUNCTION scene_timestamp_actor_insert_rollup()')
+
+    op.execute('''
+        CREATE FUNCTION scene_timestamp_actor_rollup() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                PERFORM scene_media_actor_refresh(t.scene_media_pk, OLD.scene_actor_pk)
+                FROM scene_timestamp t WHERE t.pk = OLD.scene_timestamp_pk;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM scene_media_actor_refresh(t.scene_media_pk, NEW.scene_actor_pk)
+                FROM scene_timestamp t WHERE t.pk = NEW.scene_timestamp_pk;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+    op.execute('''
+        CREATE TRIGGER scene_timestamp_actor_rollup
+        AFTER INSERT OR UPDATE OR DELETE ON scene_timestamp_actor
+        FOR EACH ROW EXECUTE FUNCTION scene_timestamp_actor_rollup()
+    ''')
@@ -0,0 +1,18 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '8c5e2a0d7f19'
+down_revision: Union[str, None] = '7b4d1f9a6c08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+
+    op.add_column('scene_media', sa.Column('source_stat', sa.String(length=64), nullable=True,
+                                           comment='원본 JSON 과 파일들의 크기, mtime 의 sha256'))
+
+def downgrade() -> None:
+
+    op.drop_column('scene_media', 'source_stat')
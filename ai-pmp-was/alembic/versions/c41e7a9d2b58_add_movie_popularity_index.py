@@ -0,0 +1,14 @@
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'c41e7a9d2b58'
+down_revision: Union[str, None] = '6f69205f9173'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_index('idx_movie_popularity_pk', 'movie', ['popularity', 'pk'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('idx_movie_popularity_pk', table_name='movie')
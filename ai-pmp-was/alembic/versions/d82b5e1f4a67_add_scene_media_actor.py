@@ -0,0 +1,104 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'd82b5e1f4a67'
+down_revision: Union[str, None] = 'c41e7a9d2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+
+    op.create_table('scene_media_actor',
+    sa.Column('scene_media_pk', sa.Integer(), nullable=False, comment='영상 FK'),
+    sa.Column('scene_actor_pk', sa.Integer(), nullable=False, comment='배우 FK'),
+    sa.Column('display_class', sa.String(length=100), nullable=False, comment='표시 클래스'),
+    sa.Column('timestamp_count', sa.Integer(), nullable=False, comment='등장 타임스탬프 수'),
+    sa.Column('first_start_frame', sa.Integer(), nullable=False, comment='첫 등장 프레임'),
+    sa.ForeignKeyConstraint(['scene_actor_pk'], ['scene_actor.pk'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['scene_media_pk'], ['scene_media.pk'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('scene_media_pk', 'scene_actor_pk', 'display_class'),
+    comment='Scene - 영상별 배우 집계 (scene_timestamp_actor trigger 로 유지)'
+    )
+    op.create_index('idx_scene_media_actor_actor', 'scene_media_actor', ['scene_actor_pk'], unique=False)
+    op.create_index('idx_scene_media_actor_display_class', 'scene_media_actor', ['display_class', 'scene_actor_pk'],
+                    unique=False)
+
+    op.execute('''
+        CREATE FUNCTION scene_media_actor_refresh(p_scene_media_pk integer, p_scene_actor_pk integer)
+        RETURNS void AS $$
+        BEGIN
+            DELETE FROM scene_media_actor
+            WHERE scene_media_pk = p_scene_media_pk AND scene_actor_pk = p_scene_actor_pk;
+
+            INSERT INTO scene_media_actor
+                (scene_media_pk, scene_actor_pk, display_class, timestamp_count, first_start_frame)
+            SELECT t.scene_media_pk, a.scene_actor_pk, t.display_class, count(*), min(t.start_frame)
+            FROM scene_timestamp_actor a
+            JOIN scene_timestamp t ON t.pk = a.scene_timestamp_pk
+            WHERE t.scene_media_pk = p_scene_media_pk AND a.scene_actor_pk = p_scene_actor_pk
+            GROUP BY t.scene_media_pk, a.scene_actor_pk, t.display_class;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+
+    op.execute('''
+        CREATE FUNCTION scene_timestamp_actor_rollup() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                PERFORM scene_media_actor_refresh(t.scene_media_pk, OLD.scene_actor_pk)
+                FROM scene_timestamp t WHERE t.pk = OLD.scene_timestamp_pk;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM scene_media_actor_refresh(t.scene_media_pk, NEW.scene_actor_pk)
+                FROM scene_timestamp t WHERE t.pk = NEW.scene_timestamp_pk;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+    op.execute('''
+        CREATE TRIGGER scene_timestamp_actor_rollup
+        AFTER INSERT OR UPDATE OR DELETE ON scene_timestamp_actor
+        FOR EACH ROW EXECUTE FUNCTION scene_timestamp_actor_rollup()
+    ''')
+
+    op.execute('''
+        CREATE FUNCTION scene_timestamp_rollup() RETURNS trigger AS $$
+        BEGIN
+            PERFORM scene_media_actor_refresh(OLD.scene_media_pk, a.scene_actor_pk)
+            FROM scene_timestamp_actor a WHERE a.scene_timestamp_pk = OLD.pk;
+            IF NEW.scene_media_pk <> OLD.scene_media_pk THEN
+                PERFORM scene_media_actor_refresh(NEW.scene_media_pk, a.scene_actor_pk)
+                FROM scene_timestamp_actor a WHERE a.scene_timestamp_pk = NEW.pk;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+    op.execute('''
+        CREATE TRIGGER scene_timestamp_rollup
+        AFTER UPDATE OF scene_media_pk, start_frame, display_class ON scene_timestamp
+        FOR EACH ROW EXECUTE FUNCTION scene_timestamp_rollup()
+    ''')
+
+    op.execute('''
+        INSERT INTO scene_media_actor
+            (scene_media_pk, scene_actor_pk, display_class, timestamp_count, first_start_frame)
+        SELECT t.scene_media_pk, a.scene_actor_pk, t.display_class, count(*), min(t.start_frame)
+        FROM scene_timestamp_actor a
+        JOIN scene_timestamp t ON t.pk = a.scene_timestamp_pk
+        GROUP BY t.scene_media_pk, a.scene_actor_pk, t.display_class
+    ''')
+
+def downgrade() -> None:
+
+    op.execute('DROP TRIGGER scene_timestamp_rollup ON scene_timestamp')
+    op.execute('DROP FUNCTION scene_timestamp_rollup()')
+    op.execute('DROP TRIGGER scene_timestamp_actor_rollup ON scene_timestamp_actor')
+    op.execute('DROP FUNCTION scene_timestamp_actor_rollup()')
+    op.execute('DROP FUNCTION scene_media_actor_refresh(integer, integer)')
+    op.drop_index('idx_scene_media_actor_display_class', table_name='scene_media_actor')
+    op.drop_index('idx_scene_media_actor_actor', table_name='scene_media_actor')
+    op.drop_table('scene_media_actor')
@@ -0,0 +1,20 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'e5a9c3f70b12'
+down_revision: Union[str, None] = 'd82b5e1f4a67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.create_index('idx_scene_timestamp_frame_range', 'scene_timestamp',
+                    ['scene_media_pk', sa.text("int4range(start_frame, end_frame, '[]')")],
+                    unique=False, postgresql_using='gist')
+
+def downgrade() -> None:
+
+    op.drop_index('idx_scene_timestamp_frame_range', table_name='scene_timestamp')
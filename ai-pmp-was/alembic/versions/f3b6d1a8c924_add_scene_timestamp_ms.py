@@ -0,0 +1,31 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'f3b6d1a8c924'
+down_revision: Union[str, None] = 'e5a9c3f70b12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def _timestamp_ms_sql(column: str) -> str:
+    return f"(split_part({column}, ':', 1)::integer * 3600000 + split_part({column}, ':', 2)::integer * 60000 " \
+           f"+ round(split_part({column}, ':', 3)::numeric * 1000)::integer)"
+
+def upgrade() -> None:
+
+    # generated column 이라 ALTER 시 한 번에 채워지고 이후 INSERT/UPDATE 때 자동 계산된다
+    op.add_column('scene_timestamp', sa.Column('start_ms', sa.Integer(),
+                                               sa.Computed(_timestamp_ms_sql('start_timestamp'), persisted=True),
+                                               nullable=False, comment='시작 시간 (ms)'))
+    op.add_column('scene_timestamp', sa.Column('end_ms', sa.Integer(),
+                                               sa.Computed(_timestamp_ms_sql('end_timestamp'), persisted=True),
+                                               nullable=False, comment='종료 시간 (ms)'))
+    op.create_index('idx_scene_timestamp_media_start_ms', 'scene_timestamp', ['scene_media_pk', 'start_ms'],
+                    unique=False)
+
+def downgrade() -> None:
+
+    op.drop_index('idx_scene_timestamp_media_start_ms', table_name='scene_timestamp')
+    op.drop_column('scene_timestamp', 'end_ms')
+    op.drop_column('scene_timestamp', 'start_ms')
@@ -0,0 +1,45 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from typing import cast
+
+import numpy as np
+from sqlalchemy import Table
+
+from ex.sqlalchemy_ex import pg_replace
+from was import config
+from was.application import app
+from was.model import db
+from was.model.pattern import PatternUserRecommendation
+from was.model.user import User
+from was.pattern.batch import genre_probability_matrix, recommend_all
+from was.pattern.timetable import build_timetable
+
+def main(args: list[str]) -> None:
+    seed = int(args[0]) if args else config.PATTERN_BATCH_SEED
+
+    with app.app_context():
+        users = list(db.session.execute(db.select(User).order_by(User.pk)).scalars())
+        user_pks = np.array([user.pk for user in users], dtype=np.int64)
+        timetable = build_timetable()
+
+        print(f'weights {len(users)} users ... ', flush=True, end='')
+        started_at = time.monotonic()
+        probs = genre_probability_matrix(users)
+        print(f'done ({time.monotonic() - started_at:.1f}s)')
+
+        print(f'recommend {len(users)} users x {len(timetable.groups)} slots (seed {seed}) ... ', flush=True, end='')
+        started_at = time.monotonic()
+        rows = recommend_all(timetable, user_pks, probs, np.random.default_rng(seed), config.PATTERN_BATCH_BLOCK_SIZE)
+        copied = pg_replace(db.session, cast(Table, PatternUserRecommendation.__table__),
+                            ['user_pk', 'day_of_week', 'time', 'rank', 'channel', 'program_pk', 'score'], rows)
+        db.session.commit()
+        elapsed = time.monotonic() - started_at
+        print(f'done ({copied} rows, {elapsed:.1f}s, '
+              f'{len(users) * len(timetable.groups) / max(elapsed, 1e-9):.0f} user-slots/s)')
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
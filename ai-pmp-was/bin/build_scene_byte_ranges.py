@@ -0,0 +1,75 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import requests
+
+from was.application import app
+from was.cache import scene_stamp
+from was.model import db
+from was.model.asset import Asset
+from was.model.scene import SceneMedia, SceneTimestamp
+from was.scene.mp4 import HttpRangeReader, VideoTrack, find_moov, parse_video_track
+
+def main(args: list[str]) -> None:
+    force = '--force' in args
+    media_pks = [int(arg) for arg in args if arg != '--force']
+
+    with app.app_context(), requests.Session() as session:
+        q = db.select(SceneMedia.pk, Asset.url) \
+            .join(Asset, SceneMedia.video_asset_pk == Asset.pk) \
+            .order_by(SceneMedia.pk)
+        if media_pks:
+            q = q.filter(SceneMedia.pk.in_(media_pks))
+        if not force:
+            q = q.filter(SceneMedia.moov_byte_start.is_(None))
+
+        failed = 0
+        for media_pk, url in db.session.execute(q).all():
+            print(f'media {media_pk} ... ', flush=True, end='')
+            started_at = time.monotonic()
+            try:
+                track, timestamp_count = _build_byte_ranges(media_pk, url, session)
+            except Exception as e:
+                # 파일 하나가 깨져도 나머지 영상은 계속 처리한다
+                db.session.rollback()
+                failed += 1
+                print(f'failed ({type(e).__name__}: {e})')
+                continue
+
+            print(f'done ({len(track.sample_sizes)} samples, {len(track.sync_samples)} keyframes, '
+                  f'{timestamp_count} timestamps, {time.monotonic() - started_at:.1f}s)')
+
+        print(f'done ({failed} failed)')
+
+    scene_stamp.bump()
+
+def _build_byte_ranges(media_pk: int, url: str, session: requests.Session) -> tuple[VideoTrack, int]:
+    reader = HttpRangeReader(url, session)
+    moov_start, moov_end = find_moov(reader)
+    track = parse_video_track(reader.read(moov_start, moov_end - moov_start))
+
+    timestamps = db.session.execute(
+        db.select(SceneTimestamp.pk, SceneTimestamp.start_ms, SceneTimestamp.end_ms)
+        .filter(SceneTimestamp.scene_media_pk == media_pk)
+    ).all()
+
+    rows = []
+    for pk, start_ms, end_ms in timestamps:
+        byte_start, byte_end = track.byte_range(start_ms, end_ms)
+        rows.append({'pk': pk, 'byte_start': byte_start, 'byte_end': byte_end})
+    if rows:
+        db.session.execute(db.update(SceneTimestamp), rows)
+
+    db.session.execute(
+        db.update(SceneMedia).filter(SceneMedia.pk == media_pk)
+        .values(moov_byte_start=moov_start, moov_byte_end=moov_end - 1)
+    )
+    db.session.commit()
+    return track, len(rows)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,94 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any
+
+from sqlalchemy.orm import aliased
+
+from was import config
+from was.application import app
+from was.cache import scene_stamp
+from was.model import db
+from was.model.asset import Asset
+from was.model.scene import SceneMedia, SceneTimestamp
+from was.scene.sprite import SpriteSheet, build_sprite
+
+def main(args: list[str]) -> None:
+    force = '--force' in args
+    media_pks = [int(arg) for arg in args if arg != '--force']
+
+    with app.app_context():
+        thumbnails = _thumbnails(media_pks, force)
+        client = Asset.s3_client()
+
+        print(f'build {len(thumbnails)} sprite sheets ... ', flush=True)
+        started_at = time.monotonic()
+
+        with ProcessPoolExecutor(max_workers=config.SCENE_SPRITE_WORKERS or None) as executor:
+            futures = {
+                executor.submit(build_sprite, media_thumbnails, config.SCENE_SPRITE_TILE_WIDTH,
+                                config.SCENE_SPRITE_TILE_HEIGHT, config.SCENE_SPRITE_COLUMNS,
+                                config.SCENE_SPRITE_MAX_ROWS, config.SCENE_SPRITE_QUALITY): media_pk
+                for media_pk, media_thumbnails in thumbnails.items()
+            }
+
+            failed = 0
+            for future in as_completed(futures):
+                media_pk = futures[future]
+                try:
+                    _save_sprite(media_pk, future.result(), client)
+                except Exception as e:
+                    # 영상 하나가 실패해도 나머지는 계속 만든다
+                    db.session.rollback()
+                    failed += 1
+                    print(f'  media {media_pk} ... failed ({type(e).__name__}: {e})')
+
+        print(f'done ({failed} failed, {time.monotonic() - started_at:.1f}s)')
+
+    scene_stamp.bump()
+
+def _save_sprite(media_pk: int, sprite: SpriteSheet | None, client: Any) -> None:
+    if not sprite:
+        print(f'  media {media_pk} ... skip (no thumbnail)')
+        return
+
+    assets = [
+        Asset.new_(f'sprite_{media_pk}_{i}.jpg', 'image/jpeg', io.BytesIO(image), client)
+        for i, image in enumerate(sprite.images)
+    ]
+    db.session.add_all(assets)
+    db.session.flush()
+
+    media = db.session.get_one(SceneMedia, media_pk)
+    media.sprite_asset = assets[0]
+    media.sprite_manifest = {**sprite.manifest, 'sheet_asset_pks': [asset.pk for asset in assets]}
+    db.session.commit()
+
+    missing = sprite.manifest['missing_timestamp_pks']
+    print(f'  media {media_pk} ... done ({len(sprite.manifest["tiles"])} tiles, {len(missing)} missing, '
+          f'{len(assets)} sheets, {sum(map(len, sprite.images))} bytes)')
+
+def _thumbnails(media_pks: list[int], force: bool) -> dict[int, list[tuple[int, str]]]:
+    thumbnail_asset = aliased(Asset)
+
+    q = db.select(SceneTimestamp.scene_media_pk, SceneTimestamp.pk, thumbnail_asset.url) \
+        .join(thumbnail_asset, SceneTimestamp.thumbnail_asset_pk == thumbnail_asset.pk) \
+        .join(SceneMedia, SceneMedia.pk == SceneTimestamp.scene_media_pk) \
+        .order_by(SceneTimestamp.scene_media_pk, SceneTimestamp.start_frame, SceneTimestamp.pk)
+    if media_pks:
+        q = q.filter(SceneTimestamp.scene_media_pk.in_(media_pks))
+    if not force:
+        q = q.filter(SceneMedia.sprite_asset_pk.is_(None))
+
+    thumbnails: dict[int, list[tuple[int, str]]] = {}
+    for media_pk, timestamp_pk, url in db.session.execute(q):
+        thumbnails.setdefault(media_pk, []).append((timestamp_pk, url))
+    return thumbnails
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,50 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from pathlib import Path
+
+from sqlalchemy import func
+from sqlalchemy.orm import InstrumentedAttribute
+
+from was import config
+from was.application import app
+from was.cache import movie_recommend_stamp
+from was.model import db
+from was.model.movie import MovieSimilarity, MovieLensTMDBSimilarity
+from was.recommend.similarity_index import write_index, movie_similarity_index, movielens_similarity_index
+
+def main() -> None:
+    k = config.RECOMMEND_INDEX_TOP_K
+
+    with app.app_context():
+        stamp_version = movie_recommend_stamp.current()
+
+        _build(movie_similarity_index.path, k, stamp_version,
+               MovieSimilarity.source_movie_pk, MovieSimilarity.target_movie_pk, MovieSimilarity.similarity_score)
+        _build(movielens_similarity_index.path, k, stamp_version,
+               MovieLensTMDBSimilarity.movielens_movie_id, MovieLensTMDBSimilarity.tmdb_movie_pk,
+               MovieLensTMDBSimilarity.similarity_score)
+
+def _build(path: Path, k: int, stamp_version: int,
+           source: InstrumentedAttribute[int], target: InstrumentedAttribute[int],
+           score: InstrumentedAttribute[float]) -> None:
+    print(f'build {path.name} ... ', flush=True, end='')
+    started_at = time.monotonic()
+
+    rank = func.row_number().over(partition_by=source, order_by=(score.desc(), target)).label('rank')
+    ranked_q = db.select(source.label('source'), target.label('target'), score.label('score'), rank).subquery()
+    q = db.select(ranked_q.c.source, ranked_q.c.target, ranked_q.c.score) \
+        .filter(ranked_q.c.rank <= k) \
+        .order_by(ranked_q.c.source, ranked_q.c.rank) \
+        .execution_options(yield_per=10000)
+
+    rows = ((s, t, sc) for s, t, sc in db.session.execute(q))
+    n_sources, n_neighbors = write_index(path, rows, k, stamp_version)
+
+    print(f'done ({n_sources} sources, {n_neighbors} neighbors, {time.monotonic() - started_at:.1f}s)')
+
+if __name__ == '__main__':
+    main()
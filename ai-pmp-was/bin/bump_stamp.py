@@ -0,0 +1,14 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from was.cache import stamps
+
+def main(names: list[str]) -> None:
+    for name in names or list(stamps.keys()):
+        stamps[name].bump()
+        print(f'bump {name} ... done')
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,116 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from typing import Iterator, cast
+
+from sqlalchemy import Table
+
+from ex.sqlalchemy_ex import pg_replace
+from was import config
+from was.application import app
+from was.cache import movie_recommend_stamp
+from was.model import db
+from was.model.movie import Movie, MovieGenreMaster, MovieLensMovie, MovieSimilarity, MovieLensTMDBSimilarity, \
+    movie_genre
+from was.recommend import similarity
+from was.recommend.similarity import SimilarityFeatures
+
+_MOVIELENS_GENRE_ALIASES = {
+    "Children's": 'Family',
+    'Children': 'Family',
+    'Sci-Fi': 'Science Fiction',
+    'Musical': 'Music',
+    'Film-Noir': 'Crime',
+}
+
+_COLUMNS = ['similarity_score', 'title_similarity', 'genre_similarity', 'year_similarity']
+
+def main(targets: list[str]) -> None:
+    targets = targets or ['movie', 'movielens']
+
+    with app.app_context():
+        vocabulary = {name: i for i, name in enumerate(
+            db.session.execute(db.select(MovieGenreMaster.name_en).order_by(MovieGenreMaster.pk)).scalars()
+        )}
+
+        movie_pks, movie_titles, movie_genres, movie_years = _tmdb_movies()
+        lens_ids, lens_titles, lens_genres, lens_years = _movielens_movies()
+
+        vectorizer = similarity.title_vectorizer(movie_titles + lens_titles)
+        movie_features = similarity.features(vectorizer, vocabulary, movie_titles, movie_genres, movie_years)
+
+        if 'movie' in targets:
+            _replace(MovieSimilarity, ['source_movie_pk', 'target_movie_pk'],
+                     movie_pks, movie_features, movie_pks, movie_features, exclude_self=True)
+
+        if 'movielens' in targets:
+            lens_features = similarity.features(vectorizer, vocabulary, lens_titles, lens_genres, lens_years)
+            _replace(MovieLensTMDBSimilarity, ['movielens_movie_id', 'tmdb_movie_pk'],
+                     lens_ids, lens_features, movie_pks, movie_features, exclude_self=False)
+
+    movie_recommend_stamp.bump()
+
+def _tmdb_movies() -> tuple[list[int], list[str], list[list[str]], list[int | None]]:
+    rows = db.session.execute(
+        db.select(Movie.pk, Movie.title_en, Movie.release_date).order_by(Movie.pk)
+    ).all()
+
+    genres: dict[int, list[str]] = {}
+    genre_q = db.select(movie_genre.c.movie_pk, MovieGenreMaster.name_en) \
+        .join(MovieGenreMaster, MovieGenreMaster.pk == movie_genre.c.movie_genre_master_pk)
+    for movie_pk, name in db.session.execute(genre_q):
+        genres.setdefault(movie_pk, []).append(name)
+
+    return (
+        [pk for pk, _, _ in rows],
+        [title for _, title, _ in rows],
+        [genres.get(pk, []) for pk, _, _ in rows],
+        [_year(release_date[:4]) for _, _, release_date in rows],
+    )
+
+def _movielens_movies() -> tuple[list[int], list[str], list[list[str]], list[int | None]]:
+    rows = db.session.execute(
+        db.select(MovieLensMovie.movie_id, MovieLensMovie.title_clean, MovieLensMovie.genres, MovieLensMovie.year)
+        .order_by(MovieLensMovie.movie_id)
+    ).all()
+
+    return (
+        [movie_id for movie_id, _, _, _ in rows],
+        [title for _, title, _, _ in rows],
+        [[_MOVIELENS_GENRE_ALIASES.get(g, g) for g in genres.split('|')] for _, _, genres, _ in rows],
+        [_year(year) for _, _, _, year in rows],
+    )
+
+def _year(value: str | None) -> int | None:
+    return int(value) if value and value.isdigit() else None
+
+def _replace(model: type[MovieSimilarity] | type[MovieLensTMDBSimilarity], key_columns: list[str],
+             source_keys: list[int], source: SimilarityFeatures,
+             target_keys: list[int], target: SimilarityFeatures, exclude_self: bool) -> None:
+    print(f'compute {model.__tablename__} ... ', flush=True, end='')
+    started_at = time.monotonic()
+
+    def rows() -> Iterator[tuple[int, int, float, float, float, float]]:
+        blocks = similarity.top_k(source, target, config.SIMILARITY_TOP_K, config.SIMILARITY_BLOCK_SIZE,
+                                  exclude_self=exclude_self)
+        for block in blocks:
+            yield from zip(
+                [source_keys[i] for i in block.source_index.tolist()],
+                [target_keys[i] for i in block.target_index.tolist()],
+                block.score.tolist(),
+                block.title.tolist(),
+                block.genre.tolist(),
+                block.year.tolist(),
+            )
+
+    copied = pg_replace(db.session, cast(Table, model.__table__), key_columns + _COLUMNS, rows())
+    db.session.commit()
+
+    elapsed = time.monotonic() - started_at
+    print(f'done ({len(source_keys)} sources, {copied} rows, {len(source_keys) / max(elapsed, 1e-9):.0f} sources/s)')
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
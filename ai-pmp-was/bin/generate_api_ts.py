@@ -18,7 +18,9 @@ def main(_app: ApiBlueprint) -> None:
 
     schemas = _app.export_api_schema()
 
-    schema_names = sorted(set(flatten([i.req.__name__, i.res_data.__name__] for i in schemas)))
+    schema_names = sorted(set(flatten(
+        [i.req.__name__, i.res_data.__name__] + ([i.stream_item.__name__] if i.stream_item else []) for i in schemas
+    )))
     print(f"import {'{' + ','.join(schema_names) + '}'} from './schema.g';")
 
     print("import {ApiBase} from './apiBase';")
@@ -27,6 +29,12 @@ def main(_app: ApiBlueprint) -> None:
     print(f'export class Api extends ApiBase {{')
     for schema in schemas:
         url = url_for(_app.name + '.' + schema.endpoint)
+        if schema.stream_item:
+            print(
+                f"\treadonly {camelcase(schema.endpoint)} = "
+                f"this.s<{schema.req.__name__}, {schema.res_data.__name__}, {schema.stream_item.__name__}>('{url}');"
+            )
+            continue
         print(
             f"\treadonly {camelcase(schema.endpoint)} = "
             f"this.c<{schema.req.__name__}, {schema.res_data.__name__}>('{url}');"
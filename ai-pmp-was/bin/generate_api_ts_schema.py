@@ -23,7 +23,9 @@ def generate(_app: ApiBlueprint) -> None:
     print(f'// 자동생성 파일 수정 금지 - {os.path.basename(__file__)} {now()}')
     print('')
 
-    api_schemas = list(flatten([i.req, i.res_data] for i in _app.export_api_schema()))
+    api_schemas = list(flatten(
+        [i.req, i.res_data] + ([i.stream_item] if i.stream_item else []) for i in _app.export_api_schema()
+    ))
     models: set[Type[BaseModel | Enum]] = get_flat_models_from_models(api_schemas)
     models.add(ResStatus)
     models.add(Res)
@@ -0,0 +1,53 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csv
+import time
+from datetime import date
+from pathlib import Path
+from typing import cast
+
+from sqlalchemy import Table
+
+from ex.sqlalchemy_ex import pg_copy
+from was.application import app
+from was.cache import pattern_stamp
+from was.model import db
+from was.model.pattern import PatternTVViewingLog
+from was.pattern.partition import ensure_log_partitions
+
+# 시청 기록 CSV, 첫 줄은 header
+# user_pk,program_pk,quarter,view_date,view_time,day,channel
+# 1,10,Q1,2025-02-03,16:00,월요일,채널26
+
+_COLUMNS = ['user_pk', 'program_pk', 'quarter', 'view_date', 'view_time', 'day', 'channel']
+
+def main(args: list[str]) -> None:
+    with app.app_context():
+        for path in map(Path, args):
+            print(f'{path} ... ', flush=True, end='')
+            started_at = time.monotonic()
+
+            with open(path, newline='') as f:
+                rows = [[row[column] for column in _COLUMNS] for row in csv.DictReader(f)]
+            if not rows:
+                print('empty')
+                continue
+
+            view_dates = [date.fromisoformat(row[3]) for row in rows]
+            created = ensure_log_partitions(min(view_dates), max(view_dates))
+
+            # 부모 테이블로 COPY 해야 분기별 partition 으로 나뉘고 장르 집계 trigger 도 한 번에 돈다
+            copied = pg_copy(db.session, cast(Table, PatternTVViewingLog.__table__), _COLUMNS, rows)
+            db.session.commit()
+
+            elapsed = time.monotonic() - started_at
+            print(f'done ({copied} rows, {len(created)} new partitions, {elapsed:.1f}s, '
+                  f'{copied / max(elapsed, 1e-9):.0f} rows/s)')
+
+    pattern_stamp.bump()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,43 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date
+
+from sqlalchemy import text
+
+from was.application import app
+from was.model import db
+from was.pattern.partition import LOG_DEFAULT_PARTITION, drop_log_partitions_before, ensure_log_partitions, \
+    next_quarter, quarter_start
+from was.pattern.stat import rebuild_user_genre_stat
+
+def main(args: list[str]) -> None:
+    drop_before = date.fromisoformat(args[args.index('--drop-before') + 1]) if '--drop-before' in args else None
+
+    with app.app_context():
+        # default partition 에 쌓인 기록과 다음 분기까지 partition 을 만든다
+        first, last = db.session.execute(
+            text(f'SELECT min(view_date), max(view_date) FROM {LOG_DEFAULT_PARTITION}')
+        ).one()
+        today = date.today()
+        first = min(first or today, today)
+        last = max(last or today, next_quarter(quarter_start(today)))
+
+        for name in ensure_log_partitions(first, last):
+            print(f'create {name} ... done')
+
+        if drop_before:
+            dropped = drop_log_partitions_before(drop_before)
+            for name in dropped:
+                print(f'drop {name} ... done')
+
+            # partition drop 은 delete trigger 를 거치지 않는다
+            if dropped:
+                print(f'rebuild pattern_user_genre_stat ... done ({rebuild_user_genre_stat()} rows)')
+
+        db.session.commit()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
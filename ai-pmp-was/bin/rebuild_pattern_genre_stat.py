@@ -0,0 +1,23 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from was.application import app
+from was.model import db
+from was.pattern.stat import rebuild_user_genre_stat
+
+def main() -> None:
+    with app.app_context():
+        print('rebuild pattern_user_genre_stat ... ', flush=True, end='')
+        started_at = time.monotonic()
+
+        count = rebuild_user_genre_stat()
+        db.session.commit()
+
+        print(f'done ({count} rows, {time.monotonic() - started_at:.1f}s)')
+
+if __name__ == '__main__':
+    main()
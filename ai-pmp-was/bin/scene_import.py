@@ -0,0 +1,235 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import json
+import mimetypes
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Iterator, cast
+
+from sqlalchemy import Table
+from sqlalchemy.dialects.postgresql import insert
+
+from ex.sqlalchemy_ex import pg_copy
+from was import config
+from was.application import app
+from was.cache import scene_stamp
+from was.model import db
+from was.model.asset import Asset
+from was.model.scene import SceneMedia, SceneTimestamp, SceneActor, SceneCategory, scene_media_category, \
+    scene_timestamp_actor
+
+# 영상 하나당 JSON 하나, 파일 경로는 JSON 기준 상대 경로
+# {
+#   "title": "관상", "video": "관상.mov", "thumbnail": "관상.jpg", "categories": ["Conflict", "Movement"],
+#   "scenes": [{"scene_id": 1, "start_timestamp": "00:00:00.00", "end_timestamp": "00:00:30.89",
+#               "start_frame": 0, "end_frame": 1854, "majority_class": "drink", "category": "daily",
+#               "display_class": "Background", "thumbnail": "thumbnails/1.jpg", "actors": ["송강호"]}]
+# }
+
+_TIMESTAMP_COLUMNS = ['scene_id', 'start_timestamp', 'end_timestamp', 'start_frame', 'end_frame',
+                      'majority_class', 'category', 'display_class']
+
+def main(args: list[str]) -> None:
+    force = '--force' in args
+    paths = [Path(arg) for arg in args if arg != '--force']
+
+    client = Asset.s3_client()
+    counts = {'import': 0, 'skip': 0, 'failed': 0}
+    started_at = time.monotonic()
+
+    with app.app_context(), ThreadPoolExecutor(max_workers=config.SCENE_IMPORT_UPLOAD_WORKERS) as executor:
+        for path in _json_files(paths):
+            print(f'{path} ... ', flush=True, end='')
+            try:
+                result = _import_media(path, executor, client, force)
+            except Exception as e:
+                # 영상 하나가 실패해도 나머지는 계속 가져온다
+                db.session.rollback()
+                counts['failed'] += 1
+                print(f'failed ({type(e).__name__}: {e})')
+                continue
+            counts[result] += 1
+            print(result)
+
+    print(f'done ({counts["import"]} imported, {counts["skip"]} skipped, {counts["failed"]} failed, '
+          f'{time.monotonic() - started_at:.1f}s)')
+
+    if counts['import']:
+        scene_stamp.bump()
+
+def _json_files(paths: list[Path]) -> Iterator[Path]:
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(path.glob('*.json'))
+        else:
+            yield path
+
+def _import_media(path: Path, executor: ThreadPoolExecutor, client: Any, force: bool) -> str:
+    raw = path.read_bytes()
+    data = json.loads(raw)
+    scenes = data.get('scenes', [])
+
+    files = [data['video']] + ([data['thumbnail']] if data.get('thumbnail') else []) + \
+        [scene['thumbnail'] for scene in scenes if scene.get('thumbnail')]
+    file_paths = [path.parent / file for file in files]
+    source_stat = _source_stat(raw, file_paths)
+
+    source_key = path.name
+    media = db.session.execute(
+        db.select(SceneMedia).filter(SceneMedia.source_key == source_key)
+    ).scalar_one_or_none()
+    if media and media.source_stat == source_stat and not force:
+        return 'skip'
+
+    content_hash = _content_hash(raw, file_paths)
+    if media and media.content_hash == content_hash and not force:
+        # 내용은 그대로이고 mtime 만 바뀌었으면 stat 만 갱신한다
+        media.source_stat = source_stat
+        db.session.commit()
+        return 'skip'
+
+    uploads: dict[str, Future[Asset]] = {
+        file: executor.submit(_upload, path.parent / file, client) for file in dict.fromkeys(files)
+    }
+    try:
+        old_object_names = _save_media(media, source_key, data, uploads, content_hash, source_stat)
+    except Exception:
+        # DB 는 rollback 되므로 이번에 올린 파일도 지운다
+        wait(uploads.values())
+        _delete_objects([f.result().object_name for f in uploads.values() if f.exception() is None], client)
+        raise
+
+    # 새 파일로 commit 된 뒤에 이전 파일을 지운다
+    _delete_objects(old_object_names, client)
+    return 'import'
+
+def _save_media(media: SceneMedia | None, source_key: str, data: dict[str, Any], uploads: dict[str, Future[Asset]],
+                content_hash: str, source_stat: str) -> list[str]:
+    scenes = data.get('scenes', [])
+
+    category_pks = _upsert_names(SceneCategory, data.get('categories', []))
+    actor_pks = _upsert_names(SceneActor, [name for scene in scenes for name in scene.get('actors', [])])
+
+    old_asset_pks: set[int] = set()
+    if media:
+        old_asset_pks = _media_asset_pks(media)
+        old_timestamp_pks = db.select(SceneTimestamp.pk).filter(SceneTimestamp.scene_media_pk == media.pk)
+        db.session.execute(db.delete(scene_timestamp_actor)
+                           .where(scene_timestamp_actor.c.scene_timestamp_pk.in_(old_timestamp_pks)))
+        db.session.execute(db.delete(SceneTimestamp).where(SceneTimestamp.scene_media_pk == media.pk))
+        db.session.execute(db.delete(scene_media_category)
+                           .where(scene_media_category.c.scene_media_pk == media.pk))
+        db.session.expire(media)
+    else:
+        media = SceneMedia()
+        media.source_key = source_key
+        db.session.add(media)
+
+    assets = {file: future.result() for file, future in uploads.items()}
+    db.session.add_all(assets.values())
+
+    media.title = data['title']
+    media.video_asset = assets[data['video']]
+    media.thumbnail_asset = assets[data['thumbnail']] if data.get('thumbnail') else None
+    media.sprite_asset = None
+    media.sprite_manifest = None
+    media.moov_byte_start = None
+    media.moov_byte_end = None
+    media.content_hash = content_hash
+    media.source_stat = source_stat
+    db.session.flush()
+
+    if category_pks:
+        db.session.execute(insert(scene_media_category), [
+            {'scene_media_pk': media.pk, 'scene_category_pk': category_pks[name]}
+            for name in dict.fromkeys(data['categories'])
+        ])
+
+    if scenes:
+        timestamp_pks = db.session.execute(
+            insert(SceneTimestamp).returning(SceneTimestamp.pk, sort_by_parameter_order=True),
+            [
+                {
+                    **{column: scene[column] for column in _TIMESTAMP_COLUMNS},
+                    'scene_media_pk': media.pk,
+                    'thumbnail_asset_pk': assets[scene['thumbnail']].pk if scene.get('thumbnail') else None,
+                }
+                for scene in scenes
+            ]
+        ).scalars().all()
+
+        pg_copy(db.session, cast(Table, scene_timestamp_actor), ['scene_timestamp_pk', 'scene_actor_pk'], (
+            (timestamp_pk, actor_pks[name])
+            for timestamp_pk, scene in zip(timestamp_pks, scenes)
+            for name in dict.fromkeys(scene.get('actors', []))
+        ))
+
+    # 이전 import 의 영상, 썸네일, sprite 는 더 이상 참조되지 않는다
+    old_object_names = []
+    if old_asset_pks:
+        old_object_names = [
+            asset.object_name
+            for asset in db.session.execute(db.select(Asset).filter(Asset.pk.in_(old_asset_pks))).scalars()
+        ]
+        db.session.execute(db.delete(Asset).where(Asset.pk.in_(old_asset_pks)))
+
+    db.session.commit()
+    return old_object_names
+
+def _media_asset_pks(media: SceneMedia) -> set[int]:
+    pks = {media.video_asset_pk, media.thumbnail_asset_pk, media.sprite_asset_pk,
+           *(media.sprite_manifest or {}).get('sheet_asset_pks', [])}
+    pks.update(db.session.execute(
+        db.select(SceneTimestamp.thumbnail_asset_pk).filter(SceneTimestamp.scene_media_pk == media.pk)
+    ).scalars())
+    return {pk for pk in pks if pk is not None}
+
+def _delete_objects(object_names: list[str], client: Any) -> None:
+    if not object_names:
+        return
+    try:
+        Asset.delete_objects(object_names, client)
+    except Exception as e:
+        # 지우지 못한 파일은 남아도 import 결과에는 영향이 없다
+        print(f'({len(object_names)} files not deleted, {type(e).__name__}: {e}) ', end='')
+
+def _source_stat(raw: bytes, files: list[Path]) -> str:
+    # 크기와 mtime 이 그대로면 파일 내용을 다시 읽지 않는다
+    h = hashlib.sha256(raw)
+    for file in files:
+        stat = file.stat()
+        h.update(f'{file}\0{stat.st_size}\0{stat.st_mtime_ns}\0'.encode())
+    return h.hexdigest()
+
+def _content_hash(raw: bytes, files: list[Path]) -> str:
+    h = hashlib.sha256(raw)
+    for file in files:
+        with open(file, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                h.update(chunk)
+    return h.hexdigest()
+
+def _upload(path: Path, client: Any) -> Asset:
+    content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    with open(path, 'rb') as f:
+        return Asset.new_(path.name, content_type, f, client)
+
+def _upsert_names(model: type[SceneCategory] | type[SceneActor], names: list[str]) -> dict[str, int]:
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+
+    db.session.execute(
+        insert(model).values([{'name': name} for name in names]).on_conflict_do_nothing(index_elements=['name'])
+    )
+    return {
+        name: pk for pk, name in db.session.execute(db.select(model.pk, model.name).filter(model.name.in_(names)))
+    }
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,136 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dataclasses
+import time
+from typing import Iterator, cast
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import Table
+
+from ex.sqlalchemy_ex import pg_replace
+from was import config
+from was.application import app
+from was.cache import movie_recommend_stamp
+from was.model import db
+from was.model.movie import MovieRating, MovieLensTMDBSimilarity, MovieSimilarity, MoviePrediction
+from was.recommend.factorization import Factorization, fit_als, project_items, rmse
+from was.recommend.online import factor_store, save_factors
+
+def main() -> None:
+    with app.app_context():
+        user_pks, movie_ids, ratings = _ratings()
+
+        print(f'train {ratings.shape[0]} users x {ratings.shape[1]} movies ({ratings.nnz} ratings) ... ',
+              flush=True, end='')
+        started_at = time.monotonic()
+        factorization = fit_als(ratings, config.FACTORIZATION_RANK, config.FACTORIZATION_REG,
+                                config.FACTORIZATION_ITERATIONS)
+        elapsed = time.monotonic() - started_at
+        print(f'done (rmse {rmse(factorization, ratings):.4f}, {elapsed:.1f}s, '
+              f'{ratings.nnz * config.FACTORIZATION_ITERATIONS / max(elapsed, 1e-9):.0f} ratings/s)')
+
+        tmdb_pks, mapping = _tmdb_mapping(movie_ids)
+        tmdb_factorization = project_items(factorization, mapping)
+        mapped = np.asarray(mapping.sum(axis=1)).ravel() > 0
+
+        save_factors(factor_store.path, dataclasses.replace(
+            tmdb_factorization,
+            item_bias=tmdb_factorization.item_bias[mapped],
+            item_factors=tmdb_factorization.item_factors[mapped],
+        ), user_pks, tmdb_pks[mapped])
+
+        base_pks, candidates = _candidates(tmdb_pks, mapped)
+
+        print(f'score {len(user_pks)} users x {len(base_pks)} base movies ... ', flush=True, end='')
+        started_at = time.monotonic()
+        rows = _predictions(tmdb_factorization, user_pks, tmdb_pks, base_pks, candidates)
+        copied = pg_replace(db.session, cast(Table, MoviePrediction.__table__),
+                            ['user_pk', 'base_tmdb_movie_pk', 'recommended_tmdb_movie_pk', 'rating_predict'], rows)
+        db.session.commit()
+        elapsed = time.monotonic() - started_at
+        print(f'done ({copied} rows, {elapsed:.1f}s, {copied / max(elapsed, 1e-9):.0f} rows/s)')
+
+    movie_recommend_stamp.bump()
+
+def _ratings() -> tuple[np.ndarray, np.ndarray, sparse.csr_matrix]:
+    rows = np.array(db.session.execute(
+        db.select(MovieRating.user_pk, MovieRating.movie_pk, MovieRating.rating)
+    ).all(), dtype=np.float64).reshape(-1, 3)
+
+    user_pks, user_index = np.unique(rows[:, 0].astype(np.int64), return_inverse=True)
+    movie_ids, movie_index = np.unique(rows[:, 1].astype(np.int64), return_inverse=True)
+
+    ratings = sparse.csr_matrix((rows[:, 2], (user_index, movie_index)), shape=(len(user_pks), len(movie_ids)))
+    return user_pks, movie_ids, ratings
+
+def _tmdb_mapping(movie_ids: np.ndarray) -> tuple[np.ndarray, sparse.csr_matrix]:
+    rows = np.array(db.session.execute(
+        db.select(MovieLensTMDBSimilarity.tmdb_movie_pk, MovieLensTMDBSimilarity.movielens_movie_id,
+                  MovieLensTMDBSimilarity.similarity_score)
+    ).all(), dtype=np.float64).reshape(-1, 3)
+
+    movielens_ids = rows[:, 1].astype(np.int64)
+    movie_index = np.searchsorted(movie_ids, movielens_ids)
+    rated = (movie_index < len(movie_ids)) & (movie_ids[np.minimum(movie_index, len(movie_ids) - 1)] == movielens_ids)
+
+    tmdb_pks, tmdb_index = np.unique(rows[:, 0].astype(np.int64), return_inverse=True)
+    mapping = sparse.csr_matrix(
+        (rows[rated, 2], (tmdb_index[rated], movie_index[rated])),
+        shape=(len(tmdb_pks), len(movie_ids))
+    )
+    return tmdb_pks, mapping
+
+def _candidates(tmdb_pks: np.ndarray, mapped: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    rows = np.array(db.session.execute(
+        db.select(MovieSimilarity.source_movie_pk, MovieSimilarity.target_movie_pk)
+        .order_by(MovieSimilarity.source_movie_pk, MovieSimilarity.similarity_score.desc())
+    ).all(), dtype=np.int64).reshape(-1, 2)
+
+    target_index = np.searchsorted(tmdb_pks, rows[:, 1])
+    known = target_index < len(tmdb_pks)
+    known[known] = tmdb_pks[target_index[known]] == rows[known, 1]
+    known[known] = mapped[target_index[known]]
+    rows, target_index = rows[known], target_index[known]
+
+    base_pks, starts, counts = np.unique(rows[:, 0], return_index=True, return_counts=True)
+    width = int(counts.max()) if len(counts) else 0
+
+    # base 영화별 후보를 -1 로 채운 고정 폭 배열로 만든다
+    candidates = np.full((len(base_pks), width), -1, dtype=np.int64)
+    column = np.arange(len(rows)) - np.repeat(starts, counts)
+    candidates[np.repeat(np.arange(len(base_pks)), counts), column] = target_index
+    return base_pks, candidates
+
+def _predictions(factorization: Factorization, user_pks: np.ndarray, tmdb_pks: np.ndarray,
+                 base_pks: np.ndarray, candidates: np.ndarray) -> Iterator[tuple[int, int, int, float]]:
+    if not candidates.size:
+        return
+
+    top_n = min(config.PREDICTION_TOP_N, candidates.shape[1])
+    missing = candidates < 0
+    safe_candidates = np.where(missing, 0, candidates)
+
+    for start in range(0, len(user_pks), config.PREDICTION_BLOCK_SIZE):
+        end = min(start + config.PREDICTION_BLOCK_SIZE, len(user_pks))
+
+        scores = np.clip(factorization.scores(slice(start, end)), 0.0, 5.0)
+        candidate_scores = np.where(missing[None, :, :], -np.inf, scores[:, safe_candidates])
+
+        top = np.argpartition(-candidate_scores, top_n - 1, axis=2)[:, :, :top_n]
+        top_scores = np.take_along_axis(candidate_scores, top, axis=2)
+        top_movies = np.take_along_axis(np.broadcast_to(safe_candidates, candidate_scores.shape), top, axis=2)
+
+        users, bases, ranks = np.nonzero(np.isfinite(top_scores))
+        yield from zip(
+            user_pks[start + users].tolist(),
+            base_pks[bases].tolist(),
+            tmdb_pks[top_movies[users, bases, ranks]].tolist(),
+            top_scores[users, bases, ranks].tolist(),
+        )
+
+if __name__ == '__main__':
+    main()
@@ -7,10 +7,11 @@ from dataclasses import dataclass
 from enum import auto
 from functools import partial
 from types import GenericAlias
-from typing import TypeVar, Generic, Optional, List, Callable, Dict, Any, Type, get_type_hints, Set, Tuple
+from typing import TypeVar, Generic, Optional, List, Callable, Dict, Any, Type, get_type_hints, Set, Tuple, Iterable, \
+    Iterator
 
 import pydantic.generics
-from flask import Blueprint, Response, request, Flask, current_app
+from flask import Blueprint, Response, request, Flask, current_app, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from pydantic import ValidationError
 from stringcase import camelcase, spinalcase
@@ -45,9 +46,25 @@ class Res(BaseModel, Generic[RES_DATA]):
     validation_errors: list[dict[str, Any]]
     status: ResStatus
 
+class RawRes(Res):
+    body: bytes
+
+class StreamRes(Res):
+    items: Iterable[BaseModel]
+
 def ok(data: RES_DATA) -> Res[RES_DATA]:
     return Res(data=data, errors=[], validation_errors=[], status=ResStatus.OK)
 
+def ok_raw(body: bytes) -> Res[RES_DATA]:
+    return RawRes(body=body, errors=[], validation_errors=[], status=ResStatus.OK)
+
+def ok_snapshot(data: RES_DATA) -> RawRes:
+    return RawRes(body=ok(data).json(by_alias=True).encode(), errors=[], validation_errors=[], status=ResStatus.OK)
+
+# 첫 줄은 data 를 담은 Res, 이후 한 줄에 item 하나씩 보낸다 (application/x-ndjson)
+def ok_stream(data: RES_DATA, items: Iterable[BaseModel]) -> Res[RES_DATA]:
+    return StreamRes(data=data, items=items, errors=[], validation_errors=[], status=ResStatus.OK)
+
 def err(*errors: str) -> Res[RES_DATA]:
     return Res(errors=list(errors), validation_errors=[], status=ResStatus.OK)
 
@@ -90,7 +107,16 @@ class ApiBlueprint(Blueprint, Generic[API_PERMISSION]):
 
         return _decorated
 
-    def _api(self, f: API_ENDPOINT) -> API_ENDPOINT:
+    def stream_api(self, item: Type[BaseModel], *permissions: API_PERMISSION,
+                   public: bool = False) -> Callable[[API_ENDPOINT], API_ENDPOINT]:
+        def _decorated(f: API_ENDPOINT) -> API_ENDPOINT:
+            self._permissions[f] = permissions
+            self._public_endpoints[f] = public
+            return self._api(f, item)
+
+        return _decorated
+
+    def _api(self, f: API_ENDPOINT, stream_item: Type[BaseModel] | None = None) -> API_ENDPOINT:
         hints = get_type_hints(f)
 
         req_type: Optional[Type[BaseModel]] = hints.get('req', hints.get('_'))
@@ -109,7 +135,8 @@ class ApiBlueprint(Blueprint, Generic[API_PERMISSION]):
         self._end_points.add(endpoint)
 
         rule = f'{API_PREFIX}{spinalcase(endpoint)}'
-        self._api_schemas.append(ApiScheme(endpoint=endpoint, url=rule, req=req_type, res_data=res_data_type))
+        self._api_schemas.append(ApiScheme(endpoint=endpoint, url=rule, req=req_type, res_data=res_data_type,
+                                           stream_item=stream_item))
 
         self.add_url_rule(
             rule=rule,
@@ -173,16 +200,35 @@ class ApiBlueprint(Blueprint, Generic[API_PERMISSION]):
         else:
             res = Res(status=ResStatus.NO_PERMISSION, errors=[], validation_errors=[])
 
+        if isinstance(res, StreamRes):
+            return self._stream_response(res)
         return res_jsonify(res)
 
+    def _stream_response(self, res: StreamRes) -> Response:
+        ext: SQLAlchemy = self._app.extensions['sqlalchemy']
+
+        # items 는 응답을 보내면서 읽으므로, 다 보내거나 연결이 끊긴 뒤에 session 을 정리한다
+        def generate() -> Iterator[str]:
+            try:
+                yield res.json(by_alias=True, exclude={'items'}) + '\n'
+                for item in res.items:
+                    yield item.json(by_alias=True) + '\n'
+            finally:
+                ext.session.remove()
+
+        return current_app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @dataclass
 class ApiScheme:
     endpoint: str
     url: str
     req: Type[BaseModel]
     res_data: Type[BaseModel]
+    stream_item: Type[BaseModel] | None = None
 
 def res_jsonify(res: Res) -> Response:
+    if isinstance(res, RawRes):
+        return current_app.response_class(res.body)
 
     return current_app.response_class(
         res.json(by_alias=True)
@@ -0,0 +1,193 @@
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Generic, TypeVar, Callable, Iterable, Hashable, Dict, Any, Mapping
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+_MISSING: Any = object()
+
+class VersionStamp:
+    def __init__(self, path: Path, check_interval: float = 1.0) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._checked_at = 0.0
+        self._version = 0
+
+    def bump(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(str(time.time_ns()))
+        self._checked_at = 0.0
+
+    def current(self) -> int:
+        checked_at = time.monotonic()
+        if checked_at - self._checked_at >= self.check_interval:
+            try:
+                self._version = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                self._version = 0
+            self._checked_at = checked_at
+        return self._version
+
+class SnapshotStore:
+    # 여러 process 가 같이 읽는 on-disk bytes, stamp version 마다 directory 를 새로 쓴다
+    def __init__(self, path: Path, stamp: VersionStamp) -> None:
+        self.path = path
+        self.stamp = stamp
+
+    def _version_path(self) -> Path:
+        version = self.stamp.current()
+        version_path = self.path / str(version)
+        if not version_path.is_dir():
+            version_path.mkdir(parents=True, exist_ok=True)
+            # 아직 옛 stamp 를 보는 process 가 있을 수 있으므로 더 오래된 version 만 지운다
+            for old_path in self.path.iterdir():
+                if old_path.name.isdigit() and int(old_path.name) < version:
+                    shutil.rmtree(old_path, ignore_errors=True)
+        return version_path
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return (self._version_path() / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        path = self._version_path() / key
+        tmp_path = path.with_name(f'.{key}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            tmp_path.write_bytes(value)
+            os.replace(tmp_path, path)
+        except FileNotFoundError:
+            # 다른 process 가 새 version 으로 넘어가며 directory 를 지웠다
+            pass
+
+    def get_or_build(self, key: str, build: Callable[[], bytes]) -> bytes:
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.set(key, value)
+        return value
+
+caches: Dict[str, 'LRUCache'] = {}
+
+class LRUCache(Generic[K, V]):
+    def __init__(self, name: str, maxsize: int, ttl: float | None = None, stamp: VersionStamp | None = None) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stamp = stamp
+
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._items: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stamp_version = stamp.current() if stamp else 0
+
+        caches[name] = self
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.generation += 1
+
+    def _check_stamp(self) -> None:
+        if not self.stamp:
+            return
+        version = self.stamp.current()
+        if version != self._stamp_version:
+            self._stamp_version = version
+            self.invalidate()
+
+    def get(self, key: K, default: V) -> V:
+        self._check_stamp()
+        with self._lock:
+            value = self._get(key)
+        return default if value is _MISSING else value
+
+    def _get(self, key: K) -> V:
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return _MISSING
+
+        expire_at, value = item
+        if expire_at < time.monotonic():
+            del self._items[key]
+            self.misses += 1
+            return _MISSING
+
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._set(key, value)
+
+    def _set(self, key: K, value: V) -> None:
+        expire_at = time.monotonic() + self.ttl if self.ttl is not None else float('inf')
+        self._items[key] = (expire_at, value)
+        self._items.move_to_end(key)
+
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key: K, load: Callable[[], V]) -> V:
+        self._check_stamp()
+        with self._lock:
+            value = self._get(key)
+        if value is not _MISSING:
+            return value
+
+        generation = self.generation
+        value = load()
+        with self._lock:
+            if generation == self.generation:
+                self._set(key, value)
+        return value
+
+    def get_many(self, keys: Iterable[K], load: Callable[[list[K]], Mapping[K, V]], default: V) -> Dict[K, V]:
+        self._check_stamp()
+
+        values: Dict[K, V] = {}
+        missing: list[K] = []
+        with self._lock:
+            for key in keys:
+                value = self._get(key)
+                if value is _MISSING:
+                    missing.append(key)
+                else:
+                    values[key] = value
+
+        if not missing:
+            return values
+
+        generation = self.generation
+        loaded = load(missing)
+        with self._lock:
+            for key in missing:
+                value = loaded.get(key, default)
+                values[key] = value
+                if generation == self.generation:
+                    self._set(key, value)
+        return values
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'size': len(self._items),
+                'maxsize': self.maxsize,
+                'generation': self.generation,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
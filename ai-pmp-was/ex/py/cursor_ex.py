@@ -0,0 +1,13 @@
+import base64
+import binascii
+import struct
+from typing import Any
+
+def encode_cursor(fmt: struct.Struct, *values: Any) -> str:
+    return base64.urlsafe_b64encode(fmt.pack(*values)).decode()
+
+def decode_cursor(fmt: struct.Struct, cursor: str) -> tuple[Any, ...] | None:
+    try:
+        return fmt.unpack(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, struct.error, ValueError):
+        return None
@@ -1,8 +1,10 @@
-from itertools import count
-from typing import TypeVar, Generic, List, Union, Tuple, Callable
+import csv
+import io
+from itertools import count, islice
+from typing import TypeVar, Generic, List, Union, Tuple, Callable, Iterable, Any, Sequence
 
 from flask_sqlalchemy.session import Session
-from sqlalchemy import func, or_, and_, text, Index
+from sqlalchemy import func, or_, and_, text, Index, MetaData, Table
 from sqlalchemy.orm import scoped_session
 
 from sqlalchemy.sql import ColumnElement
@@ -93,5 +95,89 @@ def pg_try_xlock2(session: Session | scoped_session[Session], group_id: int, loc
         {'group_id': group_id, 'lock_id': lock_id}
     )
 
+def pg_copy(session: Session | scoped_session[Session], table: Table, columns: Sequence[str],
+            rows: Iterable[Sequence[Any]], batch_size: int = 100_000) -> int:
+    preparer = session.get_bind().dialect.identifier_preparer
+    cursor = session.connection().connection.cursor()
+    statement = f'COPY {preparer.format_table(table)} ({", ".join(map(preparer.quote, columns))}) ' \
+                f'FROM STDIN WITH (FORMAT csv)'
+
+    copied = 0
+    it = iter(rows)
+    while batch := list(islice(it, batch_size)):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        copied += len(batch)
+    return copied
+
+def _pg_indexes(session: Session | scoped_session[Session], table_name: str) -> list[tuple[str, str]]:
+    # (index 이름, 이름을 뺀 정의), LIKE ... INCLUDING ALL 로 복사된 index 를 원래 이름에 짝짓는 데 쓴다
+    rows = session.execute(text('''
+        SELECT c.relname, i.indisunique, i.indisprimary, regexp_replace(pg_get_indexdef(i.indexrelid), '^.* USING ', '')
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = CAST(:table AS regclass)
+        ORDER BY c.relname
+    '''), {'table': table_name})
+    return [(name, f'{unique} {primary} {definition}') for name, unique, primary, definition in rows]
+
+def pg_replace(session: Session | scoped_session[Session], table: Table, columns: Sequence[str],
+               rows: Iterable[Sequence[Any]], batch_size: int = 100_000) -> int:
+    # 같은 모양의 staging 테이블에 COPY 한 뒤 짧은 transaction 안에서 이름을 바꿔 끼운다
+    # 읽는 쪽은 swap 순간에만 잠깐 기다리고, 이전 테이블은 통째로 지우므로 dead tuple 이 남지 않는다
+    # 중간에 commit 하므로 호출 전의 변경도 같이 commit 된다
+    preparer = session.get_bind().dialect.identifier_preparer
+    name = table.name
+    staging_name = f'{name}_staging'
+    quoted = preparer.quote(name)
+    quoted_staging = preparer.quote(staging_name)
+
+    session.execute(text(f'DROP TABLE IF EXISTS {quoted_staging}'))
+    session.execute(text(f'CREATE TABLE {quoted_staging} (LIKE {quoted} INCLUDING ALL)'))
+    copied = pg_copy(session, Table(staging_name, MetaData(), schema=table.schema), columns, rows, batch_size)
+
+    # LIKE 는 foreign key 와 테이블 comment 를 복사하지 않는다, 적재 뒤에 한 번에 검증한다
+    foreign_keys = session.execute(text('''
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'
+    '''), {'table': name})
+    for constraint_name, definition in foreign_keys.all():
+        session.execute(text(
+            f'ALTER TABLE {quoted_staging} ADD CONSTRAINT {preparer.quote(constraint_name)} {definition}'
+        ))
+    if (comment := session.scalar(text("SELECT obj_description(CAST(:table AS regclass), 'pg_class')"),
+                                  {'table': name})) is not None:
+        session.execute(text(f'COMMENT ON TABLE {quoted_staging} IS :comment').bindparams(comment=comment))
+    session.execute(text(f'ANALYZE {quoted_staging}'))
+    session.commit()
+
+    session.execute(text(f'LOCK TABLE {quoted} IN ACCESS EXCLUSIVE MODE'))
+    indexes = _pg_indexes(session, name)
+    staging_indexes = _pg_indexes(session, staging_name)
+
+    # serial 의 sequence 는 이전 테이블 소유라 같이 지워지지 않도록 넘긴다
+    owned_sequences = session.execute(text('''
+        SELECT s.oid::regclass::text, a.attname FROM pg_depend d
+        JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+        JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+        WHERE d.refobjid = CAST(:table AS regclass) AND d.deptype = 'a'
+    '''), {'table': name})
+    for sequence, column in owned_sequences.all():
+        session.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY {quoted_staging}.{preparer.quote(column)}'))
+
+    session.execute(text(f'DROP TABLE {quoted}'))
+    session.execute(text(f'ALTER TABLE {quoted_staging} RENAME TO {quoted}'))
+    for index_name, definition in indexes:
+        i = next(i for i, (_, staging_definition) in enumerate(staging_indexes) if staging_definition == definition)
+        staging_index_name, _ = staging_indexes.pop(i)
+        session.execute(text(
+            f'ALTER INDEX {preparer.quote(staging_index_name)} RENAME TO {preparer.quote(index_name)}'
+        ))
+    session.commit()
+
+    return copied
+
 Condition = Union[ColumnElement[bool], BooleanClauseList]
 Conditions = List[Condition]
\ No newline at end of file
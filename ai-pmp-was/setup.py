@@ -24,6 +24,7 @@ setup(
         'more-itertools==10.7.0',
 
         'mypy==1.15.0',
+        'pytest==8.3.5',
         'watchdog==6.0.0',
         'boto3==1.38.15',
         'requests==2.32.3',
@@ -33,5 +34,6 @@ setup(
         'pandas==2.2.3',
         'scikit-learn==1.6.1',
         'openpyxl==3.1.5',
+        'Pillow==12.3.0',
     ],
 )
\ No newline at end of file
@@ -0,0 +1,40 @@
+from typing import Any, Callable, Iterator
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import scoped_session
+
+from was.application import app
+from was.model import db
+
+# docker-compose 의 Postgres (make dev && make db-import) 에 붙어서 돈다
+
+@pytest.fixture
+def session() -> Iterator[scoped_session]:
+    with app.app_context():
+        try:
+            db.session.execute(db.select(1))
+        except OperationalError:
+            pytest.skip('docker-compose Postgres 에 연결할 수 없음')
+        yield db.session
+        db.session.rollback()
+
+CountStatements = Callable[[Callable[[], Any]], int]
+
+def _count_statements(fn: Callable[[], Any]) -> int:
+    statements: list[str] = []
+
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return len(statements)
+
+@pytest.fixture
+def count_statements(session: scoped_session) -> CountStatements:
+    return _count_statements
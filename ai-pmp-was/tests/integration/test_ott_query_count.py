@@ -0,0 +1,27 @@
+from typing import Any, Callable
+
+import pytest
+from sqlalchemy.orm import scoped_session
+
+from was.blueprints.front.ott import _recommended_movies
+from was.model import db
+from was.model.movie import Movie
+
+pytestmark = pytest.mark.integration
+
+def test_recommended_movies_query_count_is_constant(session: scoped_session,
+                                                    count_statements: Callable[[Callable[[], Any]], int]) -> None:
+    movie_pks = session.execute(db.select(Movie.pk).order_by(Movie.pk).limit(50)).scalars().all()
+    if len(movie_pks) < 50:
+        pytest.skip('movie 데이터가 부족함')
+
+    counts = {}
+    for n in (1, 10, 50):
+        # identity map 에 남은 영화가 있으면 관계 로딩 query 가 빠지므로 매번 비운다
+        session.expunge_all()
+        ranked: list[tuple[int, int, int | None]] = [(movie_pk, 90, None) for movie_pk in movie_pks[:n]]
+        counts[n] = count_statements(lambda: _recommended_movies(ranked))
+
+    # 영화 + genres + nlp_data, 영화 수와 관계없이 같아야 한다
+    assert counts[1] == counts[10] == counts[50], counts
+    assert counts[50] <= 3, counts
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import Select
+from sqlalchemy.orm import scoped_session
+
+from was import config
+from was.blueprints.front.scene import SceneChatbotFilterReq, scene_chatbot_filter
+from was.model import db
+from was.model.scene import SceneMedia, SceneTimestamp, SceneActor, SceneCategory, SceneMediaActor, \
+    scene_media_category
+
+pytestmark = pytest.mark.integration
+
+def _sql_path(categories: list[str], display_classes: list[str], actor_names: list[str]) -> Select:
+    # facet index 이전의 SQL 필터, facet 사이는 AND, 한 facet 안은 OR
+    q = db.select(SceneMedia.pk).order_by(SceneMedia.title.collate(config.DB_COLLNAME), SceneMedia.pk)
+    if categories:
+        q = q.filter(SceneMedia.pk.in_(
+            db.select(scene_media_category.c.scene_media_pk)
+            .join(SceneCategory, SceneCategory.pk == scene_media_category.c.scene_category_pk)
+            .filter(SceneCategory.name.in_(categories))
+        ))
+    if display_classes:
+        q = q.filter(SceneMedia.pk.in_(
+            db.select(SceneTimestamp.scene_media_pk).filter(SceneTimestamp.display_class.in_(display_classes))
+        ))
+    q = q.filter(SceneMedia.pk.in_(
+        db.select(SceneMediaActor.scene_media_pk)
+        .join(SceneActor, SceneActor.pk == SceneMediaActor.scene_actor_pk)
+        .filter(SceneActor.name.in_(actor_names))
+    ))
+    return q
+
+def _filter(req: SceneChatbotFilterReq) -> tuple[list[int], int, list[str]]:
+    res = scene_chatbot_filter(req)
+    assert res.data is not None
+    return [scene.pk for scene in res.data.scenes], res.data.total, res.data.matched_actor_names
+
+def test_chatbot_filter_matches_sql_path(session: scoped_session) -> None:
+    row = session.execute(
+        db.select(SceneCategory.name, SceneTimestamp.display_class, SceneActor.name)
+        .join(scene_media_category, scene_media_category.c.scene_category_pk == SceneCategory.pk)
+        .join(SceneTimestamp, SceneTimestamp.scene_media_pk == scene_media_category.c.scene_media_pk)
+        .join(SceneMediaActor, SceneMediaActor.scene_media_pk == SceneTimestamp.scene_media_pk)
+        .join(SceneActor, SceneActor.pk == SceneMediaActor.scene_actor_pk)
+        .limit(1)
+    ).first()
+    if row is None:
+        pytest.skip('scene 데이터가 부족함')
+    category, display_class, actor_name = row
+
+    other_categories = session.execute(
+        db.select(SceneCategory.name).filter(SceneCategory.name != category).order_by(SceneCategory.pk).limit(1)
+    ).scalars().all()
+    categories = [category, *other_categories]
+    expected = session.execute(_sql_path(categories, [display_class], [actor_name])).scalars().all()
+    assert expected
+
+    for offset, limit in [(0, None), (0, 1), (1, 2), (len(expected), 5)]:
+        pks, total, matched = _filter(SceneChatbotFilterReq(
+            categories=categories, display_classes=[display_class], actor_names=[actor_name],
+            offset=offset, limit=limit
+        ))
+        assert pks == expected[offset:offset + limit if limit is not None else None]
+        assert total == len(expected)
+        assert actor_name in matched
+
+def test_chatbot_filter_without_matching_actor(session: scoped_session) -> None:
+    category = session.execute(db.select(SceneCategory.name).limit(1)).scalar()
+    if category is None:
+        pytest.skip('scene 데이터가 부족함')
+
+    # 맞는 배우가 없으면 filters['actor'] = [] 이고, SQL 의 IN () 처럼 결과가 비어야 한다
+    pks, total, matched = _filter(SceneChatbotFilterReq(categories=[category], actor_name='zzzz 없는 배우 zzzz'))
+    assert matched == []
+    assert pks == session.execute(_sql_path([category], [], [])).scalars().all() == []
+    assert total == 0
@@ -0,0 +1,112 @@
+import json
+from typing import Iterator
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+
+from ex.api import ApiBlueprint, BaseModel, Res, ResStatus, ok_stream
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.removed = 0
+
+    def remove(self) -> None:
+        self.removed += 1
+
+class FakeSQLAlchemy:
+    def __init__(self) -> None:
+        self.session = FakeSession()
+
+class StreamBlueprint(ApiBlueprint[str]):
+    logged_in = True
+
+    def validate_permission(self, permissions: tuple[str, ...]) -> bool:
+        return True
+
+    def validate_login(self) -> bool:
+        return self.logged_in
+
+class CountReq(BaseModel):
+    count: int
+
+class CountHeader(BaseModel):
+    total_count: int
+
+class CountItem(BaseModel):
+    item_no: int
+
+@pytest.fixture
+def app() -> Iterator[tuple[StreamBlueprint, FakeSQLAlchemy, list[int]]]:
+    bp = StreamBlueprint('test', __name__)
+    read: list[int] = []
+
+    def _items(count: int) -> Iterator[CountItem]:
+        for i in range(count):
+            read.append(i)
+            yield CountItem(item_no=i)
+
+    @bp.stream_api(CountItem)
+    def count_stream(req: CountReq) -> Res[CountHeader]:
+        return ok_stream(CountHeader(total_count=req.count), _items(req.count))
+
+    flask_app = Flask(__name__)
+    ext = FakeSQLAlchemy()
+    flask_app.extensions['sqlalchemy'] = ext
+    flask_app.register_blueprint(bp)
+    yield bp, ext, read
+
+@pytest.fixture
+def client(app: tuple[StreamBlueprint, FakeSQLAlchemy, list[int]]) -> FlaskClient:
+    return app[0]._app.test_client()
+
+def test_stream_lines(app: tuple[StreamBlueprint, FakeSQLAlchemy, list[int]], client: FlaskClient) -> None:
+    _, ext, read = app
+    res = client.post('/api/count-stream', json={'count': 3}, buffered=False)
+    assert res.mimetype == 'application/x-ndjson'
+
+    # 응답을 읽기 전에는 item 을 만들지 않고, session 도 아직 쓰는 중
+    assert read == []
+    assert ext.session.removed == 0
+
+    lines = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert lines[0]['status'] == ResStatus.OK
+    assert lines[0]['data'] == {'totalCount': 3}
+    assert 'items' not in lines[0]
+    assert lines[1:] == [{'itemNo': 0}, {'itemNo': 1}, {'itemNo': 2}]
+    assert ext.session.removed == 1
+
+def test_stream_closed_early_removes_session(app: tuple[StreamBlueprint, FakeSQLAlchemy, list[int]],
+                                             client: FlaskClient) -> None:
+    _, ext, read = app
+    res = client.post('/api/count-stream', json={'count': 1000}, buffered=False)
+
+    body = iter(res.response)
+    next(body)
+    next(body)
+    res.close()
+
+    assert read == [0]
+    assert ext.session.removed == 1
+
+def test_stream_validation_error_is_plain_res(client: FlaskClient) -> None:
+    res = client.post('/api/count-stream', json={'count': 'x'})
+
+    body = json.loads(res.get_data(as_text=True))
+    assert res.mimetype != 'application/x-ndjson'
+    assert body['validationErrors'][0]['loc'] == ['count']
+
+def test_stream_requires_login(app: tuple[StreamBlueprint, FakeSQLAlchemy, list[int]], client: FlaskClient) -> None:
+    bp, _, read = app
+    bp.logged_in = False
+
+    body = json.loads(client.post('/api/count-stream', json={'count': 3}).get_data(as_text=True))
+    assert body['status'] == ResStatus.NO_PERMISSION
+    assert read == []
+
+def test_stream_schema_exported(app: tuple[StreamBlueprint, FakeSQLAlchemy, list[int]]) -> None:
+    bp, _, _ = app
+    [scheme] = bp.export_api_schema()
+
+    assert scheme.url == '/api/count-stream'
+    assert (scheme.req, scheme.res_data, scheme.stream_item) == (CountReq, CountHeader, CountItem)
@@ -0,0 +1,40 @@
+import io
+from typing import Any
+
+import pytest
+
+from was import config
+from was.model.asset import Asset
+
+class FakeS3:
+    def __init__(self, errors: list[dict[str, str]] | None = None) -> None:
+        self.uploaded: list[str] = []
+        self.deleted: list[list[str]] = []
+        self.errors = errors or []
+
+    def upload_fileobj(self, file: Any, bucket: str, key: str, ExtraArgs: dict[str, str]) -> None:
+        self.uploaded.append(key)
+
+    def delete_objects(self, Bucket: str, Delete: dict[str, list[dict[str, str]]]) -> dict[str, Any]:
+        assert Bucket == config.R2_BUCKET
+        self.deleted.append([o['Key'] for o in Delete['Objects']])
+        return {'Errors': self.errors}
+
+def test_object_name_matches_upload_key() -> None:
+    client = FakeS3()
+    asset = Asset.new_('관상 1.jpg', 'image/jpeg', io.BytesIO(b''), client)
+
+    assert client.uploaded == [asset.object_name]
+    assert asset.object_name.endswith(f'{asset.uuid}/관상 1.jpg')
+
+def test_delete_objects_in_chunks() -> None:
+    client = FakeS3()
+    names = [f'a/{i}' for i in range(2001)]
+    Asset.delete_objects(names, client)
+
+    assert [len(keys) for keys in client.deleted] == [1000, 1000, 1]
+    assert sum(client.deleted, []) == names
+
+def test_delete_objects_errors_raised() -> None:
+    with pytest.raises(RuntimeError):
+        Asset.delete_objects(['a/1'], FakeS3(errors=[{'Key': 'a/1', 'Code': 'AccessDenied'}]))
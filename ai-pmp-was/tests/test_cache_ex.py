@@ -0,0 +1,197 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from ex.py import cache_ex
+from ex.py.cache_ex import LRUCache, SnapshotStore, VersionStamp
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache_ex.time, 'monotonic', clock)
+    return clock
+
+def _touch(path: Path, mtime_ns: int) -> None:
+    path.write_text('')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_lru_evicts_least_recently_used() -> None:
+    cache: LRUCache[str, int] = LRUCache('test_lru_evict', 2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a', -1) == 1
+
+    # 방금 읽은 a 는 남고 b 가 밀려난다
+    cache.set('c', 3)
+    assert cache.get('b', -1) == -1
+    assert cache.get('a', -1) == 1
+    assert cache.get('c', -1) == 3
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 2
+
+def test_lru_set_existing_key_refreshes_order() -> None:
+    cache: LRUCache[str, int] = LRUCache('test_lru_refresh', 2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.set('a', 10)
+    cache.set('c', 3)
+
+    assert cache.get('a', -1) == 10
+    assert cache.get('b', -1) == -1
+
+def test_lru_ttl_expiry(clock: Clock) -> None:
+    cache: LRUCache[str, int] = LRUCache('test_lru_ttl', 10, ttl=5)
+    cache.set('a', 1)
+
+    clock.now += 5
+    assert cache.get('a', -1) == 1
+
+    clock.now += 0.001
+    assert cache.get('a', -1) == -1
+    assert cache.stats()['size'] == 0
+
+def test_lru_hit_miss_counters() -> None:
+    cache: LRUCache[str, int] = LRUCache('test_lru_counters', 10)
+    cache.get('a', -1)
+    cache.set('a', 1)
+    cache.get('a', -1)
+    cache.get('a', -1)
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+
+def test_lru_get_or_load_loads_once() -> None:
+    cache: LRUCache[str, int] = LRUCache('test_lru_get_or_load', 10)
+    loads: list[str] = []
+
+    def load() -> int:
+        loads.append('a')
+        return 1
+
+    assert cache.get_or_load('a', load) == 1
+    assert cache.get_or_load('a', load) == 1
+    assert loads == ['a']
+
+def test_lru_get_many_loads_only_missing_keys() -> None:
+    cache: LRUCache[int, int | None] = LRUCache('test_lru_get_many', 10)
+    cache.set(1, 10)
+    requested: list[list[int]] = []
+
+    def load(keys: list[int]) -> dict[int, int | None]:
+        requested.append(keys)
+        return {key: key * 10 for key in keys if key != 3}
+
+    assert cache.get_many([1, 2, 3], load, None) == {1: 10, 2: 20, 3: None}
+    assert requested == [[2, 3]]
+
+    # load 가 돌려주지 않은 key 도 default 로 캐시되어 다시 묻지 않는다
+    assert cache.get_many([2, 3], load, None) == {2: 20, 3: None}
+    assert requested == [[2, 3]]
+
+def test_lru_invalidate_bumps_generation() -> None:
+    cache: LRUCache[str, int] = LRUCache('test_lru_invalidate', 10)
+    cache.set('a', 1)
+    cache.invalidate()
+
+    assert cache.generation == 1
+    assert cache.get('a', -1) == -1
+
+def test_lru_drops_value_loaded_across_invalidation() -> None:
+    cache: LRUCache[str, int] = LRUCache('test_lru_generation', 10)
+
+    def load() -> int:
+        # load 도중에 무효화되면 옛 세대의 값은 캐시에 남지 않는다
+        cache.invalidate()
+        return 1
+
+    assert cache.get_or_load('a', load) == 1
+    assert cache.get('a', -1) == -1
+
+    def load_many(keys: list[str]) -> dict[str, int]:
+        cache.invalidate()
+        return {key: 1 for key in keys}
+
+    assert cache.get_many(['b'], load_many, -1) == {'b': 1}
+    assert cache.get('b', -1) == -1
+
+def test_lru_invalidates_on_stamp_change(tmp_path: Path) -> None:
+    path = tmp_path / 'movie'
+    _touch(path, 1_000_000_000)
+    stamp = VersionStamp(path, check_interval=0)
+    cache: LRUCache[str, int] = LRUCache('test_lru_stamp', 10, stamp=stamp)
+    cache.set('a', 1)
+    assert cache.get('a', -1) == 1
+
+    _touch(path, 2_000_000_000)
+    assert cache.get('a', -1) == -1
+    assert cache.generation == 1
+
+def test_stamp_missing_file_is_version_zero(tmp_path: Path) -> None:
+    assert VersionStamp(tmp_path / 'missing').current() == 0
+
+def test_stamp_bump_creates_file_and_changes_version(tmp_path: Path) -> None:
+    stamp = VersionStamp(tmp_path / 'stamp' / 'movie')
+    assert stamp.current() == 0
+
+    stamp.bump()
+    assert (tmp_path / 'stamp' / 'movie').exists()
+    assert stamp.current() != 0
+
+def test_stamp_throttles_mtime_checks(tmp_path: Path, clock: Clock) -> None:
+    path = tmp_path / 'movie'
+    _touch(path, 1_000_000_000)
+    stamp = VersionStamp(path)
+    assert stamp.current() == 1_000_000_000
+
+    # check_interval (1s) 안에서는 파일이 바뀌어도 이전 version 을 돌려준다
+    _touch(path, 2_000_000_000)
+    clock.now += 0.5
+    assert stamp.current() == 1_000_000_000
+
+    clock.now += 0.5
+    assert stamp.current() == 2_000_000_000
+
+def test_snapshot_store_shared_between_instances(tmp_path: Path) -> None:
+    stamp_path = tmp_path / 'movie'
+    _touch(stamp_path, 1_000_000_000)
+    builds: list[str] = []
+
+    def build() -> bytes:
+        builds.append('1')
+        return b'{"pk": 1}'
+
+    # worker 마다 store 를 따로 만들어도 먼저 만든 snapshot 을 읽는다
+    first = SnapshotStore(tmp_path / 'snapshot', VersionStamp(stamp_path))
+    second = SnapshotStore(tmp_path / 'snapshot', VersionStamp(stamp_path))
+    assert first.get_or_build('1', build) == b'{"pk": 1}'
+    assert second.get_or_build('1', build) == b'{"pk": 1}'
+    assert builds == ['1']
+    assert second.get('2') is None
+
+def test_snapshot_store_drops_older_versions(tmp_path: Path) -> None:
+    stamp_path = tmp_path / 'movie'
+    _touch(stamp_path, 1_000_000_000)
+    store = SnapshotStore(tmp_path / 'snapshot', VersionStamp(stamp_path, check_interval=0))
+    store.set('1', b'old')
+
+    _touch(stamp_path, 2_000_000_000)
+    assert store.get('1') is None
+    assert not (tmp_path / 'snapshot' / '1000000000').exists()
+
+    store.set('1', b'new')
+    assert store.get('1') == b'new'
+
+    # 옛 stamp 를 아직 보는 store 가 새 version 을 지우지는 않는다
+    stale_stamp_path = tmp_path / 'stale'
+    _touch(stale_stamp_path, 1_000_000_000)
+    stale = SnapshotStore(tmp_path / 'snapshot', VersionStamp(stale_stamp_path))
+    assert stale.get('1') is None
+    assert store.get('1') == b'new'
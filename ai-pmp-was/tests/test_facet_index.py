@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from was.scene.facet_index import FACETS, FacetIndex
+
+# (pk, 제목, facet 별 값), 제목 순서로 bit 위치가 정해진다
+MEDIA: list[tuple[int, str, dict[str, set[str]]]] = [
+    (3, 'A', {'category': {'drama'}, 'display_class': {'kiss', 'walk'}, 'actor': {'Kim'}}),
+    (1, 'B', {'category': {'drama', 'action'}, 'display_class': {'fight'}, 'actor': {'Kim', 'Lee'}}),
+    (7, 'C', {'category': {'action'}, 'display_class': {'fight', 'walk'}, 'actor': {'Park'}}),
+    (2, 'D', {'category': set(), 'display_class': {'walk'}, 'actor': set()}),
+    (5, 'E', {'category': {'drama'}, 'display_class': {'fight'}, 'actor': {'Lee', 'Kimberly'}}),
+]
+
+def _index(media: list[tuple[int, str, dict[str, set[str]]]]) -> FacetIndex:
+    ordered = sorted(media, key=lambda m: (m[1], m[0]))
+    facets: dict[str, dict[str, int]] = {facet: {} for facet in FACETS}
+    for i, (_, _, values) in enumerate(ordered):
+        for facet, names in values.items():
+            for name in names:
+                facets[facet][name] = facets[facet].get(name, 0) | 1 << i
+    return FacetIndex([pk for pk, _, _ in ordered], facets)
+
+def _sql_path(media: list[tuple[int, str, dict[str, set[str]]]], filters: dict[str, list[str]],
+              offset: int, limit: int | None) -> list[int]:
+    # 이전 SQL 과 같은 의미, facet 마다 IN (...) 을 AND 로 묶고 제목, pk 순으로 offset/limit
+    ordered = sorted(media, key=lambda m: (m[1], m[0]))
+    pks = [pk for pk, _, values in ordered
+           if all(values.get(facet, set()) & set(names) for facet, names in filters.items())]
+    return pks[offset:offset + limit if limit is not None else None]
+
+@pytest.mark.parametrize('filters, offset, limit', [
+    ({}, 0, None),
+    ({'category': ['drama']}, 0, None),
+    ({'category': ['drama', 'action'], 'display_class': ['fight']}, 0, None),
+    ({'category': ['drama'], 'display_class': ['fight', 'kiss'], 'actor': ['Kim', 'Lee']}, 0, None),
+    ({'category': ['drama'], 'display_class': ['fight', 'kiss'], 'actor': ['Kim', 'Lee']}, 1, 1),
+    ({'category': ['drama', 'action'], 'actor': ['Lee', 'Park']}, 1, 10),
+    ({'category': ['drama'], 'actor': []}, 0, None),
+    ({'category': ['unknown']}, 0, None),
+    ({'display_class': ['walk']}, 2, 5),
+])
+def test_query_page_matches_sql_path(filters: dict[str, list[str]], offset: int, limit: int | None) -> None:
+    index = _index(MEDIA)
+    bits = index.query(filters)
+
+    assert index.page(bits, offset, limit) == _sql_path(MEDIA, filters, offset, limit)
+    assert bits.bit_count() == len(_sql_path(MEDIA, filters, 0, None))
+
+def test_no_matched_actor_selects_nothing() -> None:
+    # 배우 이름이 하나도 맞지 않으면 다른 facet 과 관계없이 결과가 없다
+    index = _index(MEDIA)
+    filters: dict[str, list[str]] = {'category': ['drama'], 'actor': index.match_actor('Nobody')}
+
+    assert filters['actor'] == []
+    assert index.query(filters) == 0
+    assert index.page(index.query(filters), 0, None) == []
+
+def test_match_actor() -> None:
+    index = _index(MEDIA)
+
+    assert index.match_actor('Kim') == ['Kim']
+    assert sorted(index.match_actor('kim')) == ['Kim', 'Kimberly']
+    assert index.match_actor('Le') == ['Lee']
+    assert index.match_actor('Pakr') == ['Park']
+    assert index.match_actor('  ') == []
+
+def test_random_filters_match_sql_path() -> None:
+    rng = random.Random(0)
+    values = {'category': ['c0', 'c1', 'c2'], 'display_class': ['d0', 'd1', 'd2', 'd3'], 'actor': ['a0', 'a1', 'a2']}
+    for _ in range(200):
+        media = [
+            (pk, rng.choice('ABCDEFG'), {facet: set(rng.sample(names, rng.randint(0, len(names))))
+                                         for facet, names in values.items()})
+            for pk in rng.sample(range(1, 100), rng.randint(0, 70))
+        ]
+        filters = {facet: rng.sample(names, rng.randint(0, 2))
+                   for facet, names in values.items() if rng.random() < 0.6}
+        offset = rng.randint(0, 5)
+        limit = rng.choice([None, 1, 3, 10])
+
+        index = _index(media)
+        assert index.page(index.query(filters), offset, limit) == _sql_path(media, filters, offset, limit)
@@ -0,0 +1,98 @@
+from collections import Counter
+
+import numpy as np
+
+from was.pattern.batch import RECOMMEND_TOP_K, genre_probabilities, recommend_all, sample_group, sample_slot
+from was.pattern.timetable import ScheduleSlot, SlotGroup, Timetable
+from was.pattern.weights import GENRES
+
+def _slot(channel: str, genre: str, program_pk: int) -> ScheduleSlot:
+    return ScheduleSlot(channel, '20:00', program_pk, f'program {program_pk}', genre, None)
+
+def _one_hot(genre: str) -> np.ndarray:
+    return genre_probabilities({genre: 1.0})
+
+# 채널끼리 붙어 있다, KBS 는 같은 시간에 slot 이 둘
+SLOTS = [
+    _slot('KBS', '드라마', 1),
+    _slot('KBS', '뉴스', 2),
+    _slot('MBC', '드라마', 3),
+    _slot('SBS', '예능', 4),
+    _slot('EBS', '다큐', 5),
+    _slot('JTBC', '드라마', 6),
+    _slot('OCN', '기타', 7),
+]
+
+def test_genre_probabilities_follow_genres_order() -> None:
+    probs = genre_probabilities({'뉴스': 1.0, '드라마': 3.0})
+
+    assert probs.tolist() == [0.25, 0.75] + [0.0] * (len(GENRES) - 2)
+
+def test_sample_group_matches_batch_for_same_seed() -> None:
+    # HTTP 경로와 배치는 같은 규칙이라 seed 가 같으면 결과도 같다
+    group = SlotGroup(SLOTS)
+    probs = genre_probabilities({g: i + 1.0 for i, g in enumerate(GENRES)})
+
+    for seed in range(20):
+        single = sample_group(group, probs, np.random.default_rng(seed))
+        batch = list(recommend_all(Timetable([('월요일', slot) for slot in SLOTS]), np.array([42]), probs[None, :],
+                                   np.random.default_rng(seed), block_size=16))
+
+        assert [(slot.program_pk, score) for slot, score in single] == \
+            [(program_pk, score) for _, _, _, _, _, program_pk, score in batch]
+        assert [rank for _, _, _, rank, _, _, _ in batch] == list(range(len(batch)))
+
+def test_sample_slot_is_deterministic_for_seed() -> None:
+    group = SlotGroup(SLOTS)
+    probs = np.tile(genre_probabilities({g: 1.0 for g in GENRES}), (50, 1))
+
+    first = sample_slot(probs, group.slot_genres, group.slot_channels, 5, np.random.default_rng(7))
+    second = sample_slot(probs, group.slot_genres, group.slot_channels, 5, np.random.default_rng(7))
+    assert (first == second).all()
+
+def test_one_slot_per_channel_sorted_by_score() -> None:
+    group = SlotGroup(SLOTS)
+    probs = genre_probabilities({'드라마': 5.0, '예능': 3.0, '다큐': 2.0})
+    rng = np.random.default_rng(0)
+
+    for _ in range(200):
+        chosen = sample_group(group, probs, rng)
+        channels = [slot.channel for slot, _ in chosen]
+
+        # slot 은 7 개지만 채널은 6 개라 최대 6 개, 한 채널은 한 번만
+        assert len(chosen) == min(RECOMMEND_TOP_K, 6)
+        assert len(set(channels)) == len(channels)
+
+        scores = [score for _, score in chosen]
+        assert scores == sorted(scores, reverse=True)
+        assert all(score == probs[GENRES.index(slot.genre)] if slot.genre in GENRES else score == 0.0
+                   for slot, score in chosen)
+
+def test_drawn_genre_is_filled_before_others() -> None:
+    # 채널마다 slot 이 하나면 뽑힌 장르의 후보는 모두 먼저 고른다
+    slots = [_slot(f'ch{i}', genre, i) for i, genre in enumerate(['드라마', '뉴스', '드라마', '예능', '드라마'])]
+    group = SlotGroup(slots)
+    rng = np.random.default_rng(0)
+
+    for _ in range(100):
+        selected = sample_slot(_one_hot('드라마')[None, :], group.slot_genres, group.slot_channels, 3, rng)[0]
+        assert sorted(selected.tolist()) == [0, 2, 4]
+
+        # 드라마 후보가 모자라면 나머지 채널에서 채운다
+        selected = sample_slot(_one_hot('드라마')[None, :], group.slot_genres, group.slot_channels, 4, rng)[0]
+        assert set(selected.tolist()[:3]) == {0, 2, 4}
+        assert selected.tolist()[3] in (1, 3)
+
+def test_channel_candidate_is_picked_before_genre() -> None:
+    # 한 채널에 slot 이 여럿이면 채널 후보를 먼저 무작위로 하나 남기고, 장르는 그 후보들 중에서 고른다
+    # 그래서 드라마만 원해도 KBS 의 드라마 slot 은 절반 정도만 나온다
+    group = SlotGroup([_slot('KBS', '드라마', 1), _slot('KBS', '뉴스', 2), _slot('MBC', '예능', 3)])
+    rng = np.random.default_rng(0)
+
+    picked = Counter(
+        group.slots[i].program_pk
+        for row in sample_slot(np.tile(_one_hot('드라마'), (4000, 1)), group.slot_genres, group.slot_channels, 1, rng)
+        for i in row.tolist()
+    )
+    assert abs(picked[1] / 4000 - 0.5) < 0.05
+    assert picked[1] + picked[2] + picked[3] == 4000
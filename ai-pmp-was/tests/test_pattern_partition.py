@@ -0,0 +1,42 @@
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+
+from was.blueprints.front.pattern import PatternViewingHistoryReq
+from was.pattern.partition import Quarter, latest_quarter_year, next_quarter, partition_name, quarter_range, \
+    quarter_start
+
+@pytest.mark.parametrize('quarter, expected', [
+    (Quarter.Q1, (date(2024, 1, 1), date(2024, 4, 1))),
+    (Quarter.Q2, (date(2024, 4, 1), date(2024, 7, 1))),
+    (Quarter.Q3, (date(2024, 7, 1), date(2024, 10, 1))),
+    (Quarter.Q4, (date(2024, 10, 1), date(2025, 1, 1))),
+])
+def test_quarter_range(quarter: Quarter, expected: tuple[date, date]) -> None:
+    assert quarter_range(2024, quarter) == expected
+    assert partition_name(expected[0]) == f'pattern_tv_viewing_log_2024{quarter.lower()}'
+
+def test_quarter_start_and_next() -> None:
+    assert quarter_start(date(2024, 2, 29)) == date(2024, 1, 1)
+    assert quarter_start(date(2024, 12, 31)) == date(2024, 10, 1)
+    assert next_quarter(date(2024, 10, 1)) == date(2025, 1, 1)
+
+@pytest.mark.parametrize('latest, quarter, year', [
+    (date(2024, 5, 3), Quarter.Q1, 2024),
+    (date(2024, 5, 3), Quarter.Q2, 2024),
+    (date(2024, 5, 3), Quarter.Q3, 2023),
+    (date(2024, 1, 1), Quarter.Q1, 2024),
+    (date(2024, 12, 31), Quarter.Q4, 2024),
+])
+def test_latest_quarter_year(latest: date, quarter: Quarter, year: int) -> None:
+    assert latest_quarter_year(latest, quarter) == year
+
+@pytest.mark.parametrize('quarter', ['Q5', 'q1', '1', ''])
+def test_invalid_quarter_rejected(quarter: str) -> None:
+    # 500 이 아니라 validation error 로 돌려준다
+    with pytest.raises(ValidationError):
+        PatternViewingHistoryReq.parse_obj({'quarter': quarter})
+
+def test_quarter_parsed() -> None:
+    assert PatternViewingHistoryReq.parse_obj({'quarter': 'Q3', 'year': 2024}).quarter is Quarter.Q3
@@ -0,0 +1,164 @@
+import struct
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+import requests
+
+from was.scene.mp4 import FileReader, HttpRangeReader, find_moov, parse_video_track
+
+# 10 sample, timescale 1000, sample 당 100 (10fps), 크기 10..19, chunk 2 개에 5 개씩, keyframe 은 1, 6 번째
+SAMPLE_SIZES = list(range(10, 20))
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+def _full_box(box_type: bytes, payload: bytes, version: int = 0) -> bytes:
+    return _box(box_type, struct.pack('>I', version << 24) + payload)
+
+def _hdlr(handler: bytes) -> bytes:
+    return _full_box(b'hdlr', struct.pack('>I', 0) + handler + b'\0' * 12)
+
+def _moov(chunk_offsets: list[int], edits: list[tuple[int, int]] | None = None, co64: bool = False) -> bytes:
+    stbl = _box(b'stbl', b''.join([
+        _full_box(b'stsd', struct.pack('>I', 0)),
+        _full_box(b'stts', struct.pack('>III', 1, len(SAMPLE_SIZES), 100)),
+        _full_box(b'stss', struct.pack('>III', 2, 1, 6)),
+        _full_box(b'stsc', struct.pack('>IIII', 1, 1, 5, 1)),
+        _full_box(b'stsz', struct.pack(f'>II{len(SAMPLE_SIZES)}I', 0, len(SAMPLE_SIZES), *SAMPLE_SIZES)),
+        _full_box(b'co64', struct.pack(f'>I{len(chunk_offsets)}Q', len(chunk_offsets), *chunk_offsets)) if co64 else
+        _full_box(b'stco', struct.pack(f'>I{len(chunk_offsets)}I', len(chunk_offsets), *chunk_offsets)),
+    ]))
+    mdhd = _full_box(b'mdhd', struct.pack('>IIII', 0, 0, 1000, 1000) + b'\0' * 4)
+    trak_boxes = [_box(b'mdia', mdhd + _hdlr(b'vide') + _box(b'minf', stbl))]
+    if edits is not None:
+        elst = _full_box(b'elst', struct.pack('>I', len(edits)) + b''.join(
+            struct.pack('>Iii', duration, media_time, 1 << 16) for duration, media_time in edits
+        ))
+        trak_boxes.insert(0, _box(b'edts', elst))
+
+    # 음성 track 은 건너뛰어야 한다, mvhd 의 timescale 은 600
+    sound = _box(b'trak', _box(b'mdia', _hdlr(b'soun')))
+    mvhd = _full_box(b'mvhd', struct.pack('>III', 0, 0, 600) + b'\0' * 84)
+    return _box(b'moov', mvhd + sound + _box(b'trak', b''.join(trak_boxes)))
+
+def _mp4(edits: list[tuple[int, int]] | None = None, co64: bool = False, large_mdat: bool = False) -> bytes:
+    ftyp = _box(b'ftyp', b'isom' + b'\0' * 4)
+    payload = b''.join(bytes([i]) * size for i, size in enumerate(SAMPLE_SIZES))
+    if large_mdat:
+        mdat = struct.pack('>I4sQ', 1, b'mdat', 16 + len(payload)) + payload
+    else:
+        mdat = _box(b'mdat', payload)
+
+    first_chunk = len(ftyp) + len(mdat) - len(payload)
+    chunk_offsets = [first_chunk, first_chunk + sum(SAMPLE_SIZES[:5])]
+    return ftyp + mdat + _moov(chunk_offsets, edits, co64)
+
+def _samples_in(data: bytes, byte_range: tuple[int, int]) -> set[int]:
+    start, end = byte_range
+    return set(data[start:end + 1])
+
+@pytest.mark.parametrize('co64, large_mdat', [(False, False), (True, False), (False, True)])
+def test_parse_video_track(tmp_path: Path, co64: bool, large_mdat: bool) -> None:
+    path = tmp_path / 'a.mp4'
+    data = _mp4(co64=co64, large_mdat=large_mdat)
+    path.write_bytes(data)
+
+    reader = FileReader(path)
+    moov_start, moov_end = find_moov(reader)
+    assert moov_end == len(data)
+
+    track = parse_video_track(reader.read(moov_start, moov_end - moov_start))
+    assert track.timescale == 1000
+    assert track.sample_times.tolist() == list(range(0, 1000, 100))
+    assert track.sync_samples.tolist() == [0, 5]
+    assert track.edit_offset_ms == 0
+
+    # 각 sample 의 offset 에는 자기 index 바이트가 들어 있다
+    for i, (offset, size) in enumerate(zip(track.sample_offsets.tolist(), track.sample_sizes.tolist())):
+        assert data[offset:offset + size] == bytes([i]) * size
+
+def test_byte_range_starts_at_previous_keyframe() -> None:
+    data = _mp4()
+    track = parse_video_track(data[data.index(b'moov') - 4:])
+
+    # sample 7..8 을 보려면 keyframe 인 sample 5 부터 필요하다
+    assert _samples_in(data, track.byte_range(720, 850)) == {5, 6, 7, 8}
+    assert _samples_in(data, track.byte_range(0, 0)) == {0}
+    assert _samples_in(data, track.byte_range(450, 520)) == {0, 1, 2, 3, 4, 5}
+    assert _samples_in(data, track.byte_range(950, 5000)) == {5, 6, 7, 8, 9}
+
+def test_elst_media_time_shifts_samples() -> None:
+    data = _mp4(edits=[(600, 200)])
+    track = parse_video_track(data[data.index(b'moov') - 4:])
+    assert track.edit_offset_ms == 200
+
+    # media_time 200ms 부터 재생하므로 재생 시각 520ms 는 track 의 720ms
+    assert _samples_in(data, track.byte_range(520, 650)) == {5, 6, 7, 8}
+
+def test_elst_leading_empty_edit_delays_playback() -> None:
+    # 빈 edit 300 (mvhd timescale 600 이므로 500ms) 뒤에 track 의 200ms 부터 재생
+    data = _mp4(edits=[(300, -1), (600, 200)])
+    track = parse_video_track(data[data.index(b'moov') - 4:])
+    assert track.edit_offset_ms == pytest.approx(-300)
+
+    assert _samples_in(data, track.byte_range(0, 250)) == {0}
+    assert _samples_in(data, track.byte_range(1020, 1150)) == {5, 6, 7, 8}
+
+def test_elst_later_segments_ignored() -> None:
+    data = _mp4(edits=[(300, 100), (300, 700)])
+    track = parse_video_track(data[data.index(b'moov') - 4:])
+    assert track.edit_offset_ms == 100
+
+def test_find_moov_missing(tmp_path: Path) -> None:
+    path = tmp_path / 'a.mp4'
+    path.write_bytes(_box(b'ftyp', b'isom' + b'\0' * 4) + _box(b'mdat', b'\0' * 32))
+
+    with pytest.raises(ValueError):
+        find_moov(FileReader(path))
+
+class FakeResponse:
+    def __init__(self, status_code: int, content: bytes = b'', headers: dict[str, str] | None = None) -> None:
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self) -> None:
+        pass
+
+class FakeSession:
+    def __init__(self, data: bytes, ranges: bool, content_length: bool = True) -> None:
+        self.data = data
+        self.ranges = ranges
+        self.content_length = content_length
+        self.requested: list[str] = []
+
+    def head(self, url: str, **kwargs: Any) -> FakeResponse:
+        return FakeResponse(200, headers={'Content-Length': str(len(self.data))} if self.content_length else {})
+
+    def get(self, url: str, headers: dict[str, str], **kwargs: Any) -> FakeResponse:
+        self.requested.append(headers['Range'])
+        if not self.ranges:
+            return FakeResponse(200, self.data)
+        start, end = map(int, headers['Range'].removeprefix('bytes=').split('-'))
+        return FakeResponse(206, self.data[start:end + 1])
+
+@pytest.mark.parametrize('ranges', [True, False])
+def test_http_range_reader(ranges: bool) -> None:
+    data = _mp4()
+    session = FakeSession(data, ranges)
+    reader = HttpRangeReader('http://example/a.mp4', cast(requests.Session, session))
+    assert reader.size == len(data)
+
+    # Range 를 무시하고 200 으로 전체를 주는 서버여도 요청한 구간만 돌려준다
+    assert reader.read(10, 20) == data[10:30]
+    assert reader.read(len(data) - 4, 100) == data[-4:]
+    assert session.requested == ['bytes=10-29', f'bytes={len(data) - 4}-{len(data) - 1}']
+
+    moov_start, moov_end = find_moov(reader)
+    track = parse_video_track(reader.read(moov_start, moov_end - moov_start))
+    assert _samples_in(data, track.byte_range(720, 850)) == {5, 6, 7, 8}
+
+def test_http_range_reader_requires_content_length() -> None:
+    with pytest.raises(ValueError):
+        HttpRangeReader('http://example/a.mp4', cast(requests.Session, FakeSession(b'', True, content_length=False)))
@@ -0,0 +1,86 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from ex.py.cache_ex import VersionStamp
+from was.recommend.similarity_index import TopKIndex, TopKIndexFile, write_index
+
+# source 1 은 neighbor 4 개 (k=3 에서 잘림), source 5 는 2 개, source 9 는 3 개
+ROWS = [
+    (1, 10, 0.9), (1, 11, 0.8), (1, 12, 0.7), (1, 13, 0.6),
+    (5, 50, 0.5), (5, 51, 0.25),
+    (9, 90, 1.0), (9, 91, 0.75), (9, 92, 0.5),
+]
+
+def _touch(path: Path, mtime_ns: int) -> None:
+    path.write_text('')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / 'recommend' / 'movie_similarity.topk'
+    assert write_index(path, ROWS, k=3, stamp_version=123) == (3, 8)
+    assert not path.with_name(path.name + '.tmp').exists()
+
+    index = TopKIndex(path)
+    assert index.k == 3
+    assert index.stamp_version == 123
+    assert index.sources.tolist() == [1, 5, 9]
+    assert index.offsets.tolist() == [0, 3, 5, 8]
+
+    assert index.neighbors(1, 2) == [(10, pytest.approx(0.9)), (11, pytest.approx(0.8))]
+    assert index.neighbors(1, 3) == [(10, pytest.approx(0.9)), (11, pytest.approx(0.8)), (12, pytest.approx(0.7))]
+    assert index.neighbors(9, 3) == [(90, 1.0), (91, 0.75), (92, 0.5)]
+
+    # 없는 source 는 neighbor 가 없는 것
+    assert index.neighbors(2, 3) == []
+    assert index.neighbors(100, 3) == []
+
+def test_neighbors_top_n_larger_than_k(tmp_path: Path) -> None:
+    path = tmp_path / 'movie_similarity.topk'
+    write_index(path, ROWS, k=3, stamp_version=1)
+    index = TopKIndex(path)
+
+    # k 개가 꽉 찬 source 는 k 밖을 모르므로 None (DB 로 넘긴다)
+    assert index.neighbors(1, 10) is None
+    assert index.neighbors(9, 4) is None
+
+    # k 개보다 적으면 전부 알고 있으므로 그대로 돌려준다
+    assert index.neighbors(5, 10) == [(50, 0.5), (51, 0.25)]
+
+def test_empty_index(tmp_path: Path) -> None:
+    path = tmp_path / 'movie_similarity.topk'
+    assert write_index(path, [], k=3, stamp_version=1) == (0, 0)
+
+    assert TopKIndex(path).neighbors(1, 3) == []
+
+def test_unsorted_rows_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        write_index(tmp_path / 'movie_similarity.topk', [(5, 50, 0.5), (1, 10, 0.9)], k=3, stamp_version=1)
+
+def test_invalid_file_rejected(tmp_path: Path) -> None:
+    path = tmp_path / 'movie_similarity.topk'
+    path.write_bytes(b'\0' * 64)
+
+    with pytest.raises(ValueError):
+        TopKIndex(path)
+
+def test_index_file_checks_data_stamp(tmp_path: Path) -> None:
+    stamp_path = tmp_path / 'stamp' / 'movie_recommend'
+    stamp_path.parent.mkdir()
+    _touch(stamp_path, 1_000_000_000)
+    stamp = VersionStamp(stamp_path, check_interval=0)
+    path = tmp_path / 'movie_similarity.topk'
+
+    # 파일이 아직 없으면 None
+    assert TopKIndexFile(path, stamp).get() is None
+
+    write_index(path, ROWS, k=3, stamp_version=stamp.current())
+    index_file = TopKIndexFile(path, stamp)
+    index = index_file.get()
+    assert index is not None
+    assert index.neighbors(5, 10) == [(50, 0.5), (51, 0.25)]
+
+    # 데이터가 다시 import 되어 stamp 가 바뀌면 이전 빌드의 index 는 쓰지 않는다
+    _touch(stamp_path, 2_000_000_000)
+    assert index_file.get() is None
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from was.scene.timeline import Timeline
+
+Entry = tuple[int, int, str]
+
+def _overlapping(entries: list[Entry], lo: int, hi: int) -> list[str]:
+    ordered = sorted(entries, key=lambda entry: (entry[0], entry[1]))
+    return [item for start, end, item in ordered if start <= hi and end >= lo]
+
+def test_empty() -> None:
+    timeline: Timeline[str] = Timeline([])
+
+    assert len(timeline) == 0
+    assert timeline.max_end == 0
+    assert timeline.at(0) == []
+    assert timeline.window(-10, 10) == []
+
+def test_single_item() -> None:
+    timeline = Timeline([(10, 20, 'a')])
+
+    assert timeline.max_end == 20
+    assert timeline.at(9) == []
+    assert timeline.at(10) == ['a']
+    assert timeline.at(15) == ['a']
+    assert timeline.at(20) == ['a']
+    assert timeline.at(21) == []
+
+@pytest.mark.parametrize('lo, hi, expected', [
+    # 양 끝이 닿기만 해도 겹친 것으로 본다
+    (0, 10, ['a', 'b']),
+    (10, 10, ['a', 'b']),
+    (20, 30, ['b', 'c']),
+    (21, 29, ['c']),
+    (11, 19, ['b']),
+])
+def test_touching_boundaries(lo: int, hi: int, expected: list[str]) -> None:
+    timeline = Timeline([(0, 10, 'a'), (10, 20, 'b'), (20, 30, 'c')])
+
+    assert timeline.window(lo, hi) == expected
+
+def test_fully_containing_ranges() -> None:
+    # 앞쪽의 긴 구간이 뒤쪽의 짧은 구간들을 모두 덮는다
+    entries = [(0, 1000, 'whole'), (100, 110, 'b'), (200, 210, 'c'), (300, 310, 'd'), (50, 400, 'middle')]
+    timeline = Timeline(entries)
+
+    assert timeline.at(205) == ['whole', 'middle', 'c']
+    assert timeline.window(150, 160) == ['whole', 'middle']
+    assert timeline.window(-5, 2000) == ['whole', 'middle', 'b', 'c', 'd']
+    assert timeline.window(500, 600) == ['whole']
+    assert timeline.max_end == 1000
+
+def test_results_sorted_by_start_then_end() -> None:
+    timeline = Timeline([(5, 9, 'c'), (5, 6, 'b'), (0, 9, 'a')])
+
+    assert timeline.items == ['a', 'b', 'c']
+    assert timeline.at(6) == ['a', 'b', 'c']
+
+def test_matches_brute_force() -> None:
+    rng = random.Random(0)
+    for _ in range(500):
+        entries = []
+        for i in range(rng.randint(0, 80)):
+            start = rng.randint(0, 200)
+            entries.append((start, start + rng.choice([0, 1, rng.randint(0, 30), rng.randint(0, 200)]), str(i)))
+        timeline = Timeline(entries)
+
+        lo = rng.randint(-10, 260)
+        hi = lo + rng.choice([0, rng.randint(0, 40)])
+        assert timeline.window(lo, hi) == _overlapping(entries, lo, hi), (entries, lo, hi)
+        assert timeline.at(lo) == _overlapping(entries, lo, lo)
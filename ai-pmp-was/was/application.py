@@ -5,6 +5,7 @@ from flask_cors import CORS
 from ex.flask_ex import load_submodules, register_blueprints
 from was import config, model
 from was.blueprints import front
+from was.cache import cache_stats
 from was.model import db
 from sqlalchemy import text
 
@@ -32,4 +33,8 @@ def dokku_checks():
         "headers": {key: val for key, val in request.headers.items()},
     }
 
-    return jsonify(res)
\ No newline at end of file
+    return jsonify(res)
+
+@app.route('/-/cache/stats')
+def cache_stats_():
+    return jsonify(cache_stats())
@@ -1,16 +1,24 @@
 import random
 import re
-from sqlalchemy.orm import joinedload
-from sqlalchemy import func
+import struct
+from sqlalchemy.orm import selectinload, lazyload
+from sqlalchemy import func, exists
 
-from ex.api import BaseModel, Res, ok
+from ex.api import BaseModel, Res, ok, ok_raw, err
+from ex.py.cursor_ex import encode_cursor, decode_cursor
+from was import config
 from was.blueprints.front import app
+from was.cache import movie_count_cache, movie_detail_cache, movie_detail_snapshots, movie_similarity_cache, \
+    movie_prediction_cache, movielens_similarity_cache, movielens_seed_cache, user_prediction_cache
 from was.model import db
+from was.recommend.online import online_scorer
+from was.recommend.similarity_index import movie_similarity_index, movielens_similarity_index
 from was.model.movie import Movie, MovieGenreMaster, MovieRating, MovieSimilarity, MovieLensMovie, MovieLensTMDBSimilarity, MoviePrediction
 
 class MovieListReq(BaseModel):
     limit: int = 20
     offset: int = 0
+    cursor: str | None = None
 
 class MovieItem(BaseModel):
     pk: int
@@ -41,23 +49,42 @@ class MovieItem(BaseModel):
 class MovieListRes(BaseModel):
     movies: list[MovieItem]
     total: int
+    next_cursor: str | None
+
+# popularity, pk
+_MOVIE_LIST_CURSOR = struct.Struct('<dq')
 
 @app.api()
 def ott_movie_list(req: MovieListReq) -> Res[MovieListRes]:
 
-    total_q = db.select(db.func.count(Movie.pk))
-    total = db.session.execute(total_q).scalar() or 0
+    total = movie_count_cache.get_or_load(
+        'total', lambda: db.session.execute(db.select(func.count(Movie.pk))).scalar() or 0
+    )
 
     q = db.select(Movie) \
-        .options(joinedload(Movie.genres)) \
-        .order_by(Movie.popularity.desc()) \
-        .limit(req.limit) \
-        .offset(req.offset)
-    movies = list(db.session.execute(q).unique().scalars())
+        .options(selectinload(Movie.genres), lazyload(Movie.keywords)) \
+        .order_by(Movie.popularity.desc(), Movie.pk.desc()) \
+        .limit(req.limit + 1)
+
+    if req.cursor:
+        cursor = decode_cursor(_MOVIE_LIST_CURSOR, req.cursor)
+        if cursor is None:
+            return err('잘못된 cursor 입니다.')
+        q = q.filter(db.tuple_(Movie.popularity, Movie.pk) < cursor)
+    else:
+        q = q.offset(req.offset)
+
+    movies = list(db.session.execute(q).scalars())
+
+    next_cursor = None
+    if len(movies) > req.limit:
+        movies = movies[:req.limit]
+        next_cursor = encode_cursor(_MOVIE_LIST_CURSOR, movies[-1].popularity, movies[-1].pk)
 
     return ok(MovieListRes(
         movies=[MovieItem.from_model(m) for m in movies],
-        total=total
+        total=total,
+        next_cursor=next_cursor
     ))
 
 class MovieDetailReq(BaseModel):
@@ -101,18 +128,25 @@ class MovieDetailRes(BaseModel):
 @app.api()
 def ott_movie_detail(req: MovieDetailReq) -> Res[MovieDetailRes]:
 
+    # import 가 movie stamp 를 올리기 전까지는 DB 를 거치지 않는다
+    return ok_raw(movie_detail_cache.get_or_load(
+        req.movie_pk,
+        lambda: movie_detail_snapshots.get_or_build(str(req.movie_pk), lambda: _movie_detail_snapshot(req.movie_pk))
+    ))
+
+def _movie_detail_snapshot(movie_pk: int) -> bytes:
     q = db.select(Movie) \
         .options(
-            joinedload(Movie.genres),
-            joinedload(Movie.keywords),
-            joinedload(Movie.nlp_data)
+            selectinload(Movie.genres),
+            selectinload(Movie.keywords),
+            selectinload(Movie.nlp_data)
         ) \
-        .filter(Movie.pk == req.movie_pk)
+        .filter(Movie.pk == movie_pk)
 
-    movie = db.session.execute(q).unique().scalar_one_or_none()
+    movie = db.session.execute(q).scalar_one_or_none()
 
     if not movie:
-        raise ValueError(f"Movie not found: {req.movie_pk}")
+        raise ValueError(f"Movie not found: {movie_pk}")
 
     return ok(MovieDetailRes(
         pk=movie.pk,
@@ -150,7 +184,7 @@ def ott_movie_detail(req: MovieDetailReq) -> Res[MovieDetailRes]:
         review_nlp_score=int(round(movie.nlp_data.review_nlp_score * 100)) if movie.nlp_data else None,
         overview_keywords=movie.nlp_data.overview_keywords if movie.nlp_data else [],
         reviews_keywords=movie.nlp_data.reviews_keywords if movie.nlp_data else []
-    ))
+    )).json(by_alias=True).encode()
 
 class MovieRecommendReq(BaseModel):
     movie_pk: int
@@ -167,102 +201,119 @@ class RecommendedMovie(BaseModel):
     rating_predict: int | None
     keywords: list[str]
 
+    @classmethod
+    def from_model(cls, movie: Movie, similarity_score: int, rating_predict: int | None) -> 'RecommendedMovie':
+        all_keywords = []
+        if movie.nlp_data:
+            all_keywords = list(set(movie.nlp_data.overview_keywords + movie.nlp_data.reviews_keywords))
+
+        return RecommendedMovie(
+            pk=movie.pk,
+            title_ko=movie.title_ko,
+            title_en=movie.title_en,
+            poster_path=movie.poster_path,
+            similarity_score=similarity_score,
+            genres=[g.name_ko or g.name_en for g in movie.genres],
+            review_nlp_score=int(round(movie.nlp_data.review_nlp_score * 100)) if movie.nlp_data else None,
+            rating_predict=rating_predict,
+            keywords=all_keywords
+        )
+
 class MovieRecommendRes(BaseModel):
     recommended_movies: list[RecommendedMovie]
 
+def _movies_by_pk(movie_pks: list[int]) -> dict[int, Movie]:
+    if not movie_pks:
+        return {}
+
+    q = db.select(Movie) \
+        .options(
+            selectinload(Movie.genres),
+            selectinload(Movie.nlp_data),
+            lazyload(Movie.keywords)
+        ) \
+        .filter(Movie.pk.in_(movie_pks))
+
+    return {m.pk: m for m in db.session.execute(q).scalars()}
+
+def _recommended_movies(ranked: list[tuple[int, int, int | None]],
+                        movies: dict[int, Movie] | None = None) -> list[RecommendedMovie]:
+    if movies is None:
+        movies = _movies_by_pk([movie_pk for movie_pk, _, _ in ranked])
+
+    return [
+        RecommendedMovie.from_model(movies[movie_pk], similarity_score, rating_predict)
+        for movie_pk, similarity_score, rating_predict in ranked
+        if movie_pk in movies
+    ]
+
+def _movie_similarities(movie_pk: int, top_n: int) -> list[tuple[int, float]]:
+    return movie_similarity_cache.get_or_load((movie_pk, top_n), lambda: _load_movie_similarities(movie_pk, top_n))
+
+def _base_movie_predictions(user_pk: int, base_movie_pk: int) -> list[tuple[int, float]]:
+    scorer = online_scorer()
+    if scorer:
+        candidates = _movie_similarities(base_movie_pk, config.RECOMMEND_INDEX_TOP_K)
+        predicted = scorer.predict(user_pk, [movie_pk for movie_pk, _ in candidates])
+        if predicted is not None:
+            return sorted(predicted.items(), key=lambda x: x[1], reverse=True)
+
+    return movie_prediction_cache.get_or_load(
+        (user_pk, base_movie_pk), lambda: _load_base_movie_predictions(user_pk, base_movie_pk)
+    )
+
+def _load_base_movie_predictions(user_pk: int, base_movie_pk: int) -> list[tuple[int, float]]:
+    q = db.select(MoviePrediction.recommended_tmdb_movie_pk, MoviePrediction.rating_predict) \
+        .filter(MoviePrediction.user_pk == user_pk,
+                MoviePrediction.base_tmdb_movie_pk == base_movie_pk) \
+        .order_by(MoviePrediction.rating_predict.desc())
+
+    return [(movie_pk, rating_predict) for movie_pk, rating_predict in db.session.execute(q)]
+
+def _load_movie_similarities(movie_pk: int, top_n: int) -> list[tuple[int, float]]:
+    index = movie_similarity_index.get()
+    if index:
+        neighbors = index.neighbors(movie_pk, top_n)
+        if neighbors is not None:
+            return neighbors
+
+    q = db.select(MovieSimilarity.target_movie_pk, MovieSimilarity.similarity_score) \
+        .filter(MovieSimilarity.source_movie_pk == movie_pk) \
+        .order_by(MovieSimilarity.similarity_score.desc()) \
+        .limit(top_n)
+
+    return [(target_movie_pk, similarity_score) for target_movie_pk, similarity_score in db.session.execute(q)]
+
 @app.api()
 def ott_movie_recommend(req: MovieRecommendReq) -> Res[MovieRecommendRes]:
     from was.blueprints.front import bg
 
     user_pk = bg.user.pk if bg.user else None
 
-    base_movie = db.session.get(Movie, req.movie_pk)
-    if not base_movie:
+    base_movie_pk = db.session.execute(
+        db.select(Movie.pk).filter(Movie.pk == req.movie_pk)
+    ).scalar_one_or_none()
+    if base_movie_pk is None:
         raise ValueError(f"Movie not found: {req.movie_pk}")
 
-    if user_pk:
-        prediction_query = (
-            db.select(MoviePrediction)
-            .filter(MoviePrediction.user_pk == user_pk)
-            .filter(MoviePrediction.base_tmdb_movie_pk == req.movie_pk)
-            .order_by(MoviePrediction.rating_predict.desc())
-            .limit(req.top_n)
-        )
-        predictions = list(db.session.execute(prediction_query).scalars())
-    else:
+    ranked: list[tuple[int, int, int | None]]
 
-        similarity_query = (
-            db.select(MovieSimilarity)
-            .filter(MovieSimilarity.source_movie_pk == req.movie_pk)
-            .order_by(MovieSimilarity.similarity_score.desc())
-            .limit(req.top_n)
-        )
-        predictions = list(db.session.execute(similarity_query).scalars())
-
-    recommended_movies = []
-
-    if user_pk and predictions and isinstance(predictions[0], MoviePrediction):
-
-        for pred in predictions:
-            movie = db.session.execute(
-                db.select(Movie)
-                .options(
-                    joinedload(Movie.genres),
-                    joinedload(Movie.nlp_data)
-                )
-                .filter(Movie.pk == pred.recommended_tmdb_movie_pk)
-            ).unique().scalar_one_or_none()
-
-            if movie:
-
-                all_keywords = []
-                if movie.nlp_data:
-                    all_keywords = list(set(movie.nlp_data.overview_keywords + movie.nlp_data.reviews_keywords))
-
-                rating_predict_score = int(round(pred.rating_predict * 20))
-
-                recommended_movies.append(RecommendedMovie(
-                    pk=movie.pk,
-                    title_ko=movie.title_ko,
-                    title_en=movie.title_en,
-                    poster_path=movie.poster_path,
-                    similarity_score=100,
-                    genres=[g.name_ko or g.name_en for g in movie.genres],
-                    review_nlp_score=int(round(movie.nlp_data.review_nlp_score * 100)) if movie.nlp_data else None,
-                    rating_predict=rating_predict_score,
-                    keywords=all_keywords
-                ))
+    if user_pk:
+        predictions = _base_movie_predictions(user_pk, req.movie_pk)
+        ranked = [
+            (movie_pk, 100, int(round(rating_predict * 20)))
+            for movie_pk, rating_predict in predictions[:req.top_n]
+        ]
     else:
 
-        for sim in predictions:
-            movie = db.session.execute(
-                db.select(Movie)
-                .options(
-                    joinedload(Movie.genres),
-                    joinedload(Movie.nlp_data)
-                )
-                .filter(Movie.pk == sim.target_movie_pk)
-            ).unique().scalar_one_or_none()
-
-            if movie:
-                all_keywords = []
-                if movie.nlp_data:
-                    all_keywords = list(set(movie.nlp_data.overview_keywords + movie.nlp_data.reviews_keywords))
-
-                recommended_movies.append(RecommendedMovie(
-                    pk=movie.pk,
-                    title_ko=movie.title_ko,
-                    title_en=movie.title_en,
-                    poster_path=movie.poster_path,
-                    similarity_score=int(round(sim.similarity_score * 100)),
-                    genres=[g.name_ko or g.name_en for g in movie.genres],
-                    review_nlp_score=int(round(movie.nlp_data.review_nlp_score * 100)) if movie.nlp_data else None,
-                    rating_predict=None,
-                    keywords=all_keywords
-                ))
+        similarities = _movie_similarities(req.movie_pk, req.top_n)
+        ranked = [
+            (movie_pk, int(round(similarity_score * 100)), None)
+            for movie_pk, similarity_score in similarities
+        ]
 
     return ok(MovieRecommendRes(
-        recommended_movies=recommended_movies
+        recommended_movies=_recommended_movies(ranked)
     ))
 
 class UserMovieRecommendReq(BaseModel):
@@ -273,89 +324,157 @@ class UserMovieRecommendRes(BaseModel):
     selected_movie_pk: int
     recommended_movies: list[RecommendedMovie]
 
-@app.api()
-def ott_user_movie_recommend(req: UserMovieRecommendReq) -> Res[UserMovieRecommendRes]:
-    from was.blueprints.front import bg
+def _user_ratings(user_pk: int) -> list[tuple[int, float]]:
+    q = db.select(MovieRating.movie_pk, MovieRating.rating) \
+        .filter(MovieRating.user_pk == user_pk) \
+        .order_by(MovieRating.pk)
 
-    assert bg.user is not None
-    user_pk = bg.user.pk
+    return [(movie_pk, rating) for movie_pk, rating in db.session.execute(q)]
+
+def _movielens_seeds(movie_ids: set[int]) -> dict[int, tuple[str, bool]]:
+    cached = movielens_seed_cache.get_many(movie_ids, _load_movielens_seeds, None)
+    return {movie_id: seed for movie_id, seed in cached.items() if seed is not None}
+
+def _load_movielens_seeds(movie_ids: list[int]) -> dict[int, tuple[str, bool]]:
+    if not movie_ids:
+        return {}
+
+    has_similarity = exists().where(MovieLensTMDBSimilarity.movielens_movie_id == MovieLensMovie.movie_id)
+    q = db.select(MovieLensMovie.movie_id, MovieLensMovie.title, has_similarity) \
+        .filter(MovieLensMovie.movie_id.in_(movie_ids))
 
+    return {movie_id: (title, similar) for movie_id, title, similar in db.session.execute(q)}
+
+def _pick_seed(ratings: list[tuple[int, float]], seeds: dict[int, tuple[str, bool]],
+               selected_movie_ids: set[int] | None = None) -> tuple[int | None, str | None, bool]:
     selected_movielens_movie_id = None
     selected_movie_title = None
-    similarities = []
 
     for rating_threshold in range(50, 0, -1):
         threshold = rating_threshold / 10.0
 
-        high_ratings_query = (
-            db.select(MovieRating)
-            .filter(MovieRating.user_pk == user_pk)
-            .filter(MovieRating.rating >= threshold)
-        )
-        high_ratings = list(db.session.execute(high_ratings_query).scalars())
+        available_movie_ids = [
+            movie_id for movie_id, rating in ratings
+            if rating >= threshold and (selected_movie_ids is None or movie_id not in selected_movie_ids)
+        ]
 
-        if not high_ratings:
+        if not available_movie_ids:
             continue
 
-        selected_rating = random.choice(high_ratings)
-        selected_movielens_movie_id = selected_rating.movie_pk
+        selected_movielens_movie_id = random.choice(available_movie_ids)
+        if selected_movie_ids is not None:
+            selected_movie_ids.add(selected_movielens_movie_id)
 
-        movielens_movie = db.session.get(MovieLensMovie, selected_movielens_movie_id)
-        if movielens_movie:
-            selected_movie_title = movielens_movie.title
+        if selected_movielens_movie_id in seeds:
+            selected_movie_title, similar = seeds[selected_movielens_movie_id]
+
+            if similar:
+                return selected_movielens_movie_id, selected_movie_title, True
+
+    return selected_movielens_movie_id, selected_movie_title, False
+
+def _movielens_similarities(movie_ids: list[int], top_n: int) -> dict[int, list[tuple[int, float]]]:
+    cached = movielens_similarity_cache.get_many(
+        [(movie_id, top_n) for movie_id in movie_ids],
+        lambda keys: {(movie_id, top_n): rail
+                      for movie_id, rail in _load_movielens_similarities([k[0] for k in keys], top_n).items()},
+        []
+    )
+    return {movie_id: rail for (movie_id, _), rail in cached.items()}
+
+def _load_movielens_similarities(movie_ids: list[int], top_n: int) -> dict[int, list[tuple[int, float]]]:
+    similarities: dict[int, list[tuple[int, float]]] = {}
+
+    index = movielens_similarity_index.get()
+    if index:
+        for movie_id in movie_ids:
+            neighbors = index.neighbors(movie_id, top_n)
+            if neighbors is not None:
+                similarities[movie_id] = neighbors
+        movie_ids = [movie_id for movie_id in movie_ids if movie_id not in similarities]
+
+    if not movie_ids:
+        return similarities
+
+    rank = func.row_number().over(
+        partition_by=MovieLensTMDBSimilarity.movielens_movie_id,
+        order_by=MovieLensTMDBSimilarity.similarity_score.desc()
+    ).label('rank')
+    ranked_q = db.select(
+        MovieLensTMDBSimilarity.movielens_movie_id,
+        MovieLensTMDBSimilarity.tmdb_movie_pk,
+        MovieLensTMDBSimilarity.similarity_score,
+        rank
+    ).filter(MovieLensTMDBSimilarity.movielens_movie_id.in_(movie_ids)).subquery()
+
+    q = db.select(ranked_q.c.movielens_movie_id, ranked_q.c.tmdb_movie_pk, ranked_q.c.similarity_score) \
+        .filter(ranked_q.c.rank <= top_n) \
+        .order_by(ranked_q.c.movielens_movie_id, ranked_q.c.rank)
+
+    similarities.update({movie_id: [] for movie_id in movie_ids})
+    for movie_id, tmdb_movie_pk, similarity_score in db.session.execute(q):
+        similarities[movie_id].append((tmdb_movie_pk, similarity_score))
+    return similarities
+
+def _user_predictions(user_pk: int, movie_pks: set[int]) -> dict[int, float]:
+    scorer = online_scorer()
+    if scorer:
+        predicted = scorer.predict(user_pk, list(movie_pks))
+        if predicted is not None:
+            return predicted
+
+    cached = user_prediction_cache.get_many(
+        [(user_pk, movie_pk) for movie_pk in movie_pks],
+        lambda keys: {(user_pk, movie_pk): rating_predict
+                      for movie_pk, rating_predict in _load_user_predictions(user_pk, {k[1] for k in keys}).items()},
+        None
+    )
+    return {movie_pk: rating_predict for (_, movie_pk), rating_predict in cached.items() if rating_predict is not None}
+
+def _load_user_predictions(user_pk: int, movie_pks: set[int]) -> dict[int, float]:
+    if not movie_pks:
+        return {}
+
+    q = db.select(MoviePrediction.recommended_tmdb_movie_pk, MoviePrediction.rating_predict) \
+        .filter(MoviePrediction.user_pk == user_pk,
+                MoviePrediction.recommended_tmdb_movie_pk.in_(movie_pks)) \
+        .distinct(MoviePrediction.recommended_tmdb_movie_pk) \
+        .order_by(MoviePrediction.recommended_tmdb_movie_pk, MoviePrediction.pk)
+
+    return {movie_pk: rating_predict for movie_pk, rating_predict in db.session.execute(q)}
+
+def _user_ranked(similarities: list[tuple[int, float]],
+                 predictions: dict[int, float]) -> list[tuple[int, int, int | None]]:
+    return [
+        (
+            movie_pk,
+            int(round(similarity_score * 100)),
+            int(round(predictions[movie_pk] * 20)) if movie_pk in predictions else None
+        )
+        for movie_pk, similarity_score in similarities
+    ]
 
-            similarity_query = (
-                db.select(MovieLensTMDBSimilarity)
-                .filter(MovieLensTMDBSimilarity.movielens_movie_id == selected_movielens_movie_id)
-                .order_by(MovieLensTMDBSimilarity.similarity_score.desc())
-                .limit(req.top_n)
-            )
-            similarities = list(db.session.execute(similarity_query).scalars())
-
-            if similarities:
-                break
-
-    recommended_movies = []
-    for sim in similarities:
-        movie = db.session.execute(
-            db.select(Movie)
-            .options(
-                joinedload(Movie.genres),
-                joinedload(Movie.nlp_data)
-            )
-            .filter(Movie.pk == sim.tmdb_movie_pk)
-        ).unique().scalar_one_or_none()
-
-        if movie:
-
-            all_keywords = []
-            if movie.nlp_data:
-                all_keywords = list(set(movie.nlp_data.overview_keywords + movie.nlp_data.reviews_keywords))
-
-            prediction = db.session.execute(
-                db.select(MoviePrediction)
-                .filter(MoviePrediction.user_pk == user_pk)
-                .filter(MoviePrediction.recommended_tmdb_movie_pk == movie.pk)
-            ).scalars().first()
-
-            rating_predict_score = int(round(prediction.rating_predict * 20)) if prediction else None
-
-            recommended_movies.append(RecommendedMovie(
-                pk=movie.pk,
-                title_ko=movie.title_ko,
-                title_en=movie.title_en,
-                poster_path=movie.poster_path,
-                similarity_score=int(round(sim.similarity_score * 100)),
-                genres=[g.name_ko or g.name_en for g in movie.genres],
-                review_nlp_score=int(round(movie.nlp_data.review_nlp_score * 100)) if movie.nlp_data else None,
-                rating_predict=rating_predict_score,
-                keywords=all_keywords
-            ))
+@app.api()
+def ott_user_movie_recommend(req: UserMovieRecommendReq) -> Res[UserMovieRecommendRes]:
+    from was.blueprints.front import bg
+
+    assert bg.user is not None
+    user_pk = bg.user.pk
+
+    ratings = _user_ratings(user_pk)
+    seeds = _movielens_seeds({movie_id for movie_id, _ in ratings})
+    selected_movielens_movie_id, selected_movie_title, found = _pick_seed(ratings, seeds)
+
+    similarities: list[tuple[int, float]] = []
+    if found and selected_movielens_movie_id is not None:
+        similarities = _movielens_similarities([selected_movielens_movie_id], req.top_n)[selected_movielens_movie_id]
+
+    predictions = _user_predictions(user_pk, {movie_pk for movie_pk, _ in similarities})
 
     return ok(UserMovieRecommendRes(
         selected_movie_title=selected_movie_title,
         selected_movie_pk=selected_movielens_movie_id,
-        recommended_movies=recommended_movies
+        recommended_movies=_recommended_movies(_user_ranked(similarities, predictions))
     ))
 
 class UserMovieRecommendMultipleReq(BaseModel):
@@ -372,95 +491,33 @@ def ott_user_movie_recommend_multiple(req: UserMovieRecommendMultipleReq) -> Res
     assert bg.user is not None
     user_pk = bg.user.pk
 
-    recommendations = []
-    selected_movie_ids = set()
+    ratings = _user_ratings(user_pk)
+    seeds = _movielens_seeds({movie_id for movie_id, _ in ratings})
 
-    for _ in range(req.count):
-        selected_movielens_movie_id = None
-        selected_movie_title = None
-        similarities = []
-
-        for rating_threshold in range(50, 0, -1):
-            threshold = rating_threshold / 10.0
+    selected_movie_ids: set[int] = set()
+    picked: list[tuple[int, str]] = []
 
-            high_ratings_query = (
-                db.select(MovieRating)
-                .filter(MovieRating.user_pk == user_pk)
-                .filter(MovieRating.rating >= threshold)
+    for _ in range(req.count):
+        selected_movielens_movie_id, selected_movie_title, found = _pick_seed(ratings, seeds, selected_movie_ids)
+        if found and selected_movielens_movie_id is not None and selected_movie_title is not None:
+            picked.append((selected_movielens_movie_id, selected_movie_title))
+
+    similarities = _movielens_similarities([movie_id for movie_id, _ in picked], req.top_n)
+    movie_pks = {movie_pk for rail in similarities.values() for movie_pk, _ in rail}
+    predictions = _user_predictions(user_pk, movie_pks)
+    movies = _movies_by_pk(list(movie_pks))
+
+    recommendations = [
+        UserMovieRecommendRes(
+            selected_movie_title=selected_movie_title,
+            selected_movie_pk=selected_movielens_movie_id,
+            recommended_movies=_recommended_movies(
+                _user_ranked(similarities[selected_movielens_movie_id], predictions), movies
             )
-            high_ratings = list(db.session.execute(high_ratings_query).scalars())
-
-            if not high_ratings:
-                continue
-
-            available_ratings = [r for r in high_ratings if r.movie_pk not in selected_movie_ids]
-
-            if not available_ratings:
-                continue
-
-            selected_rating = random.choice(available_ratings)
-            selected_movielens_movie_id = selected_rating.movie_pk
-            selected_movie_ids.add(selected_movielens_movie_id)
-
-            movielens_movie = db.session.get(MovieLensMovie, selected_movielens_movie_id)
-            if movielens_movie:
-                selected_movie_title = movielens_movie.title
-
-                similarity_query = (
-                    db.select(MovieLensTMDBSimilarity)
-                    .filter(MovieLensTMDBSimilarity.movielens_movie_id == selected_movielens_movie_id)
-                    .order_by(MovieLensTMDBSimilarity.similarity_score.desc())
-                    .limit(req.top_n)
-                )
-                similarities = list(db.session.execute(similarity_query).scalars())
-
-                if similarities:
-                    break
-
-        if similarities:
-            recommended_movies = []
-            for sim in similarities:
-                movie = db.session.execute(
-                    db.select(Movie)
-                    .options(
-                        joinedload(Movie.genres),
-                        joinedload(Movie.nlp_data)
-                    )
-                    .filter(Movie.pk == sim.tmdb_movie_pk)
-                ).unique().scalar_one_or_none()
-
-                if movie:
-
-                    all_keywords = []
-                    if movie.nlp_data:
-                        all_keywords = list(set(movie.nlp_data.overview_keywords + movie.nlp_data.reviews_keywords))
-
-                    prediction = db.session.execute(
-                        db.select(MoviePrediction)
-                        .filter(MoviePrediction.user_pk == user_pk)
-                        .filter(MoviePrediction.recommended_tmdb_movie_pk == movie.pk)
-                    ).scalars().first()
-
-                    rating_predict_score = int(round(prediction.rating_predict * 20)) if prediction else None
-
-                    recommended_movies.append(RecommendedMovie(
-                        pk=movie.pk,
-                        title_ko=movie.title_ko,
-                        title_en=movie.title_en,
-                        poster_path=movie.poster_path,
-                        similarity_score=int(round(sim.similarity_score * 100)),
-                        genres=[g.name_ko or g.name_en for g in movie.genres],
-                        review_nlp_score=int(round(movie.nlp_data.review_nlp_score * 100)) if movie.nlp_data else None,
-                        rating_predict=rating_predict_score,
-                        keywords=all_keywords
-                    ))
-
-            recommendations.append(UserMovieRecommendRes(
-                selected_movie_title=selected_movie_title,
-                selected_movie_pk=selected_movielens_movie_id,
-                recommended_movies=recommended_movies
-            ))
+        )
+        for selected_movielens_movie_id, selected_movie_title in picked
+    ]
 
     return ok(UserMovieRecommendMultipleRes(
         recommendations=recommendations
-    ))
\ No newline at end of file
+    ))
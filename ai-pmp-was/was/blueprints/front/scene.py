@@ -1,10 +1,21 @@
-from sqlalchemy.orm import joinedload
+import struct
+from collections import defaultdict
+from typing import Any
 
-from ex.api import BaseModel, Res, ok
+from sqlalchemy import Select
+from sqlalchemy.orm import joinedload, selectinload, aliased
+
+from ex.api import BaseModel, Res, ok, ok_snapshot, ok_stream, err
+from ex.py.cursor_ex import encode_cursor, decode_cursor
 from ex.flask_ex import not_found
 from was.blueprints.front import app
+from was.cache import scene_catalog_cache, scene_timeline_cache
 from was.model import db
-from was.model.scene import SceneMedia, SceneTimestamp, SceneActor, SceneCategory
+from was.model.asset import Asset
+from was.model.scene import SceneMedia, SceneTimestamp, SceneActor, SceneCategory, SceneMediaActor, \
+    scene_media_category
+from was.scene.facet_index import scene_facet_index
+from was.scene.timeline import Timeline
 from was import config
 
 class SceneListReq(BaseModel):
@@ -25,42 +36,67 @@ class SceneMediaInfo(BaseModel):
 class SceneListRes(BaseModel):
     scenes: list[SceneMediaInfo]
 
-    @classmethod
-    def from_model(cls, media: SceneMedia) -> 'SceneMediaInfo':
-        return SceneMediaInfo(
-            pk=media.pk,
-            title=media.title,
-            video_url=media.video_asset.url,
-            thumbnail_url=media.thumbnail_asset.url if media.thumbnail_asset else None,
-            categories=[cat.name for cat in media.categories],
-            actors=[
-                ActorInfo(
-                    name=actor.name,
-                    image_url=actor.image_asset.url if actor.image_asset else None
-                )
-                for actor in media.actors
-            ]
+def _scene_media_infos(media_pk_q: Select) -> list[SceneMediaInfo]:
+    video_asset = aliased(Asset)
+    thumbnail_asset = aliased(Asset)
+
+    medias = db.session.execute(
+        db.select(SceneMedia.pk, SceneMedia.title, video_asset.url, thumbnail_asset.url)
+        .join(video_asset, SceneMedia.video_asset_pk == video_asset.pk)
+        .outerjoin(thumbnail_asset, SceneMedia.thumbnail_asset_pk == thumbnail_asset.pk)
+        .filter(SceneMedia.pk.in_(media_pk_q))
+        .order_by(SceneMedia.title.collate(config.DB_COLLNAME), SceneMedia.pk)
+    ).all()
+    if not medias:
+        return []
+
+    media_pks = [pk for pk, _, _, _ in medias]
+
+    categories: dict[int, list[str]] = defaultdict(list)
+    for media_pk, name in db.session.execute(
+        db.select(scene_media_category.c.scene_media_pk, SceneCategory.name)
+        .join(SceneCategory, SceneCategory.pk == scene_media_category.c.scene_category_pk)
+        .filter(scene_media_category.c.scene_media_pk.in_(media_pks))
+        .order_by(scene_media_category.c.scene_media_pk, SceneCategory.pk)
+    ):
+        categories[media_pk].append(name)
+
+    # 영상별 배우를 한 번에 모아 등장 순서대로 정렬
+    first_start_frame = db.func.min(SceneMediaActor.first_start_frame)
+    actors: dict[int, list[ActorInfo]] = defaultdict(list)
+    for media_pk, name, image_url in db.session.execute(
+        db.select(SceneMediaActor.scene_media_pk, SceneActor.name, Asset.url)
+        .join(SceneActor, SceneActor.pk == SceneMediaActor.scene_actor_pk)
+        .outerjoin(Asset, SceneActor.image_asset_pk == Asset.pk)
+        .filter(SceneMediaActor.scene_media_pk.in_(media_pks))
+        .group_by(SceneMediaActor.scene_media_pk, SceneActor.pk, Asset.pk)
+        .order_by(SceneMediaActor.scene_media_pk, first_start_frame, SceneActor.pk)
+    ):
+        actors[media_pk].append(ActorInfo(name=name, image_url=image_url))
+
+    return [
+        SceneMediaInfo(
+            pk=pk,
+            title=title,
+            video_url=video_url,
+            thumbnail_url=thumbnail_url,
+            categories=categories[pk],
+            actors=actors[pk]
         )
+        for pk, title, video_url, thumbnail_url in medias
+    ]
 
 @app.api()
 def scene_list(req: SceneListReq) -> Res[SceneListRes]:
-    q = db.select(SceneMedia).options(
-        joinedload(SceneMedia.video_asset),
-        joinedload(SceneMedia.thumbnail_asset),
-        joinedload(SceneMedia.timestamps).joinedload(SceneTimestamp.actors).joinedload(SceneActor.image_asset)
-    )
+    q = db.select(SceneMedia.pk)
 
     if req.category:
         q = q.join(SceneMedia.categories).filter(
             SceneCategory.name == req.category
-        ).distinct()
-
-    q = q.order_by(SceneMedia.title.collate(config.DB_COLLNAME))
-
-    medias = list(db.session.execute(q).scalars().unique())
+        )
 
     return ok(SceneListRes(
-        scenes=[SceneListRes.from_model(m) for m in medias]
+        scenes=_scene_media_infos(q)
     ))
 
 class SceneDetailReq(BaseModel):
@@ -71,6 +107,8 @@ class SceneTimestampInfo(BaseModel):
     scene_id: int
     start_timestamp: str
     end_timestamp: str
+    start_ms: int
+    end_ms: int
     start_frame: int
     end_frame: int
     majority_class: str
@@ -78,11 +116,32 @@ class SceneTimestampInfo(BaseModel):
     display_class: str
     actors: list[ActorInfo]
     thumbnail_url: str | None
+    byte_start: int | None
+    byte_end: int | None
+
+class SceneSpriteTile(BaseModel):
+    timestamp_pk: int
+    sheet: int = 0
+    x: int
+    y: int
+
+class SceneSpriteInfo(BaseModel):
+    url: str
+    sheet_urls: list[str]
+    tile_width: int
+    tile_height: int
+    columns: int
+    rows: int
+    tiles: list[SceneSpriteTile]
+    missing_timestamp_pks: list[int] = []
 
 class SceneDetailRes(BaseModel):
     pk: int
     title: str
     video_url: str
+    moov_byte_start: int | None
+    moov_byte_end: int | None
+    sprite: SceneSpriteInfo | None
     timestamps: list[SceneTimestampInfo]
 
     @classmethod
@@ -92,6 +151,8 @@ class SceneDetailRes(BaseModel):
             scene_id=ts.scene_id,
             start_timestamp=ts.start_timestamp,
             end_timestamp=ts.end_timestamp,
+            start_ms=ts.start_ms,
+            end_ms=ts.end_ms,
             start_frame=ts.start_frame,
             end_frame=ts.end_frame,
             majority_class=ts.majority_class,
@@ -104,30 +165,187 @@ class SceneDetailRes(BaseModel):
                 )
                 for actor in ts.actors
             ],
-            thumbnail_url=ts.thumbnail_asset.url if ts.thumbnail_asset else None
+            thumbnail_url=ts.thumbnail_asset.url if ts.thumbnail_asset else None,
+            byte_start=ts.byte_start,
+            byte_end=ts.byte_end
         )
 
+def _scene_timeline(scene_media_pk: int) -> Timeline[SceneTimestampInfo]:
+    return scene_timeline_cache.get_or_load(scene_media_pk, lambda: _load_scene_timeline(scene_media_pk))
+
+def _scene_timestamp_q(scene_media_pk: int) -> Select:
+    return db.select(SceneTimestamp).options(
+        selectinload(SceneTimestamp.actors).joinedload(SceneActor.image_asset),
+        joinedload(SceneTimestamp.thumbnail_asset)
+    ).filter(SceneTimestamp.scene_media_pk == scene_media_pk)
+
+def _load_scene_timeline(scene_media_pk: int) -> Timeline[SceneTimestampInfo]:
+    return Timeline(
+        (ts.start_frame, ts.end_frame, SceneDetailRes.timestamp_from_model(ts))
+        for ts in db.session.execute(_scene_timestamp_q(scene_media_pk)).scalars()
+    )
+
+def _scene_timestamps_in_ms(scene_media_pk: int, start_ms: int | None, end_ms: int | None) -> list[SceneTimestampInfo]:
+    q = _scene_timestamp_q(scene_media_pk)
+    if end_ms is not None:
+        q = q.filter(SceneTimestamp.start_ms <= end_ms)
+    if start_ms is not None:
+        q = q.filter(SceneTimestamp.end_ms >= start_ms)
+    q = q.order_by(SceneTimestamp.start_ms, SceneTimestamp.end_ms)
+
+    return [SceneDetailRes.timestamp_from_model(ts) for ts in db.session.execute(q).scalars()]
+
+def _scene_sprite(sprite_asset: Asset, manifest: dict[str, Any]) -> SceneSpriteInfo:
+    manifest = dict(manifest)
+    sheet_asset_pks = manifest.pop('sheet_asset_pks', [sprite_asset.pk])
+    urls = dict(db.session.execute(db.select(Asset.pk, Asset.url).filter(Asset.pk.in_(sheet_asset_pks))).tuples())
+    return SceneSpriteInfo(url=sprite_asset.url, sheet_urls=[urls[pk] for pk in sheet_asset_pks], **manifest)
+
 @app.api()
 def scene_detail(req: SceneDetailReq) -> Res[SceneDetailRes]:
     q = db.select(SceneMedia).options(
         joinedload(SceneMedia.video_asset),
-        joinedload(SceneMedia.timestamps).joinedload(SceneTimestamp.actors).joinedload(SceneActor.image_asset),
-        joinedload(SceneMedia.timestamps).joinedload(SceneTimestamp.thumbnail_asset)
+        joinedload(SceneMedia.sprite_asset)
     ).filter(SceneMedia.pk == req.scene_media_pk)
 
     media = db.session.execute(q).scalars().unique().one_or_none()
     if not media:
         return not_found()
 
-    sorted_timestamps = sorted(media.timestamps, key=lambda ts: ts.start_frame)
+    sprite = None
+    if media.sprite_asset and media.sprite_manifest:
+        sprite = _scene_sprite(media.sprite_asset, media.sprite_manifest)
 
     return ok(SceneDetailRes(
         pk=media.pk,
         title=media.title,
         video_url=media.video_asset.url,
-        timestamps=[SceneDetailRes.timestamp_from_model(ts) for ts in sorted_timestamps]
+        moov_byte_start=media.moov_byte_start,
+        moov_byte_end=media.moov_byte_end,
+        sprite=sprite,
+        timestamps=_scene_timeline(media.pk).items
+    ))
+
+class SceneTimelineReq(BaseModel):
+    scene_media_pk: int
+    frame: int | None = None
+    start_frame: int | None = None
+    end_frame: int | None = None
+    position_ms: int | None = None
+    start_ms: int | None = None
+    end_ms: int | None = None
+
+class SceneTimelineRes(BaseModel):
+    timestamps: list[SceneTimestampInfo]
+
+@app.api()
+def scene_timeline(req: SceneTimelineReq) -> Res[SceneTimelineRes]:
+    media_pk = db.session.execute(
+        db.select(SceneMedia.pk).filter(SceneMedia.pk == req.scene_media_pk)
+    ).scalar_one_or_none()
+    if media_pk is None:
+        return not_found()
+
+    if req.position_ms is not None:
+        return ok(SceneTimelineRes(
+            timestamps=_scene_timestamps_in_ms(media_pk, req.position_ms, req.position_ms)
+        ))
+    if req.start_ms is not None or req.end_ms is not None:
+        return ok(SceneTimelineRes(
+            timestamps=_scene_timestamps_in_ms(media_pk, req.start_ms, req.end_ms)
+        ))
+
+    timeline = _scene_timeline(media_pk)
+
+    if req.frame is not None:
+        timestamps = timeline.at(req.frame)
+    else:
+        timestamps = timeline.window(
+            req.start_frame if req.start_frame is not None else 0,
+            req.end_frame if req.end_frame is not None else timeline.max_end
+        )
+
+    return ok(SceneTimelineRes(
+        timestamps=timestamps
+    ))
+
+class SceneTimestampPageReq(BaseModel):
+    scene_media_pk: int
+    start_frame: int | None = None
+    end_frame: int | None = None
+    cursor: str | None = None
+    limit: int = 100
+
+class SceneTimestampPageRes(BaseModel):
+    timestamps: list[SceneTimestampInfo]
+    next_cursor: str | None
+
+# start_frame, pk
+_TIMESTAMP_PAGE_CURSOR = struct.Struct('<qq')
+
+def _scene_timestamp_window_q(scene_media_pk: int, start_frame: int | None, end_frame: int | None) -> Select:
+    q = _scene_timestamp_q(scene_media_pk)
+    if start_frame is not None or end_frame is not None:
+        # idx_scene_timestamp_frame_range 의 식과 같아야 GiST index 를 탄다
+        frame_range = db.func.int4range(SceneTimestamp.start_frame, SceneTimestamp.end_frame, db.literal_column("'[]'"))
+        q = q.filter(frame_range.op('&&')(db.func.int4range(start_frame, end_frame, '[]')))
+    return q.order_by(SceneTimestamp.start_frame, SceneTimestamp.pk)
+
+@app.api()
+def scene_timestamp_page(req: SceneTimestampPageReq) -> Res[SceneTimestampPageRes]:
+    limit = min(max(req.limit, 1), config.SCENE_TIMESTAMP_PAGE_MAX_LIMIT)
+    q = _scene_timestamp_window_q(req.scene_media_pk, req.start_frame, req.end_frame).limit(limit + 1)
+
+    if req.cursor:
+        cursor = decode_cursor(_TIMESTAMP_PAGE_CURSOR, req.cursor)
+        if cursor is None:
+            return err('잘못된 cursor 입니다.')
+        q = q.filter(db.tuple_(SceneTimestamp.start_frame, SceneTimestamp.pk) > cursor)
+
+    timestamps = list(db.session.execute(q).scalars())
+
+    next_cursor = None
+    if len(timestamps) > limit:
+        timestamps = timestamps[:limit]
+        next_cursor = encode_cursor(_TIMESTAMP_PAGE_CURSOR, timestamps[-1].start_frame, timestamps[-1].pk)
+
+    return ok(SceneTimestampPageRes(
+        timestamps=[SceneDetailRes.timestamp_from_model(ts) for ts in timestamps],
+        next_cursor=next_cursor
     ))
 
+class SceneDetailStreamReq(BaseModel):
+    scene_media_pk: int
+    start_frame: int | None = None
+    end_frame: int | None = None
+
+class SceneDetailStreamHeader(BaseModel):
+    pk: int
+    title: str
+    video_url: str
+    moov_byte_start: int | None
+    moov_byte_end: int | None
+
+# 첫 줄은 Res[SceneDetailStreamHeader], 이후 한 줄에 SceneTimestampInfo 하나씩 (application/x-ndjson)
+@app.stream_api(SceneTimestampInfo)
+def scene_detail_stream(req: SceneDetailStreamReq) -> Res[SceneDetailStreamHeader]:
+    q = db.select(SceneMedia).options(
+        joinedload(SceneMedia.video_asset)
+    ).filter(SceneMedia.pk == req.scene_media_pk)
+
+    media = db.session.execute(q).scalars().unique().one_or_none()
+    if not media:
+        return not_found()
+
+    timestamp_q = _scene_timestamp_window_q(media.pk, req.start_frame, req.end_frame) \
+        .execution_options(yield_per=config.SCENE_STREAM_CHUNK_SIZE)
+
+    return ok_stream(
+        SceneDetailStreamHeader(pk=media.pk, title=media.title, video_url=media.video_asset.url,
+                                moov_byte_start=media.moov_byte_start, moov_byte_end=media.moov_byte_end),
+        (SceneDetailRes.timestamp_from_model(ts) for ts in db.session.execute(timestamp_q).scalars())
+    )
+
 class SceneCategoryInfo(BaseModel):
     name: str
 
@@ -139,13 +357,16 @@ class SceneCategoryListRes(BaseModel):
 
 @app.api()
 def scene_category_list(req: SceneCategoryListReq) -> Res[SceneCategoryListRes]:
+    return scene_catalog_cache.get_or_load(('category', None), lambda: ok_snapshot(_scene_category_list()))
+
+def _scene_category_list() -> SceneCategoryListRes:
     categories = db.session.execute(
         db.select(SceneCategory.name).distinct().order_by(SceneCategory.name)
     ).scalars().all()
 
-    return ok(SceneCategoryListRes(
+    return SceneCategoryListRes(
         categories=[SceneCategoryInfo(name=cat) for cat in categories]
-    ))
+    )
 
 class SceneActorInfo(BaseModel):
     pk: int
@@ -160,20 +381,25 @@ class SceneActorListRes(BaseModel):
 
 @app.api()
 def scene_actor_list(req: SceneActorListReq) -> Res[SceneActorListRes]:
+    return scene_catalog_cache.get_or_load(
+        ('actor', req.category), lambda: ok_snapshot(_scene_actor_list(req.category))
+    )
+
+def _scene_actor_list(category: str | None) -> SceneActorListRes:
     q = db.select(SceneActor).options(
         joinedload(SceneActor.image_asset)
     )
 
-    if req.category:
-        q = q.join(SceneActor.timestamps).filter(
-            SceneTimestamp.display_class == req.category
-        ).distinct()
+    if category:
+        q = q.filter(SceneActor.pk.in_(
+            db.select(SceneMediaActor.scene_actor_pk).filter(SceneMediaActor.display_class == category)
+        ))
 
     q = q.order_by(SceneActor.name.collate(config.DB_COLLNAME))
 
     actors = list(db.session.execute(q).scalars().unique())
 
-    return ok(SceneActorListRes(
+    return SceneActorListRes(
         actors=[
             SceneActorInfo(
                 pk=actor.pk,
@@ -182,40 +408,50 @@ def scene_actor_list(req: SceneActorListReq) -> Res[SceneActorListRes]:
             )
             for actor in actors
         ]
-    ))
+    )
 
 class SceneChatbotFilterReq(BaseModel):
     category: str | None = None
     actor_name: str | None = None
+    categories: list[str] = []
+    display_classes: list[str] = []
+    majority_classes: list[str] = []
+    actor_names: list[str] = []
+    offset: int = 0
+    limit: int | None = None
 
 class SceneChatbotFilterRes(BaseModel):
     scenes: list[SceneMediaInfo]
+    total: int
+    matched_actor_names: list[str]
 
 @app.api()
 def scene_chatbot_filter(req: SceneChatbotFilterReq) -> Res[SceneChatbotFilterRes]:
-    q = db.select(SceneMedia).options(
-        joinedload(SceneMedia.video_asset),
-        joinedload(SceneMedia.thumbnail_asset),
-        joinedload(SceneMedia.timestamps).joinedload(SceneTimestamp.actors).joinedload(SceneActor.image_asset)
-    )
+    index = scene_facet_index.get()
 
-    filters = []
+    # facet 사이는 AND, 한 facet 안의 값들은 OR
+    filters: dict[str, list[str]] = {}
 
-    if req.category:
-        q = q.join(SceneMedia.categories)
-        filters.append(SceneCategory.name == req.category)
-
-    if req.actor_name:
-        q = q.join(SceneMedia.timestamps).join(SceneTimestamp.actors)
-        filters.append(SceneActor.name == req.actor_name)
+    categories = req.categories + ([req.category] if req.category else [])
+    if categories:
+        filters['category'] = categories
+    if req.display_classes:
+        filters['display_class'] = req.display_classes
+    if req.majority_classes:
+        filters['majority_class'] = req.majority_classes
 
-    if filters:
-        q = q.filter(db.and_(*filters)).distinct()
+    matched_actor_names: list[str] = []
+    actor_queries = req.actor_names + ([req.actor_name] if req.actor_name else [])
+    if actor_queries:
+        for actor_query in actor_queries:
+            matched_actor_names.extend(index.match_actor(actor_query))
+        filters['actor'] = matched_actor_names
 
-    q = q.order_by(SceneMedia.title.collate(config.DB_COLLNAME))
-
-    medias = list(db.session.execute(q).scalars().unique())
+    bits = index.query(filters)
+    page_pks = index.page(bits, req.offset, req.limit)
 
     return ok(SceneChatbotFilterRes(
-        scenes=[SceneListRes.from_model(m) for m in medias]
-    ))
\ No newline at end of file
+        scenes=_scene_media_infos(db.select(SceneMedia.pk).filter(SceneMedia.pk.in_(page_pks))),
+        total=bits.bit_count(),
+        matched_actor_names=matched_actor_names
+    ))
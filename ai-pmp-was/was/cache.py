@@ -0,0 +1,50 @@
+from ex.api import RawRes
+from ex.py.cache_ex import LRUCache, SnapshotStore, VersionStamp, caches
+from was import config
+from was.scene.timeline import Timeline
+
+movie_stamp = VersionStamp(config.was_stamp_path / 'movie')
+movie_recommend_stamp = VersionStamp(config.was_stamp_path / 'movie_recommend')
+scene_stamp = VersionStamp(config.was_stamp_path / 'scene')
+pattern_stamp = VersionStamp(config.was_stamp_path / 'pattern')
+
+stamps: dict[str, VersionStamp] = {
+    'movie': movie_stamp,
+    'movie_recommend': movie_recommend_stamp,
+    'scene': scene_stamp,
+    'pattern': pattern_stamp,
+}
+
+movie_count_cache: LRUCache[str, int] = LRUCache('movie_count', 16, config.MOVIE_COUNT_TTL, movie_stamp)
+# 직렬화된 영화 상세 응답, worker 끼리는 디스크 snapshot 을 같이 쓰고 process LRU 는 그 앞에 둔다
+movie_detail_snapshots = SnapshotStore(config.was_tmp_path / 'movie_detail', movie_stamp)
+movie_detail_cache: LRUCache[int, bytes] = LRUCache(
+    'movie_detail', config.MOVIE_DETAIL_CACHE_SIZE, stamp=movie_stamp
+)
+
+movie_similarity_cache: LRUCache[tuple[int, int], list[tuple[int, float]]] = LRUCache(
+    'movie_similarity', config.RECOMMEND_CACHE_SIZE, config.RECOMMEND_CACHE_TTL, movie_recommend_stamp
+)
+movie_prediction_cache: LRUCache[tuple[int, int], list[tuple[int, float]]] = LRUCache(
+    'movie_prediction', config.RECOMMEND_CACHE_SIZE, config.RECOMMEND_CACHE_TTL, movie_recommend_stamp
+)
+movielens_similarity_cache: LRUCache[tuple[int, int], list[tuple[int, float]]] = LRUCache(
+    'movielens_similarity', config.RECOMMEND_CACHE_SIZE, config.RECOMMEND_CACHE_TTL, movie_recommend_stamp
+)
+movielens_seed_cache: LRUCache[int, tuple[str, bool] | None] = LRUCache(
+    'movielens_seed', config.RECOMMEND_CACHE_SIZE, config.RECOMMEND_CACHE_TTL, movie_recommend_stamp
+)
+user_prediction_cache: LRUCache[tuple[int, int], float | None] = LRUCache(
+    'user_prediction', config.RECOMMEND_CACHE_SIZE * 10, config.RECOMMEND_CACHE_TTL, movie_recommend_stamp
+)
+
+scene_timeline_cache: LRUCache[int, Timeline] = LRUCache(
+    'scene_timeline', config.SCENE_TIMELINE_CACHE_SIZE, stamp=scene_stamp
+)
+
+scene_catalog_cache: LRUCache[tuple[str, str | None], RawRes] = LRUCache(
+    'scene_catalog', config.SCENE_CATALOG_CACHE_SIZE, stamp=scene_stamp
+)
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -32,6 +32,36 @@ TMDB_IMAGE_BASE_URL = 'https://image.tmdb.org/t/p'
 
 FILE_UPLOAD_MAX_SIZE = 1000 * 1024 * 1024
 
+RECOMMEND_CACHE_SIZE = 20000
+RECOMMEND_CACHE_TTL = 60 * 60
+RECOMMEND_DATA_DIR = ''
+RECOMMEND_INDEX_TOP_K = 100
+SIMILARITY_TOP_K = 100
+SIMILARITY_BLOCK_SIZE = 1024
+FACTORIZATION_RANK = 32
+FACTORIZATION_REG = 0.1
+FACTORIZATION_ITERATIONS = 15
+PREDICTION_TOP_N = 20
+PREDICTION_BLOCK_SIZE = 64
+MOVIE_COUNT_TTL = 5 * 60
+MOVIE_DETAIL_CACHE_SIZE = 5000
+SCENE_TIMELINE_CACHE_SIZE = 500
+SCENE_STREAM_CHUNK_SIZE = 200
+SCENE_TIMESTAMP_PAGE_MAX_LIMIT = 500
+SCENE_CATALOG_CACHE_SIZE = 256
+SCENE_SPRITE_TILE_WIDTH = 160
+SCENE_SPRITE_TILE_HEIGHT = 90
+SCENE_SPRITE_COLUMNS = 10
+SCENE_SPRITE_MAX_ROWS = 100
+SCENE_SPRITE_QUALITY = 80
+SCENE_SPRITE_WORKERS = 0
+SCENE_IMPORT_UPLOAD_WORKERS = 8
+RECOMMEND_ONLINE_SCORING = False
+PATTERN_THUMBNAIL_SEED: int | None = None
+PATTERN_TIMETABLE_CACHE = True
+PATTERN_BATCH_SEED = 0
+PATTERN_BATCH_BLOCK_SIZE = 4096
+
 IS_DEBUG = False
 
 configure(__name__)
@@ -42,4 +72,6 @@ if SQLALCHEMY_DATABASE_URI.startswith('postgres://'):
     SQLALCHEMY_DATABASE_URI = 'postgresql://' + SQLALCHEMY_DATABASE_URI.removeprefix('postgres://')
 
 was_root_path: Path = Path(__file__).resolve().parent.parent
-was_tmp_path: Path = was_root_path / "tmp"
\ No newline at end of file
+was_tmp_path: Path = was_root_path / "tmp"
+was_stamp_path: Path = was_tmp_path / "stamp"
+recommend_data_path: Path = Path(RECOMMEND_DATA_DIR) if RECOMMEND_DATA_DIR else was_tmp_path / "recommend"
@@ -1,8 +1,9 @@
 import uuid as py_uuid
-from typing import Union, IO, List, Optional
+from typing import Union, IO, List, Optional, Any
 from urllib.parse import quote
 
 import boto3
+from more_itertools import chunked
 from sqlalchemy import String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
@@ -23,11 +24,10 @@ class Asset(Model):
     __table_args__ = ({'comment': '업로드 파일'},)
 
     @classmethod
-    def new_(cls, name, content_type, file: Union[IO[bytes], FileStorage]):
+    def new_(cls, name, content_type, file: Union[IO[bytes], FileStorage], client: Any = None):
         asset_uuid = py_uuid.uuid4()
 
-        object_name: str = config.R2_BUCKET_ASSET_PREFIX + '/' + str(asset_uuid) + '/' + name
-        object_name = object_name.removeprefix('/')
+        object_name = cls._object_name(asset_uuid, name)
 
         path_parts = object_name.rsplit('/', 1)
         encoded_filename = quote(path_parts[1], safe='')
@@ -40,16 +40,38 @@ class Asset(Model):
         asset.url = f'{config.R2_ASSET_BASE_URL}/{encoded_object_name}'
         asset.download_url = f'{config.R2_ASSET_BASE_URL}/{encoded_object_name}'
 
-        boto3.client(
+        (client or cls.s3_client()).upload_fileobj(
+            file, config.R2_BUCKET, object_name, ExtraArgs={'ContentType': content_type}
+        )
+        return asset
+
+    @classmethod
+    def _object_name(cls, asset_uuid: py_uuid.UUID, name: str) -> str:
+        object_name: str = config.R2_BUCKET_ASSET_PREFIX + '/' + str(asset_uuid) + '/' + name
+        return object_name.removeprefix('/')
+
+    @property
+    def object_name(self) -> str:
+        return self._object_name(self.uuid, self.name)
+
+    @classmethod
+    def delete_objects(cls, object_names: List[str], client: Any = None) -> None:
+        client = client or cls.s3_client()
+        # DeleteObjects 는 한 번에 1000 개까지
+        for names in chunked(object_names, 1000):
+            res = client.delete_objects(Bucket=config.R2_BUCKET, Delete={'Objects': [{'Key': n} for n in names]})
+            if res.get('Errors'):
+                raise RuntimeError(f'{len(res["Errors"])} 개 파일 삭제 실패: {res["Errors"][0]}')
+
+    @classmethod
+    def s3_client(cls) -> Any:
+        return boto3.client(
             's3',
             aws_access_key_id=config.R2_ACCESS_KEY_ID,
             aws_secret_access_key=config.R2_SECRET_ACCESS_KEY,
             endpoint_url=config.R2_ENDPOINT_URL,
             region_name=config.R2_REGION
-        ).upload_fileobj(
-            file, config.R2_BUCKET, object_name, ExtraArgs={'ContentType': content_type}
         )
-        return asset
 
     @classmethod
     def _from_uuids(cls, uuids: List[py_uuid.UUID]) -> List['Asset']:
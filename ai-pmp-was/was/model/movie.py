@@ -87,6 +87,7 @@ class Movie(Model):
         Index('idx_movie_title_en', 'title_en'),
         Index('idx_movie_title_ko', 'title_ko'),
         Index('idx_movie_release_date', 'release_date'),
+        Index('idx_movie_popularity_pk', 'popularity', 'pk'),
         {'comment': 'TMDB 영화 정보'},
     )
 
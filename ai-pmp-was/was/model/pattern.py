@@ -1,7 +1,6 @@
 from datetime import datetime, date
-import random
 
-from sqlalchemy import String, DateTime, Date, ForeignKey, func, select
+from sqlalchemy import String, DateTime, Date, Float, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from was.model import Model
@@ -33,21 +32,9 @@ class PatternProgram(Model):
         if self.asset:
             return self.asset.url
 
-        from was.model import db
+        from was.pattern.thumbnail import pattern_thumbnail_pool
 
-        q = select(PatternProgram) \
-            .filter(PatternProgram.genre_ko == self.genre_ko,
-                    PatternProgram.asset_pk.isnot(None),
-                    PatternProgram.pk != self.pk) \
-            .join(PatternProgram.asset)
-
-        programs_with_asset = list(db.session.execute(q).scalars())
-
-        if programs_with_asset:
-            selected = random.choice(programs_with_asset)
-            return selected.asset.url if selected.asset else None
-
-        return None
+        return pattern_thumbnail_pool.get().pick(self.genre_ko, exclude_pk=self.pk)
 
 class PatternTVSchedule(Model):
     __tablename__ = 'pattern_tv_schedule'
@@ -64,6 +51,7 @@ class PatternTVSchedule(Model):
     create_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     __table_args__ = (
+        Index('idx_pattern_tv_schedule_day_time', 'day_of_week', 'time'),
         {'comment': 'Pattern - TV 채널 편성표'},
     )
 
@@ -79,7 +67,7 @@ class PatternTVViewingLog(Model):
     program: Mapped[PatternProgram] = relationship()
 
     quarter: Mapped[str] = mapped_column(String(10), comment='Q1, Q2, Q3, Q4')
-    view_date: Mapped[date] = mapped_column(Date, comment='시청 날짜')
+    view_date: Mapped[date] = mapped_column(Date, primary_key=True, comment='시청 날짜 (partition key)')
     view_time: Mapped[str] = mapped_column(String(10), comment='시청 시간 HH:MM')
     day: Mapped[str] = mapped_column(String(20), comment='요일')
     channel: Mapped[str] = mapped_column(String(20), comment='채널')
@@ -87,5 +75,36 @@ class PatternTVViewingLog(Model):
     create_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     __table_args__ = (
-        {'comment': 'Pattern - TV 시청 기록'},
-    )
\ No newline at end of file
+        Index('idx_pattern_tv_viewing_log_user_date_time', 'user_pk', 'view_date', 'view_time'),
+        Index('idx_pattern_tv_viewing_log_view_date_brin', 'view_date', postgresql_using='brin'),
+        {'comment': 'Pattern - TV 시청 기록 (view_date 분기별 partition)', 'postgresql_partition_by': 'RANGE (view_date)'},
+    )
+
+class PatternUserGenreStat(Model):
+    __tablename__ = 'pattern_user_genre_stat'
+
+    user_pk: Mapped[int] = mapped_column(ForeignKey(User.pk, ondelete='CASCADE'), primary_key=True, comment='사용자 FK')
+    genre: Mapped[str] = mapped_column(String(50), primary_key=True, comment='한글 장르')
+
+    view_count: Mapped[int] = mapped_column(comment='시청 횟수')
+    last_view_at: Mapped[datetime] = mapped_column(DateTime, comment='마지막 시청 일시')
+
+    __table_args__ = (
+        {'comment': 'Pattern - 사용자별 장르 시청 집계 (pattern_tv_viewing_log trigger 로 유지)'},
+    )
+
+class PatternUserRecommendation(Model):
+    __tablename__ = 'pattern_user_recommendation'
+
+    user_pk: Mapped[int] = mapped_column(ForeignKey(User.pk, ondelete='CASCADE'), primary_key=True, comment='사용자 FK')
+    day_of_week: Mapped[str] = mapped_column(String(20), primary_key=True, comment='월요일, 화요일, ...')
+    time: Mapped[str] = mapped_column(String(10), primary_key=True, comment='HH:MM')
+    rank: Mapped[int] = mapped_column(primary_key=True, comment='추천 순위 (0부터)')
+
+    channel: Mapped[str] = mapped_column(String(20), comment='채널')
+    program_pk: Mapped[int] = mapped_column(ForeignKey(PatternProgram.pk, ondelete='CASCADE'))
+    score: Mapped[float] = mapped_column(Float, comment='장르 선호 확률')
+
+    __table_args__ = (
+        {'comment': 'Pattern - 사용자 x 요일 x 시간 추천 (bin/batch_pattern_recommend.py 로 생성)'},
+    )
@@ -1,6 +1,8 @@
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import String, DateTime, Text, ForeignKey, func, Index, Table, Column
+from sqlalchemy import String, DateTime, Text, ForeignKey, func, Index, Table, Column, text, Computed, BigInteger
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from was.model import Model
@@ -20,6 +22,10 @@ scene_timestamp_actor = Table(
     Column('scene_actor_pk', ForeignKey('scene_actor.pk'), primary_key=True),
 )
 
+def _timestamp_ms_sql(column: str) -> str:
+    return f"(split_part({column}, ':', 1)::integer * 3600000 + split_part({column}, ':', 2)::integer * 60000 " \
+           f"+ round(split_part({column}, ':', 3)::numeric * 1000)::integer)"
+
 class SceneCategory(Model):
     __tablename__ = 'scene_category'
 
@@ -64,19 +70,27 @@ class SceneMedia(Model):
     video_asset: Mapped[Asset] = relationship(foreign_keys=[video_asset_pk])
     thumbnail_asset: Mapped[Asset | None] = relationship(foreign_keys=[thumbnail_asset_pk])
 
+    sprite_asset_pk: Mapped[int | None] = mapped_column(ForeignKey(Asset.pk), nullable=True,
+                                                        comment='타임스탬프 썸네일 sprite sheet')
+    sprite_manifest: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True,
+                                                                   comment='sprite sheet 안의 타임스탬프별 좌표')
+    sprite_asset: Mapped[Asset | None] = relationship(foreign_keys=[sprite_asset_pk])
+
+    source_key: Mapped[str | None] = mapped_column(String(200), nullable=True, unique=True,
+                                                   comment='scene_import 원본 JSON 파일 이름')
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True,
+                                                     comment='원본 JSON 과 파일들의 sha256')
+    source_stat: Mapped[str | None] = mapped_column(String(64), nullable=True,
+                                                    comment='원본 JSON 과 파일들의 크기, mtime 의 sha256')
+
+    moov_byte_start: Mapped[int | None] = mapped_column(BigInteger, nullable=True, comment='영상 moov box 시작 byte')
+    moov_byte_end: Mapped[int | None] = mapped_column(BigInteger, nullable=True, comment='영상 moov box 끝 byte (포함)')
+
     create_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     timestamps: Mapped[list['SceneTimestamp']] = relationship(back_populates='scene_media', cascade='all, delete-orphan')
     categories: Mapped[list[SceneCategory]] = relationship(secondary=scene_media_category, lazy='joined')
 
-    @property
-    def actors(self) -> list[SceneActor]:
-        actors_dict = {}
-        for ts in self.timestamps:
-            for actor in ts.actors:
-                actors_dict[actor.pk] = actor
-        return list(actors_dict.values())
-
     __table_args__ = (
         {'comment': 'Scene - 영상 마스터'},
     )
@@ -92,6 +106,11 @@ class SceneTimestamp(Model):
     start_timestamp: Mapped[str] = mapped_column(String(20), comment='시작 시간 (00:00:00.00)')
     end_timestamp: Mapped[str] = mapped_column(String(20), comment='종료 시간')
 
+    start_ms: Mapped[int] = mapped_column(Computed(_timestamp_ms_sql('start_timestamp'), persisted=True),
+                                          comment='시작 시간 (ms)')
+    end_ms: Mapped[int] = mapped_column(Computed(_timestamp_ms_sql('end_timestamp'), persisted=True),
+                                        comment='종료 시간 (ms)')
+
     start_frame: Mapped[int] = mapped_column(comment='시작 프레임')
     end_frame: Mapped[int] = mapped_column(comment='종료 프레임')
 
@@ -101,6 +120,9 @@ class SceneTimestamp(Model):
 
     thumbnail_asset_pk: Mapped[int | None] = mapped_column(ForeignKey(Asset.pk), nullable=True, comment='타임스탬프 썸네일 이미지')
 
+    byte_start: Mapped[int | None] = mapped_column(BigInteger, nullable=True, comment='직전 keyframe 부터의 영상 시작 byte')
+    byte_end: Mapped[int | None] = mapped_column(BigInteger, nullable=True, comment='영상 끝 byte (포함)')
+
     create_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     scene_media: Mapped[SceneMedia] = relationship(back_populates='timestamps')
@@ -114,5 +136,28 @@ class SceneTimestamp(Model):
         Index('idx_scene_timestamp_media', 'scene_media_pk'),
         Index('idx_scene_timestamp_category', 'category'),
         Index('idx_scene_timestamp_display_class', 'display_class'),
+        Index('idx_scene_timestamp_media_start_ms', 'scene_media_pk', 'start_ms'),
+        Index('idx_scene_timestamp_frame_range', 'scene_media_pk', text("int4range(start_frame, end_frame, '[]')"),
+              postgresql_using='gist'),
         {'comment': 'Scene - 타임스탬프 (영상 구간 정보)'},
-    )
\ No newline at end of file
+    )
+
+class SceneMediaActor(Model):
+    __tablename__ = 'scene_media_actor'
+
+    scene_media_pk: Mapped[int] = mapped_column(
+        ForeignKey(SceneMedia.pk, ondelete='CASCADE'), primary_key=True, comment='영상 FK'
+    )
+    scene_actor_pk: Mapped[int] = mapped_column(
+        ForeignKey(SceneActor.pk, ondelete='CASCADE'), primary_key=True, comment='배우 FK'
+    )
+    display_class: Mapped[str] = mapped_column(String(100), primary_key=True, comment='표시 클래스')
+
+    timestamp_count: Mapped[int] = mapped_column(comment='등장 타임스탬프 수')
+    first_start_frame: Mapped[int] = mapped_column(comment='첫 등장 프레임')
+
+    __table_args__ = (
+        Index('idx_scene_media_actor_actor', 'scene_actor_pk'),
+        Index('idx_scene_media_actor_display_class', 'display_class', 'scene_actor_pk'),
+        {'comment': 'Scene - 영상별 배우 집계 (scene_timestamp_actor trigger 로 유지)'},
+    )
@@ -0,0 +1,126 @@
+from typing import Iterator
+
+import numpy as np
+
+from was.model import db
+from was.model.pattern import PatternUserGenreStat
+from was.model.user import User
+from was.pattern.timetable import ScheduleSlot, SlotGroup, Timetable
+from was.pattern.weights import GENRES, HISTORY_WEIGHT, genre_weights
+
+RECOMMEND_TOP_K = 30
+
+def genre_probabilities(weights: dict[str, float]) -> np.ndarray:
+    row = np.array([weights.get(g, 0.0) for g in GENRES], dtype=np.float64)
+    return row / row.sum()
+
+def genre_probability_matrix(users: list[User]) -> np.ndarray:
+    # 나이대 x 직업 조합이 같으면 기본 가중치도 같다
+    profiles: dict[tuple[str, str], int] = {}
+    profile_users: list[User] = []
+    profile_index = np.zeros(len(users), dtype=np.int64)
+    for i, user in enumerate(users):
+        key = (user.age, user.occupation)
+        if key not in profiles:
+            profiles[key] = len(profile_users)
+            profile_users.append(user)
+        profile_index[i] = profiles[key]
+
+    base = np.array([[weights[g] for g in GENRES] for weights in map(genre_weights, profile_users)],
+                    dtype=np.float64).reshape(len(profile_users), len(GENRES))
+
+    # 시청 기록 비율의 분모는 GENRES 밖의 장르까지 포함한 전체 시청 수
+    user_index = {user.pk: i for i, user in enumerate(users)}
+    genre_index = {g: i for i, g in enumerate(GENRES)}
+    counts = np.zeros((len(users), len(GENRES)))
+    totals = np.zeros(len(users))
+    q = db.select(PatternUserGenreStat.user_pk, PatternUserGenreStat.genre, PatternUserGenreStat.view_count)
+    for user_pk, genre, view_count in db.session.execute(q):
+        row = user_index.get(user_pk)
+        if row is None:
+            continue
+        totals[row] += view_count
+        if genre in genre_index:
+            counts[row, genre_index[genre]] = view_count
+
+    history = np.divide(counts, totals[:, None], out=np.zeros_like(counts), where=totals[:, None] > 0)
+    weights = base[profile_index] + history * HISTORY_WEIGHT
+    return weights / weights.sum(axis=1, keepdims=True)
+
+def sample_slot(probs: np.ndarray, slot_genres: np.ndarray, slot_channels: np.ndarray, k: int,
+                rng: np.random.Generator) -> np.ndarray:
+    # 배치와 pattern_recommendations 가 같이 쓰는 추천 규칙, 사용자마다
+    # 1. probs 로 장르를 k 번 뽑는다
+    # 2. 채널마다 slot 하나를 무작위로 후보로 남긴다 (한 채널은 한 번만 추천)
+    # 3. 장르별로 뽑힌 횟수만큼 그 장르의 후보를 무작위로 고른다
+    # 4. 장르 후보가 모자라 남은 자리는 나머지 후보에서 무작위로 채운다
+    # slot_genres 는 GENRES index (없는 장르는 len(GENRES)), slot_channels 는 같은 채널끼리 붙어 있어야 한다
+    # 결과는 사용자별 slot index 를 점수 (장르 확률) 내림차순, 같으면 slot 순서로, 빈 자리는 -1
+    n_users, n_genres = probs.shape
+    n_slots = len(slot_genres)
+
+    cdf = np.cumsum(probs, axis=1)
+    draws = rng.random((n_users, k)) * cdf[:, -1:]
+    chosen = np.minimum((draws[:, :, None] >= cdf[:, None, :]).sum(axis=2), n_genres - 1)
+    counts = (chosen[:, :, None] == np.arange(n_genres + 1)).sum(axis=1)
+
+    # 같은 채널의 slot 이 여럿이면 사용자마다 하나만 후보로 남긴다
+    keys = rng.random((n_users, n_slots))
+    channel_starts = np.flatnonzero(np.r_[True, slot_channels[1:] != slot_channels[:-1]])
+    if len(channel_starts) < n_slots:
+        channel_min = np.minimum.reduceat(keys, channel_starts, axis=1)
+        eligible = keys == np.repeat(channel_min, np.diff(np.r_[channel_starts, n_slots]), axis=1)
+    else:
+        eligible = np.ones((n_users, n_slots), dtype=bool)
+
+    # 장르 순으로 묶고 묶음 안에서는 무작위 순서, 후보 중 앞에서부터 뽑힌 횟수만큼 고른다
+    order = np.argsort(slot_genres[None, :] + keys, axis=1)
+    sorted_genres = slot_genres[order]
+    sorted_eligible = np.take_along_axis(eligible, order, axis=1)
+    block_starts = np.searchsorted(np.sort(slot_genres), np.arange(n_genres + 1))
+
+    eligible_before = np.hstack([np.zeros((n_users, 1), dtype=np.int64), np.cumsum(sorted_eligible, axis=1)])
+    rank = eligible_before[:, 1:] - 1 - np.take_along_axis(eligible_before, block_starts[sorted_genres], axis=1)
+    taken = sorted_eligible & (rank < np.take_along_axis(counts, sorted_genres, axis=1))
+
+    selected = np.zeros((n_users, n_slots), dtype=bool)
+    np.put_along_axis(selected, order, taken, axis=1)
+
+    # 장르 후보가 모자란 만큼 남은 채널에서 채운다
+    remaining = k - selected.sum(axis=1)
+    fill_keys = np.where(selected | ~eligible, np.inf, rng.random((n_users, n_slots)))
+    fill_rank = np.argsort(np.argsort(fill_keys, axis=1), axis=1)
+    selected |= (fill_rank < remaining[:, None]) & np.isfinite(fill_keys)
+
+    genre_probs = np.hstack([probs, np.zeros((n_users, 1))])
+    scores = np.where(selected, np.take_along_axis(genre_probs, np.broadcast_to(slot_genres, (n_users, n_slots)),
+                                                   axis=1), -np.inf)
+    ranked = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+    return np.where(np.take_along_axis(selected, ranked, axis=1), ranked, -1)
+
+def _slot_score(probs: np.ndarray, genre: int) -> float:
+    return float(probs[genre]) if genre < len(GENRES) else 0.0
+
+def sample_group(group: SlotGroup, probs: np.ndarray, rng: np.random.Generator) -> list[tuple[ScheduleSlot, float]]:
+    # 사용자 한 명분, recommend_all 과 같은 규칙과 점수
+    k = min(RECOMMEND_TOP_K, len(group.slots))
+    selected = sample_slot(probs[None, :], group.slot_genres, group.slot_channels, k, rng)[0]
+    return [(group.slots[i], _slot_score(probs, group.slot_genres[i])) for i in selected.tolist() if i >= 0]
+
+def recommend_all(timetable: Timetable, user_pks: np.ndarray, probs: np.ndarray, rng: np.random.Generator,
+                  block_size: int) -> Iterator[tuple[int, str, str, int, str, int, float]]:
+    for (day, time), group in timetable.groups.items():
+        k = min(RECOMMEND_TOP_K, len(group.slots))
+
+        for start in range(0, len(user_pks), block_size):
+            block_probs = probs[start:start + block_size]
+            selected = sample_slot(block_probs, group.slot_genres, group.slot_channels, k, rng)
+
+            for row, (user_pk, slot_indexes) in enumerate(zip(user_pks[start:start + block_size].tolist(),
+                                                              selected.tolist())):
+                for rank, i in enumerate(slot_indexes):
+                    if i < 0:
+                        break
+                    slot = group.slots[i]
+                    score = _slot_score(block_probs[row], group.slot_genres[i])
+                    yield user_pk, day, time, rank, slot.channel, slot.program_pk, score
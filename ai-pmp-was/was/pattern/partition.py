@@ -0,0 +1,87 @@
+import re
+from datetime import date
+from enum import auto
+
+from sqlalchemy import text
+
+from ex.py.enum_ex import StringEnum
+from was.model import db
+
+LOG_TABLE = 'pattern_tv_viewing_log'
+LOG_DEFAULT_PARTITION = f'{LOG_TABLE}_default'
+
+_PARTITION_NAME = re.compile(rf'^{LOG_TABLE}_(\d{{4}})q([1-4])$')
+
+class Quarter(StringEnum):
+    Q1 = auto()
+    Q2 = auto()
+    Q3 = auto()
+    Q4 = auto()
+
+def quarter_start(d: date) -> date:
+    return date(d.year, (d.month - 1) // 3 * 3 + 1, 1)
+
+def next_quarter(start: date) -> date:
+    return date(start.year + 1, 1, 1) if start.month == 10 else date(start.year, start.month + 3, 1)
+
+def quarter_range(year: int, quarter: Quarter) -> tuple[date, date]:
+    start = date(year, (int(quarter.removeprefix('Q')) - 1) * 3 + 1, 1)
+    return start, next_quarter(start)
+
+# latest 이전(포함)의 가장 최근 quarter 의 연도
+def latest_quarter_year(latest: date, quarter: Quarter) -> int:
+    start, _ = quarter_range(latest.year, quarter)
+    return latest.year if start <= latest else latest.year - 1
+
+def partition_name(start: date) -> str:
+    return f'{LOG_TABLE}_{start.year}q{(start.month - 1) // 3 + 1}'
+
+def log_partitions() -> dict[str, tuple[date, date]]:
+    names = db.session.execute(text('''
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:table AS regclass)
+    '''), {'table': LOG_TABLE}).scalars()
+
+    partitions = {}
+    for name in names:
+        if m := _PARTITION_NAME.match(name):
+            partitions[name] = quarter_range(int(m[1]), Quarter(f'Q{m[2]}'))
+    return partitions
+
+def ensure_log_partitions(first: date, last: date) -> list[str]:
+    existing = log_partitions()
+
+    created = []
+    start = quarter_start(first)
+    while start <= last:
+        name = partition_name(start)
+        if name not in existing:
+            _create_log_partition(name, start, next_quarter(start))
+            created.append(name)
+        start = next_quarter(start)
+    return created
+
+def _create_log_partition(name: str, start: date, end: date) -> None:
+    # default partition 에 이미 들어간 같은 분기 행은 새 partition 으로 옮긴다
+    # 부모 테이블을 거치지 않으므로 pattern_user_genre_stat trigger 는 다시 집계하지 않는다
+    bounds = {'start': start, 'end': end}
+    db.session.execute(text(f'ALTER TABLE {LOG_TABLE} DETACH PARTITION {LOG_DEFAULT_PARTITION}'))
+    db.session.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {LOG_TABLE} FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+    db.session.execute(text(
+        f'INSERT INTO {name} SELECT * FROM {LOG_DEFAULT_PARTITION} WHERE view_date >= :start AND view_date < :end'
+    ), bounds)
+    db.session.execute(text(
+        f'DELETE FROM {LOG_DEFAULT_PARTITION} WHERE view_date >= :start AND view_date < :end'
+    ), bounds)
+    db.session.execute(text(f'ALTER TABLE {LOG_TABLE} ATTACH PARTITION {LOG_DEFAULT_PARTITION} DEFAULT'))
+
+def drop_log_partitions_before(cutoff: date) -> list[str]:
+    dropped = []
+    for name, (_, end) in sorted(log_partitions().items()):
+        if end <= cutoff:
+            db.session.execute(text(f'DROP TABLE {name}'))
+            dropped.append(name)
+    return dropped
@@ -0,0 +1,27 @@
+from sqlalchemy import Time, cast
+
+from was.model import db
+from was.model.pattern import PatternProgram, PatternTVViewingLog, PatternUserGenreStat
+
+def rebuild_user_genre_stat() -> int:
+    q = db.select(
+        PatternTVViewingLog.user_pk,
+        PatternProgram.genre_ko,
+        db.func.count(),
+        db.func.max(PatternTVViewingLog.view_date + cast(PatternTVViewingLog.view_time, Time)),
+    ).join(PatternProgram, PatternProgram.pk == PatternTVViewingLog.program_pk) \
+        .group_by(PatternTVViewingLog.user_pk, PatternProgram.genre_ko)
+
+    db.session.execute(db.delete(PatternUserGenreStat))
+    result = db.session.execute(
+        db.insert(PatternUserGenreStat).from_select(['user_pk', 'genre', 'view_count', 'last_view_at'], q)
+    )
+    return result.rowcount
+
+def user_genre_preference(user_pk: int) -> dict[str, float]:
+    q = db.select(PatternUserGenreStat.genre, PatternUserGenreStat.view_count) \
+        .filter(PatternUserGenreStat.user_pk == user_pk)
+    genre_counts = dict(db.session.execute(q).tuples())
+
+    total = sum(genre_counts.values())
+    return {g: count / total for g, count in genre_counts.items()} if total else {}
@@ -0,0 +1,65 @@
+import random
+import threading
+
+from ex.py.cache_ex import VersionStamp
+from was import config
+from was.cache import pattern_stamp
+from was.model import db
+from was.model.asset import Asset
+from was.model.pattern import PatternProgram
+
+class ThumbnailPool:
+    def __init__(self, genres: dict[str, tuple[list[int], list[str]]], seed: int | None = None) -> None:
+        # 장르 -> (program pk 목록, 썸네일 url 목록), 같은 index 끼리 짝
+        self.genres = genres
+        self.random = random.Random(seed)
+
+    def pick(self, genre: str, exclude_pk: int | None = None) -> str | None:
+        pool = self.genres.get(genre)
+        if not pool:
+            return None
+
+        pks, urls = pool
+        n = len(urls)
+        i = self.random.randrange(n)
+        if pks[i] == exclude_pk:
+            if n == 1:
+                return None
+            # 자기 자신을 뺀 나머지 n - 1 개 중에서 균등하게 고른다
+            i = (i + 1 + self.random.randrange(n - 1)) % n
+        return urls[i]
+
+def build_thumbnail_pool(seed: int | None = None) -> ThumbnailPool:
+    q = db.select(PatternProgram.genre_ko, PatternProgram.pk, Asset.url) \
+        .join(Asset, PatternProgram.asset_pk == Asset.pk) \
+        .order_by(PatternProgram.genre_ko, PatternProgram.pk)
+
+    genres: dict[str, tuple[list[int], list[str]]] = {}
+    for genre, pk, url in db.session.execute(q):
+        pks, urls = genres.setdefault(genre, ([], []))
+        pks.append(pk)
+        urls.append(url)
+
+    return ThumbnailPool(genres, seed)
+
+class ThumbnailPoolHolder:
+    def __init__(self, stamp: VersionStamp) -> None:
+        self.stamp = stamp
+        self.seed = config.PATTERN_THUMBNAIL_SEED
+        self._pool: ThumbnailPool | None = None
+        self._pool_version = 0
+        self._lock = threading.Lock()
+
+    def get(self) -> ThumbnailPool:
+        version = self.stamp.current()
+        pool = self._pool
+        if pool is not None and version == self._pool_version:
+            return pool
+
+        with self._lock:
+            if self._pool is None or version != self._pool_version:
+                self._pool = build_thumbnail_pool(self.seed)
+                self._pool_version = version
+            return self._pool
+
+pattern_thumbnail_pool = ThumbnailPoolHolder(pattern_stamp)
@@ -0,0 +1,82 @@
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+from ex.py.cache_ex import VersionStamp
+from was.cache import pattern_stamp
+from was.model import db
+from was.model.asset import Asset
+from was.model.pattern import PatternProgram, PatternTVSchedule
+from was.pattern.weights import GENRES
+
+class ScheduleSlot(NamedTuple):
+    channel: str
+    time: str
+    program_pk: int
+    program_name: str
+    genre: str
+    thumbnail_url: str | None
+
+class SlotGroup:
+    def __init__(self, slots: list[ScheduleSlot]) -> None:
+        # slots 는 같은 채널끼리 붙어 있다 (build_timetable 의 정렬)
+        self.slots = slots
+
+        # sample_slot 에 넘기는 GENRES index (없는 장르는 len(GENRES)) 와 채널 번호
+        genre_index = {g: i for i, g in enumerate(GENRES)}
+        channel_index: dict[str, int] = {}
+        self.slot_genres = np.array([genre_index.get(slot.genre, len(GENRES)) for slot in slots], dtype=np.int64)
+        self.slot_channels = np.array([channel_index.setdefault(slot.channel, len(channel_index)) for slot in slots],
+                                      dtype=np.int64)
+
+class Timetable:
+    def __init__(self, rows: list[tuple[str, ScheduleSlot]]) -> None:
+        self.days: dict[str, list[ScheduleSlot]] = {}
+        grouped: dict[tuple[str, str], list[ScheduleSlot]] = {}
+        for day, slot in rows:
+            self.days.setdefault(day, []).append(slot)
+            grouped.setdefault((day, slot.time), []).append(slot)
+
+        self.groups = {key: SlotGroup(slots) for key, slots in grouped.items()}
+
+    def day(self, day: str) -> list[ScheduleSlot]:
+        return self.days.get(day, [])
+
+    def group(self, day: str, time: str) -> SlotGroup | None:
+        return self.groups.get((day, time))
+
+def build_timetable(day: str | None = None, time: str | None = None) -> Timetable:
+    q = db.select(PatternTVSchedule.day_of_week, PatternTVSchedule.channel, PatternTVSchedule.time,
+                  PatternProgram.pk, PatternProgram.name_ko, PatternProgram.genre_ko, Asset.url) \
+        .join(PatternProgram, PatternProgram.pk == PatternTVSchedule.program_pk) \
+        .outerjoin(Asset, Asset.pk == PatternProgram.asset_pk) \
+        .order_by(PatternTVSchedule.day_of_week, PatternTVSchedule.time, PatternTVSchedule.channel,
+                  PatternTVSchedule.pk)
+    if day is not None:
+        q = q.filter(PatternTVSchedule.day_of_week == day)
+    if time is not None:
+        q = q.filter(PatternTVSchedule.time == time)
+
+    return Timetable([(row[0], ScheduleSlot(*row[1:])) for row in db.session.execute(q)])
+
+class TimetableHolder:
+    def __init__(self, stamp: VersionStamp) -> None:
+        self.stamp = stamp
+        self._timetable: Timetable | None = None
+        self._timetable_version = 0
+        self._lock = threading.Lock()
+
+    def get(self) -> Timetable:
+        version = self.stamp.current()
+        timetable = self._timetable
+        if timetable is not None and version == self._timetable_version:
+            return timetable
+
+        with self._lock:
+            if self._timetable is None or version != self._timetable_version:
+                self._timetable = build_timetable()
+                self._timetable_version = version
+            return self._timetable
+
+pattern_timetable = TimetableHolder(pattern_stamp)
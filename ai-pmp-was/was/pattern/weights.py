@@ -0,0 +1,62 @@
+from was.model.user import User
+
+GENRES = ["뉴스", "드라마", "예능", "영화", "스포츠", "다큐", "애니", "음악", "홈쇼핑", "시사"]
+
+# 시청 기록 장르 비율에 곱하는 가중치
+HISTORY_WEIGHT = 5
+
+def parse_age_group(age_str: str) -> int:
+    if age_str == "56+":
+        return 7
+    if "-" in age_str:
+        _, high = age_str.split("-")
+        high_num = int(high)
+        if high_num <= 17:
+            return 1
+        elif high_num <= 24:
+            return 2
+        elif high_num <= 34:
+            return 3
+        elif high_num <= 44:
+            return 4
+        elif high_num <= 49:
+            return 5
+        elif high_num <= 55:
+            return 6
+    return 7
+
+def genre_weights(user: User) -> dict[str, float]:
+    weights: dict[str, float] = {g: 1.0 for g in GENRES}
+    age_group = parse_age_group(user.age)
+    occ = str(user.occupation).lower()
+
+    if age_group == 1:
+        for g in ["애니", "예능", "스포츠"]:
+            weights[g] += 3
+    elif age_group == 2:
+        for g in ["예능", "드라마", "음악", "영화"]:
+            weights[g] += 2
+    elif age_group == 3:
+        for g in ["드라마", "예능", "뉴스", "영화"]:
+            weights[g] += 2
+    elif age_group == 4:
+        for g in ["뉴스", "시사", "드라마", "다큐"]:
+            weights[g] += 2
+    elif age_group >= 5:
+        for g in ["뉴스", "다큐", "영화"]:
+            weights[g] += 3
+
+    if "scientist" in occ or "doctor" in occ or "educator" in occ:
+        for g in ["다큐", "뉴스"]:
+            weights[g] += 3
+    if "artist" in occ or "entertainment" in occ or "writer" in occ:
+        for g in ["예능", "음악", "영화"]:
+            weights[g] += 3
+    if "student" in occ:
+        for g in ["애니", "예능", "음악"]:
+            weights[g] += 3
+    if "retired" in occ:
+        for g in ["뉴스", "다큐", "영화"]:
+            weights[g] += 3
+
+    return weights
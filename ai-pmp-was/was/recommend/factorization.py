@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+
+@dataclass
+class Factorization:
+    mean: float
+    user_bias: np.ndarray
+    user_factors: np.ndarray
+    item_bias: np.ndarray
+    item_factors: np.ndarray
+
+    def scores(self, users: slice | np.ndarray) -> np.ndarray:
+        return self.user_factors[users] @ self.item_factors.T \
+            + self.user_bias[users, None] + self.item_bias[None, :] + self.mean
+
+def fit_als(ratings: sparse.csr_matrix, rank: int, reg: float, iterations: int, seed: int = 0) -> Factorization:
+    n_users, n_items = ratings.shape
+    mean = float(ratings.data.mean()) if ratings.nnz else 0.0
+
+    rng = np.random.default_rng(seed)
+    user_factors = rng.normal(0, 0.1, (n_users, rank))
+    item_factors = rng.normal(0, 0.1, (n_items, rank))
+    user_bias = np.zeros(n_users)
+    item_bias = np.zeros(n_items)
+
+    by_item = ratings.T.tocsr()
+    for _ in range(iterations):
+        user_factors, user_bias = _als_step(ratings, item_factors, item_bias, mean, reg)
+        item_factors, item_bias = _als_step(by_item, user_factors, user_bias, mean, reg)
+
+    return Factorization(mean, user_bias, user_factors, item_bias, item_factors)
+
+def _als_step(ratings: sparse.csr_matrix, fixed_factors: np.ndarray, fixed_bias: np.ndarray,
+              mean: float, reg: float) -> tuple[np.ndarray, np.ndarray]:
+    n, rank = ratings.shape[0], fixed_factors.shape[1]
+
+    # 편향을 마지막 열로 붙여 factor 와 함께 푼다
+    fixed = np.hstack([fixed_factors, np.ones((fixed_factors.shape[0], 1))])
+    solved = np.zeros((n, rank + 1))
+    eye = np.eye(rank + 1)
+
+    for i in range(n):
+        lo, hi = ratings.indptr[i], ratings.indptr[i + 1]
+        if lo == hi:
+            continue
+        idx = ratings.indices[lo:hi]
+        x = fixed[idx]
+        y = ratings.data[lo:hi] - mean - fixed_bias[idx]
+        solved[i] = np.linalg.solve(x.T @ x + reg * (hi - lo) * eye, x.T @ y)
+
+    return solved[:, :rank], solved[:, rank]
+
+def project_items(factorization: Factorization, mapping: sparse.csr_matrix) -> Factorization:
+    weights = np.asarray(mapping.sum(axis=1)).ravel()
+    normalized = sparse.diags(np.divide(1.0, weights, out=np.zeros_like(weights), where=weights > 0)) @ mapping
+
+    return Factorization(
+        mean=factorization.mean,
+        user_bias=factorization.user_bias,
+        user_factors=factorization.user_factors,
+        item_bias=normalized @ factorization.item_bias,
+        item_factors=normalized @ factorization.item_factors,
+    )
+
+def rmse(factorization: Factorization, ratings: sparse.csr_matrix) -> float:
+    coo = ratings.tocoo()
+    predicted = np.einsum('ij,ij->i', factorization.user_factors[coo.row], factorization.item_factors[coo.col]) \
+        + factorization.user_bias[coo.row] + factorization.item_bias[coo.col] + factorization.mean
+    return float(np.sqrt(np.mean((predicted - coo.data) ** 2))) if coo.nnz else 0.0
@@ -0,0 +1,123 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+from flask import current_app
+
+from ex.py.cache_ex import VersionStamp
+from was import config
+from was.recommend.factorization import Factorization
+
+_ARRAYS = ['user_pks', 'user_factors', 'user_bias', 'item_pks', 'item_factors', 'item_bias']
+
+class OnlineScorer:
+    def __init__(self, path: Path) -> None:
+        meta = json.loads((path / 'meta.json').read_text())
+        self.mean: float = meta['mean']
+
+        arrays = {name: np.load(path / f'{name}.npy', mmap_mode='r') for name in _ARRAYS}
+        _check_arrays(arrays, meta)
+        self.user_pks = arrays['user_pks']
+        self.user_factors = arrays['user_factors']
+        self.user_bias = arrays['user_bias']
+        self.item_pks = arrays['item_pks']
+        self.item_factors = arrays['item_factors']
+        self.item_bias = arrays['item_bias']
+
+    @staticmethod
+    def _lookup(pks: np.ndarray, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        index = np.searchsorted(pks, keys)
+        found = index < len(pks)
+        found[found] = pks[index[found]] == keys[found]
+        return index[found], found
+
+    def predict(self, user_pk: int, movie_pks: list[int]) -> dict[int, float] | None:
+        user_index, user_found = self._lookup(self.user_pks, np.array([user_pk]))
+        if not user_found[0]:
+            return None
+        u = int(user_index[0])
+
+        keys = np.array(movie_pks, dtype=np.int64)
+        item_index, item_found = self._lookup(self.item_pks, keys)
+
+        scores = self.item_factors[item_index] @ self.user_factors[u] \
+            + self.item_bias[item_index] + self.user_bias[u] + self.mean
+        scores = np.clip(scores, 0.0, 5.0)
+
+        return dict(zip(keys[item_found].tolist(), scores.tolist()))
+
+def _check_arrays(arrays: dict[str, np.ndarray], meta: dict) -> None:
+    shapes = {
+        'user_pks': (meta['users'],),
+        'user_factors': (meta['users'], meta['rank']),
+        'user_bias': (meta['users'],),
+        'item_pks': (meta['items'],),
+        'item_factors': (meta['items'], meta['rank']),
+        'item_bias': (meta['items'],),
+    }
+    for name, shape in shapes.items():
+        if arrays[name].shape != shape:
+            raise ValueError(f'{name} shape {arrays[name].shape} does not match meta.json {shape}')
+
+class FactorStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._current_stamp = VersionStamp(path / 'current')
+        self._scorer: OnlineScorer | None = None
+        self._scorer_version = 0
+
+    def get(self) -> OnlineScorer | None:
+        version = self._current_stamp.current()
+        if not version:
+            return None
+
+        if version != self._scorer_version:
+            generation = (self.path / 'current').read_text().strip()
+            try:
+                self._scorer = OnlineScorer(self.path / generation)
+            except ValueError as e:
+                # 맞지 않는 세대는 버리고 이전 scorer 를 계속 쓴다
+                current_app.logger.warning(f'factor generation {generation} rejected: {e}')
+            self._scorer_version = version
+        return self._scorer
+
+def save_factors(path: Path, factorization: Factorization, user_pks: np.ndarray, item_pks: np.ndarray) -> None:
+    arrays = {
+        'user_pks': user_pks.astype(np.int64),
+        'user_factors': factorization.user_factors.astype(np.float32),
+        'user_bias': factorization.user_bias.astype(np.float32),
+        'item_pks': item_pks.astype(np.int64),
+        'item_factors': factorization.item_factors.astype(np.float32),
+        'item_bias': factorization.item_bias.astype(np.float32),
+    }
+    meta = {
+        'mean': factorization.mean,
+        'rank': factorization.user_factors.shape[1],
+        'users': len(user_pks),
+        'items': len(item_pks),
+    }
+
+    # 세대마다 새 디렉터리에 쓰고 current 파일만 교체해서 worker 가 섞인 세대를 읽지 않게 한다
+    generation = f'{time.time_ns()}'
+    generation_path = path / generation
+    generation_path.mkdir(parents=True)
+    for name, array in arrays.items():
+        np.save(generation_path / f'{name}.npy', np.ascontiguousarray(array))
+    (generation_path / 'meta.json').write_text(json.dumps(meta))
+
+    tmp_path = path / 'current.tmp'
+    tmp_path.write_text(generation)
+    os.replace(tmp_path, path / 'current')
+
+    # 직전 세대는 아직 읽는 중인 worker 가 있을 수 있어 남긴다
+    generations = sorted((p for p in path.iterdir() if p.is_dir() and p.name.isdigit()), key=lambda p: int(p.name))
+    for old_path in generations[:-2]:
+        shutil.rmtree(old_path)
+
+factor_store = FactorStore(config.recommend_data_path / 'factors')
+
+def online_scorer() -> OnlineScorer | None:
+    return factor_store.get() if config.RECOMMEND_ONLINE_SCORING else None
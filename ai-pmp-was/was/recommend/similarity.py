@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+TITLE_WEIGHT = 0.4
+GENRE_WEIGHT = 0.4
+YEAR_WEIGHT = 0.2
+
+# 연도 차이가 이 값 이상이면 연도 유사도 0
+YEAR_SCALE = 10.0
+
+@dataclass
+class SimilarityFeatures:
+    titles: sparse.csr_matrix
+    genres: sparse.csr_matrix
+    genre_counts: np.ndarray
+    years: np.ndarray
+
+@dataclass
+class SimilarityBlock:
+    source_index: np.ndarray
+    target_index: np.ndarray
+    score: np.ndarray
+    title: np.ndarray
+    genre: np.ndarray
+    year: np.ndarray
+
+def title_vectorizer(titles: list[str]) -> TfidfVectorizer:
+    vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 3), lowercase=True, dtype=np.float32)
+    vectorizer.fit(titles)
+    return vectorizer
+
+def features(vectorizer: TfidfVectorizer, vocabulary: dict[str, int],
+             titles: list[str], genres: list[list[str]], years: list[int | None]) -> SimilarityFeatures:
+    rows: list[int] = []
+    cols: list[int] = []
+    for i, names in enumerate(genres):
+        for col in sorted({vocabulary[name] for name in names if name in vocabulary}):
+            rows.append(i)
+            cols.append(col)
+
+    genre_matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(genres), len(vocabulary))
+    )
+
+    return SimilarityFeatures(
+        titles=vectorizer.transform(titles).tocsr(),
+        genres=genre_matrix,
+        genre_counts=np.asarray(genre_matrix.sum(axis=1), dtype=np.float32).ravel(),
+        years=np.array([np.nan if y is None else y for y in years], dtype=np.float32),
+    )
+
+def top_k(source: SimilarityFeatures, target: SimilarityFeatures, k: int, block_size: int,
+          exclude_self: bool = False) -> Iterator[SimilarityBlock]:
+    n_sources = source.titles.shape[0]
+    n_targets = target.titles.shape[0]
+    k = min(k, n_targets - 1 if exclude_self else n_targets)
+    if k <= 0:
+        return
+
+    titles_t = target.titles.T.tocsc()
+    genres_t = target.genres.T.tocsc()
+
+    for start in range(0, n_sources, block_size):
+        end = min(start + block_size, n_sources)
+
+        title = (source.titles[start:end] @ titles_t).toarray()
+
+        intersection = (source.genres[start:end] @ genres_t).toarray()
+        union = source.genre_counts[start:end, None] + target.genre_counts[None, :] - intersection
+        genre = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+        year_diff = np.abs(source.years[start:end, None] - target.years[None, :])
+        year = np.clip(1.0 - year_diff / YEAR_SCALE, 0.0, 1.0)
+        year = np.nan_to_num(year, nan=0.0)
+
+        score = TITLE_WEIGHT * title + GENRE_WEIGHT * genre + YEAR_WEIGHT * year
+
+        if exclude_self:
+            rows = np.arange(end - start)
+            score[rows, rows + start] = -np.inf
+
+        candidates = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        candidate_score = np.take_along_axis(score, candidates, axis=1)
+        order = np.argsort(-candidate_score, axis=1, kind='stable')
+        target_index = np.take_along_axis(candidates, order, axis=1)
+
+        source_index = np.repeat(np.arange(start, end), k)
+        target_index = target_index.ravel()
+        block_rows = source_index - start
+
+        yield SimilarityBlock(
+            source_index=source_index,
+            target_index=target_index,
+            score=score[block_rows, target_index],
+            title=title[block_rows, target_index],
+            genre=genre[block_rows, target_index],
+            year=year[block_rows, target_index],
+        )
@@ -0,0 +1,134 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from ex.py.cache_ex import VersionStamp
+from was import config
+from was.cache import movie_recommend_stamp
+
+_MAGIC = b'TOPK'
+_FORMAT_VERSION = 1
+# magic, format version, k, source 수, neighbor 수, 빌드 시점의 데이터 stamp
+_HEADER = struct.Struct('<4sIIIQQ')
+_HEADER_SIZE = 32
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+class TopKIndex:
+    def __init__(self, path: Path) -> None:
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, k, n_sources, n_neighbors, stamp_version = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or format_version != _FORMAT_VERSION:
+            raise ValueError(f'invalid top-k index file: {path}')
+
+        self.k: int = k
+        self.stamp_version: int = stamp_version
+
+        offset = _HEADER_SIZE
+        self.offsets = np.frombuffer(self._mmap, dtype='<i8', count=n_sources + 1, offset=offset)
+        offset = _align8(offset + self.offsets.nbytes)
+        self.sources = np.frombuffer(self._mmap, dtype='<i4', count=n_sources, offset=offset)
+        offset = _align8(offset + self.sources.nbytes)
+        self.targets = np.frombuffer(self._mmap, dtype='<i4', count=n_neighbors, offset=offset)
+        offset = _align8(offset + self.targets.nbytes)
+        self.scores = np.frombuffer(self._mmap, dtype='<f4', count=n_neighbors, offset=offset)
+
+    def neighbors(self, source: int, top_n: int) -> list[tuple[int, float]] | None:
+        i = int(np.searchsorted(self.sources, source))
+        if i == len(self.sources) or self.sources[i] != source:
+            return []
+
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        if top_n > self.k and end - start >= self.k:
+            return None
+
+        end = min(end, start + top_n)
+        return list(zip(self.targets[start:end].tolist(), self.scores[start:end].tolist()))
+
+class TopKIndexFile:
+    def __init__(self, path: Path, stamp: VersionStamp) -> None:
+        self.path = path
+        self.stamp = stamp
+        self._file_stamp = VersionStamp(path)
+        self._index: TopKIndex | None = None
+        self._index_version = 0
+
+    def get(self) -> TopKIndex | None:
+        version = self._file_stamp.current()
+        if not version:
+            return None
+
+        if version != self._index_version:
+            self._index = TopKIndex(self.path)
+            self._index_version = version
+
+        if self._index is None or self._index.stamp_version != self.stamp.current():
+            return None
+        return self._index
+
+def write_index(path: Path, rows: Iterable[tuple[int, int, float]], k: int, stamp_version: int) -> tuple[int, int]:
+    sources: list[int] = []
+    offsets: list[int] = [0]
+
+    target_chunk: list[int] = []
+    score_chunk: list[float] = []
+    chunks: list[tuple[np.ndarray, np.ndarray]] = []
+
+    n_neighbors = 0
+    for source, target, score in rows:
+        if not sources or sources[-1] != source:
+            if sources and source < sources[-1]:
+                raise ValueError('rows must be sorted by source')
+            if sources:
+                offsets.append(n_neighbors)
+            sources.append(source)
+        elif n_neighbors - offsets[-1] >= k:
+            continue
+
+        target_chunk.append(target)
+        score_chunk.append(score)
+        n_neighbors += 1
+
+        if len(target_chunk) >= 1 << 20:
+            chunks.append((np.array(target_chunk, dtype='<i4'), np.array(score_chunk, dtype='<f4')))
+            target_chunk, score_chunk = [], []
+
+    if sources:
+        offsets.append(n_neighbors)
+    chunks.append((np.array(target_chunk, dtype='<i4'), np.array(score_chunk, dtype='<f4')))
+
+    targets = np.concatenate([t for t, _ in chunks])
+    scores = np.concatenate([s for _, s in chunks])
+
+    arrays = [
+        np.array(offsets, dtype='<i8'),
+        np.array(sources, dtype='<i4'),
+        targets,
+        scores,
+    ]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, k, len(sources), n_neighbors, stamp_version)
+        f.write(header.ljust(_HEADER_SIZE, b'\0'))
+        for array in arrays:
+            f.write(array.tobytes())
+            f.write(b'\0' * (_align8(f.tell()) - f.tell()))
+    os.replace(tmp_path, path)
+
+    return len(sources), n_neighbors
+
+movie_similarity_index = TopKIndexFile(
+    config.recommend_data_path / 'movie_similarity.topk', movie_recommend_stamp
+)
+movielens_similarity_index = TopKIndexFile(
+    config.recommend_data_path / 'movielens_tmdb_similarity.topk', movie_recommend_stamp
+)
@@ -0,0 +1,110 @@
+import difflib
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import Select
+
+from ex.py.cache_ex import VersionStamp
+from was import config
+from was.cache import scene_stamp
+from was.model import db
+from was.model.scene import SceneMedia, SceneTimestamp, SceneActor, SceneCategory, SceneMediaActor, \
+    scene_media_category
+
+FACETS = ['category', 'display_class', 'majority_class', 'actor']
+
+class FacetIndex:
+    def __init__(self, media_pks: list[int], facets: dict[str, dict[str, int]]) -> None:
+        # media 는 제목 순서의 bit 위치로 표현한다
+        self.media_pks = media_pks
+        self.facets = facets
+        self.all = (1 << len(media_pks)) - 1
+
+        self._actor_names: dict[str, list[str]] = defaultdict(list)
+        for name in facets.get('actor', {}):
+            self._actor_names[name.casefold()].append(name)
+        self._actor_keys = sorted(self._actor_names)
+
+    def match_actor(self, query: str) -> list[str]:
+        if query in self.facets.get('actor', {}):
+            return [query]
+
+        key = query.strip().casefold()
+        if not key:
+            return []
+
+        lo = bisect_left(self._actor_keys, key)
+        hi = bisect_left(self._actor_keys, key + '\U0010ffff')
+        keys = self._actor_keys[lo:hi] or difflib.get_close_matches(key, self._actor_keys, n=3, cutoff=0.6)
+
+        return [name for k in keys for name in self._actor_names[k]]
+
+    def select(self, facet: str, values: Iterable[str]) -> int:
+        bits = 0
+        index = self.facets.get(facet, {})
+        for value in values:
+            bits |= index.get(value, 0)
+        return bits
+
+    def query(self, filters: dict[str, list[str]]) -> int:
+        bits = self.all
+        for facet, values in filters.items():
+            bits &= self.select(facet, values)
+        return bits
+
+    def page(self, bits: int, offset: int, limit: int | None) -> list[int]:
+        pks: list[int] = []
+        skipped = 0
+        while bits and (limit is None or len(pks) < limit):
+            low = bits & -bits
+            if skipped < offset:
+                skipped += 1
+            else:
+                pks.append(self.media_pks[low.bit_length() - 1])
+            bits ^= low
+        return pks
+
+def build_facet_index() -> FacetIndex:
+    media_pks = list(db.session.execute(
+        db.select(SceneMedia.pk).order_by(SceneMedia.title.collate(config.DB_COLLNAME), SceneMedia.pk)
+    ).scalars())
+    position = {pk: i for i, pk in enumerate(media_pks)}
+
+    facets: dict[str, dict[str, int]] = {facet: defaultdict(int) for facet in FACETS}
+
+    def add(facet: str, q: Select) -> None:
+        index = facets[facet]
+        for media_pk, value in db.session.execute(q):
+            index[value] |= 1 << position[media_pk]
+
+    add('category', db.select(scene_media_category.c.scene_media_pk, SceneCategory.name)
+        .join(SceneCategory, SceneCategory.pk == scene_media_category.c.scene_category_pk))
+    add('display_class', db.select(SceneTimestamp.scene_media_pk, SceneTimestamp.display_class).distinct())
+    add('majority_class', db.select(SceneTimestamp.scene_media_pk, SceneTimestamp.majority_class).distinct())
+    add('actor', db.select(SceneMediaActor.scene_media_pk, SceneActor.name)
+        .join(SceneActor, SceneActor.pk == SceneMediaActor.scene_actor_pk).distinct())
+
+    return FacetIndex(media_pks, {facet: dict(index) for facet, index in facets.items()})
+
+class FacetIndexHolder:
+    def __init__(self, stamp: VersionStamp) -> None:
+        self.stamp = stamp
+        self._index: FacetIndex | None = None
+        self._index_version = 0
+        self._lock = threading.Lock()
+
+    def get(self) -> FacetIndex:
+        version = self.stamp.current()
+        index = self._index
+        if index is not None and version == self._index_version:
+            return index
+
+        with self._lock:
+            if self._index is None or version != self._index_version:
+                self._index = build_facet_index()
+                self._index_version = version
+            return self._index
+
+scene_facet_index = FacetIndexHolder(scene_stamp)
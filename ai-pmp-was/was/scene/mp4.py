@@ -0,0 +1,204 @@
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Protocol
+
+import numpy as np
+import requests
+
+class Reader(Protocol):
+    size: int
+
+    def read(self, offset: int, size: int) -> bytes:
+        ...
+
+class FileReader:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.size = path.stat().st_size
+
+    def read(self, offset: int, size: int) -> bytes:
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+
+class HttpRangeReader:
+    def __init__(self, url: str, session: requests.Session) -> None:
+        self.url = url
+        self.session = session
+
+        res = session.head(url, allow_redirects=True, timeout=30)
+        res.raise_for_status()
+        if 'Content-Length' not in res.headers:
+            raise ValueError(f'no Content-Length for {url}')
+        self.size = int(res.headers['Content-Length'])
+
+    def read(self, offset: int, size: int) -> bytes:
+        end = min(offset + size, self.size) - 1
+        res = self.session.get(self.url, headers={'Range': f'bytes={offset}-{end}'}, timeout=60)
+        res.raise_for_status()
+        if res.status_code != 206:
+            return res.content[offset:end + 1]
+        return res.content
+
+def _box_header(data: bytes, offset: int, end: int) -> tuple[bytes, int, int]:
+    size, box_type = struct.unpack_from('>I4s', data, offset)
+    header = 8
+    if size == 1:
+        size = struct.unpack_from('>Q', data, offset + 8)[0]
+        header = 16
+    elif size == 0:
+        size = end - offset
+    if size < header:
+        raise ValueError(f'invalid {box_type!r} box size {size} at {offset}')
+    return box_type, header, size
+
+def iter_boxes(data: bytes, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    offset = start
+    while offset + 8 <= end:
+        box_type, header, size = _box_header(data, offset, end)
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+
+def _child(data: bytes, start: int, end: int, box_type: bytes) -> tuple[int, int] | None:
+    for child_type, child_start, child_end in iter_boxes(data, start, end):
+        if child_type == box_type:
+            return child_start, child_end
+    return None
+
+def find_moov(reader: Reader) -> tuple[int, int]:
+    offset = 0
+    while offset + 8 <= reader.size:
+        box_type, _, size = _box_header(reader.read(offset, 16), 0, reader.size - offset)
+        if box_type == b'moov':
+            return offset, offset + size
+        offset += size
+    raise ValueError('moov box not found')
+
+def _table(data: bytes, start: int, dtype: str, columns: int = 1) -> np.ndarray:
+    # version/flags 4 byte 다음에 entry 수, 그 뒤로 entry 배열
+    count = struct.unpack_from('>I', data, start + 4)[0]
+    table = np.frombuffer(data, dtype=dtype, count=count * columns, offset=start + 8).astype(np.int64)
+    return table.reshape(count, columns) if columns > 1 else table
+
+@dataclass
+class VideoTrack:
+    timescale: int
+    sample_times: np.ndarray
+    sample_offsets: np.ndarray
+    sample_sizes: np.ndarray
+    sync_samples: np.ndarray
+    # 재생 시각 + edit_offset_ms = track 안의 시각 (elst 첫 구간 기준)
+    edit_offset_ms: float = 0.0
+
+    def byte_range(self, start_ms: int, end_ms: int) -> tuple[int, int]:
+        times_ms = self.sample_times * 1000 / self.timescale - self.edit_offset_ms
+        first = max(int(np.searchsorted(times_ms, start_ms, side='right')) - 1, 0)
+        last = max(int(np.searchsorted(times_ms, end_ms, side='right')) - 1, first)
+
+        # 재생은 직전 keyframe 부터 가능
+        k = int(np.searchsorted(self.sync_samples, first, side='right')) - 1
+        key = int(self.sync_samples[k]) if k >= 0 else 0
+
+        offsets = self.sample_offsets[key:last + 1]
+        ends = offsets + self.sample_sizes[key:last + 1]
+        return int(offsets.min()), int(ends.max()) - 1
+
+def _movie_timescale(moov: bytes, header: int) -> int:
+    mvhd = _child(moov, header, len(moov), b'mvhd')
+    if not mvhd:
+        raise ValueError('mvhd box not found')
+    version = moov[mvhd[0]]
+    return struct.unpack_from('>I', moov, mvhd[0] + (20 if version == 1 else 12))[0]
+
+def _edit_offset_ms(moov: bytes, trak: tuple[int, int], movie_timescale: int, timescale: int) -> float:
+    # 앞쪽 빈 edit 는 재생 지연, 첫 일반 edit 의 media_time 은 track 시작 위치
+    # 그 뒤의 edit 구간 (잘라 붙인 편집) 은 반영하지 않는다
+    edts = _child(moov, *trak, b'edts')
+    elst = _child(moov, *edts, b'elst') if edts else None
+    if not elst:
+        return 0.0
+
+    version = moov[elst[0]]
+    count = struct.unpack_from('>I', moov, elst[0] + 4)[0]
+    entry = struct.Struct('>Qqi' if version == 1 else '>Iii')
+
+    delay_ms = 0.0
+    for i in range(count):
+        segment_duration, media_time, _ = entry.unpack_from(moov, elst[0] + 8 + i * entry.size)
+        if media_time == -1:
+            delay_ms += segment_duration * 1000 / movie_timescale
+            continue
+        return media_time * 1000 / timescale - delay_ms
+    return -delay_ms
+
+def parse_video_track(moov: bytes) -> VideoTrack:
+    _, header, _ = _box_header(moov, 0, len(moov))
+    movie_timescale = _movie_timescale(moov, header)
+    for box_type, trak_start, trak_end in iter_boxes(moov, header, len(moov)):
+        if box_type != b'trak':
+            continue
+
+        mdia = _child(moov, trak_start, trak_end, b'mdia')
+        if not mdia:
+            continue
+        hdlr = _child(moov, *mdia, b'hdlr')
+        if not hdlr or moov[hdlr[0] + 8:hdlr[0] + 12] != b'vide':
+            continue
+
+        mdhd = _child(moov, *mdia, b'mdhd')
+        minf = _child(moov, *mdia, b'minf')
+        stbl = _child(moov, *minf, b'stbl') if minf else None
+        if not mdhd or not stbl:
+            continue
+
+        track = _video_track(moov, mdhd[0], stbl)
+        track.edit_offset_ms = _edit_offset_ms(moov, (trak_start, trak_end), movie_timescale, track.timescale)
+        return track
+
+    raise ValueError('video track not found')
+
+def _video_track(moov: bytes, mdhd_start: int, stbl: tuple[int, int]) -> VideoTrack:
+    version = moov[mdhd_start]
+    timescale = struct.unpack_from('>I', moov, mdhd_start + (20 if version == 1 else 12))[0]
+
+    boxes = {box_type: start for box_type, start, _ in iter_boxes(moov, *stbl)}
+
+    sample_size, sample_count = struct.unpack_from('>II', moov, boxes[b'stsz'] + 4)
+    if sample_size:
+        sizes = np.full(sample_count, sample_size, dtype=np.int64)
+    else:
+        sizes = np.frombuffer(moov, dtype='>u4', count=sample_count, offset=boxes[b'stsz'] + 12).astype(np.int64)
+
+    if b'co64' in boxes:
+        chunk_offsets = _table(moov, boxes[b'co64'], '>u8')
+    else:
+        chunk_offsets = _table(moov, boxes[b'stco'], '>u4')
+
+    stsc = _table(moov, boxes[b'stsc'], '>u4', 3)
+    samples_per_chunk = np.zeros(len(chunk_offsets), dtype=np.int64)
+    for i, (first_chunk, count, _) in enumerate(stsc):
+        next_first_chunk = stsc[i + 1][0] if i + 1 < len(stsc) else len(chunk_offsets) + 1
+        samples_per_chunk[first_chunk - 1:next_first_chunk - 1] = count
+
+    chunk_of_sample = np.repeat(np.arange(len(chunk_offsets)), samples_per_chunk)[:sample_count]
+    first_sample_of_chunk = np.concatenate([[0], np.cumsum(samples_per_chunk)[:-1]])
+    size_before = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    offsets = chunk_offsets[chunk_of_sample] + size_before - size_before[first_sample_of_chunk[chunk_of_sample]]
+
+    stts = _table(moov, boxes[b'stts'], '>u4', 2)
+    durations = np.repeat(stts[:, 1], stts[:, 0])[:sample_count]
+    times = np.concatenate([[0], np.cumsum(durations)[:-1]])
+
+    if b'stss' in boxes:
+        sync_samples = _table(moov, boxes[b'stss'], '>u4') - 1
+    else:
+        sync_samples = np.arange(sample_count, dtype=np.int64)
+
+    return VideoTrack(
+        timescale=timescale,
+        sample_times=times,
+        sample_offsets=offsets,
+        sample_sizes=sizes,
+        sync_samples=sync_samples,
+    )
@@ -0,0 +1,66 @@
+import io
+from dataclasses import dataclass
+from typing import Any
+
+import requests
+from PIL import Image, UnidentifiedImageError
+
+# JPEG 의 가로/세로 최대 크기
+JPEG_MAX_SIZE = 65535
+
+@dataclass
+class SpriteSheet:
+    images: list[bytes]
+    manifest: dict[str, Any]
+
+def build_sprite(thumbnails: list[tuple[int, str]], tile_width: int, tile_height: int, columns: int,
+                 max_rows: int, quality: int) -> SpriteSheet | None:
+    tiles: list[tuple[int, Image.Image]] = []
+    missing: list[int] = []
+    with requests.Session() as session:
+        for timestamp_pk, url in thumbnails:
+            res = session.get(url, timeout=30)
+            if res.status_code != 200:
+                missing.append(timestamp_pk)
+                continue
+            try:
+                image = Image.open(io.BytesIO(res.content)).convert('RGB')
+            except (UnidentifiedImageError, OSError):
+                missing.append(timestamp_pk)
+                continue
+            tiles.append((timestamp_pk, image.resize((tile_width, tile_height), Image.Resampling.LANCZOS)))
+
+    if not tiles:
+        return None
+
+    columns = min(columns, len(tiles), JPEG_MAX_SIZE // tile_width)
+    rows = min(max_rows, JPEG_MAX_SIZE // tile_height, (len(tiles) + columns - 1) // columns)
+    per_sheet = columns * rows
+
+    images = []
+    manifest_tiles = []
+    for sheet_index, start in enumerate(range(0, len(tiles), per_sheet)):
+        sheet_tiles = tiles[start:start + per_sheet]
+        sheet_rows = (len(sheet_tiles) + columns - 1) // columns
+        sheet = Image.new('RGB', (tile_width * columns, tile_height * sheet_rows))
+
+        for i, (timestamp_pk, image) in enumerate(sheet_tiles):
+            x, y = (i % columns) * tile_width, (i // columns) * tile_height
+            sheet.paste(image, (x, y))
+            manifest_tiles.append({'timestamp_pk': timestamp_pk, 'sheet': sheet_index, 'x': x, 'y': y})
+
+        out = io.BytesIO()
+        sheet.save(out, format='JPEG', quality=quality, optimize=True)
+        images.append(out.getvalue())
+
+    return SpriteSheet(
+        images=images,
+        manifest={
+            'tile_width': tile_width,
+            'tile_height': tile_height,
+            'columns': columns,
+            'rows': rows,
+            'tiles': manifest_tiles,
+            'missing_timestamp_pks': missing,
+        },
+    )
@@ -0,0 +1,52 @@
+from bisect import bisect_right
+from typing import Generic, Iterable, TypeVar
+
+T = TypeVar('T')
+
+_NO_END = -(1 << 62)
+
+class Timeline(Generic[T]):
+    def __init__(self, entries: Iterable[tuple[int, int, T]]) -> None:
+        ordered = sorted(entries, key=lambda entry: (entry[0], entry[1]))
+
+        self.starts = [start for start, _, _ in ordered]
+        self.ends = [end for _, end, _ in ordered]
+        self.items = [item for _, _, item in ordered]
+
+        # start 순서의 end 로 만든 max segment tree, leaf 는 _size + i
+        self._size = 1
+        while self._size < len(self.ends):
+            self._size *= 2
+        self._tree = [_NO_END] * (2 * self._size)
+        self._tree[self._size:self._size + len(self.ends)] = self.ends
+        for node in range(self._size - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def max_end(self) -> int:
+        return self._tree[1] if self.items else 0
+
+    def at(self, position: int) -> list[T]:
+        return self.window(position, position)
+
+    def window(self, lo: int, hi: int) -> list[T]:
+        # start <= hi 인 앞쪽 구간에서 end >= lo 인 leaf 만 찾아 내려간다, O((k + 1) log n)
+        limit = bisect_right(self.starts, hi)
+        found: list[int] = []
+
+        stack = [(1, 0, self._size)]
+        while stack:
+            node, node_lo, node_hi = stack.pop()
+            if node_lo >= limit or self._tree[node] < lo:
+                continue
+            if node >= self._size:
+                found.append(node - self._size)
+                continue
+            mid = (node_lo + node_hi) // 2
+            stack.append((2 * node + 1, mid, node_hi))
+            stack.append((2 * node, node_lo, mid))
+
+        return [self.items[i] for i in found]
@@ -48,6 +48,64 @@ export abstract class ApiBase {
     });
   }
 
+  // application/x-ndjson: 첫 줄은 Res<U>, 이후 한 줄에 item 하나씩
+  protected s<T, U, V>(url: string): (req: T, onItem: (item: V) => void) => Promise<U | null> {
+    return async (req, onItem) => this.stream(url, req, onItem);
+  }
+
+  async stream<U, V>(url: string, req: any, onItem: (item: V) => void): Promise<U | null> {
+    return this.handler.with(async () => {
+      try {
+        if (this.delay) {
+          await sleep(this.delay);
+        }
+
+        const headers: Record<string, string> = { "Content-Type": "application/json" };
+        this.handler.beforeRequest(headers);
+        const response = await fetch(this.baseUrl + url, {
+          method: "POST",
+          mode: "cors",
+          credentials: "include",
+          headers,
+          body: JSON.stringify(req),
+        });
+        if (!response.body) {
+          throw new Error("응답이 비어 있습니다.");
+        }
+
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let data: U | null | undefined = undefined;
+        let buffer = "";
+        for (;;) {
+          const { done, value } = await reader.read();
+          buffer += value ?? "";
+          const lines = buffer.split("\n");
+          buffer = done ? "" : lines.pop() ?? "";
+          for (const line of lines) {
+            if (!line) {
+              continue;
+            }
+            if (data === undefined) {
+              data = this.handleResponse<U>(JSON.parse(line));
+              if (data === null) {
+                await reader.cancel();
+                return null;
+              }
+            } else {
+              onItem(JSON.parse(line));
+            }
+          }
+          if (done) {
+            return data ?? null;
+          }
+        }
+      } catch (e) {
+        this.handler.catch(e);
+        return null;
+      }
+    });
+  }
+
   private handleResponse<U>(res: Res<U>) {
     if (res.status !== "OK") {
       this.handler.handleStatus(res.status);
@@ -3,7 +3,8 @@ import { makeAutoObservable, runInAction } from "mobx";
 import { isNil } from "lodash";
 import { useModel } from "../../../ex/mobx";
 import { api } from "@/api/api";
-import type { PatternViewingHistoryLog } from "@/api/schema.g";
+import { quarterValues } from "@/api/schema.g";
+import type { PatternViewingHistoryLog, Quarter } from "@/api/schema.g";
 import { useEffect } from "react";
 
 const PatternHistoryTab = observer(() => {
@@ -19,7 +20,7 @@ const PatternHistoryTab = observer(() => {
       <div className="flex items-center justify-between">
         <h2 className="text-xl font-semibold">시청 기록</h2>
         <div className="flex gap-2">
-          {["Q1", "Q2", "Q3", "Q4"].map((quarter) => (
+          {quarterValues.map((quarter) => (
             <button
               key={quarter}
               onClick={() => model.init(quarter)}
@@ -80,7 +81,7 @@ const PatternHistoryTab = observer(() => {
 });
 
 class PatternHistoryModel {
-  selectedQuarter: string = "Q1";
+  selectedQuarter: Quarter = "Q1";
   logs: PatternViewingHistoryLog[] = [];
   initialized: boolean = false;
 
@@ -88,9 +89,9 @@ class PatternHistoryModel {
     makeAutoObservable(this);
   }
 
-  async init(quarter: string) {
+  async init(quarter: Quarter) {
     this.selectedQuarter = quarter;
-    const res = await api.patternViewingHistory({ quarter });
+    const res = await api.patternViewingHistory({ quarter, year: null });
 
     if (isNil(res)) {
       return;